@@ -4,23 +4,87 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
 from datetime import datetime
 import os
 
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from utils.logger import Colors
-from routers import auth, quiz, profile, home, plans, recommend, friends, notifications, review, plan_apply, stats
+from services.store import store, async_store
+from services.gpt_service import gpt_cache, get_singleflight_stats
+from services.plan_jobs import plan_jobs
+from services.web_search import search_cache
+from services.stats_engine import stats_engine
+from services.password_hasher import password_hasher, PasswordHasherBusy
+from services.shared_state import shared_state
+from routers import auth, quiz, profile, home, plans, recommend, friends, notifications, review, plan_apply, stats, sync
+
+# Rate Limiter 설정 - 라우터 데코레이터와 같은 인스턴스 (공유 상태 저장소 사용)
+limiter = auth.limiter
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """시작: DB 스키마/샘플 데이터 준비 (DB 스레드에서) / 종료: 워커 풀 정리"""
+    await async_store.run(store.open)
+    print(f"""
+{Colors.CYAN}{'='*70}
+
+    ____        _
+   |  _ \\ __ _| | ___  __ _ _ __ _ __
+   | |_) / _` | |/ _ \\/ _` | '__| '_ \\
+   |  __/ (_| | |  __/ (_| | |  | | | |
+   |_|   \\__,_|_|\\___|\\__,_|_|  |_| |_|
+
+   Backend Server v2.0.0 (Secure Edition)
+
+{'='*70}{Colors.ENDC}
+
+{Colors.GREEN}[SECURITY]{Colors.ENDC}
+  - bcrypt 비밀번호 해싱 (전용 워커 {password_hasher.workers}개, cost {password_hasher.rounds})
+  - JWT 토큰 인증 (24시간 만료)
+  - Rate Limiting 활성화
+  - CORS 화이트리스트 적용
+
+{Colors.GREEN}[DATABASE]{Colors.ENDC}
+  - SQLite 영속성 저장소 (커넥션 풀, WAL)
+  - 자동 테이블 생성
+  - 워커 간 공유 상태: {shared_state.backend}
+
+{Colors.GREEN}[SERVER READY]{Colors.ENDC} http://localhost:8000
+{Colors.BLUE}[API DOCS]{Colors.ENDC}     http://localhost:8000/docs
+
+{Colors.YELLOW}━━━ 모듈 구조 ━━━{Colors.ENDC}
+  routers/
+     auth.py        - 인증 (회원가입/로그인/로그아웃)
+     quiz.py        - 퀴즈 (생성/채점)
+     profile.py     - 프로필 (조회/수정)
+     home.py        - 홈 (대시보드)
+     plans.py       - 학습 계획 (CRUD)
+     recommend.py   - AI 강좌 추천
+     friends.py     - 친구 (추가/삭제/목록)
+     notifications.py - 알림
+     review.py      - 복습 자료
+
+  services/
+     store.py       - SQLite 데이터 저장소
+     gpt_service.py - GPT 호출
+
+{Colors.CYAN}대기 중... Flutter 앱에서 요청을 보내주세요!{Colors.ENDC}
+""")
+    yield
+    await plan_jobs.shutdown()
+    async_store.shutdown()
+    password_hasher.shutdown()
 
-# Rate Limiter 설정
-limiter = Limiter(key_func=get_remote_address)
 
 app = FastAPI(
     title="Palearn API",
     version="2.0.0",
-    description="AI 기반 개인화 학습 플랫폼 API"
+    description="AI 기반 개인화 학습 플랫폼 API",
+    lifespan=lifespan
 )
 
 # Rate Limiter 등록
@@ -44,6 +108,20 @@ app.add_middleware(
 )
 
 
+# bcrypt 대기열 포화 - 잠시 후 재시도 안내
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": "1"},
+        content={
+            "success": False,
+            "detail": "요청이 많아 잠시 후 다시 시도해주세요.",
+            "error_type": "busy"
+        }
+    )
+
+
 # 전역 에러 핸들러
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -69,6 +147,7 @@ app.include_router(notifications.router)
 app.include_router(review.router)
 app.include_router(plan_apply.router)
 app.include_router(stats.router)
+app.include_router(sync.router)
 
 
 @app.get("/health")
@@ -81,6 +160,24 @@ async def health_check():
     }
 
 
+@app.get("/health/metrics")
+async def health_metrics():
+    """내부 성능 메트릭 (DB 커넥션 풀, GPT 캐시 등)"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "db_pool": store.pool_stats(),
+        "auth": store.revoked_token_stats(),
+        "gpt_cache": gpt_cache.stats(),
+        "gpt_singleflight": get_singleflight_stats(),
+        "plan_jobs": plan_jobs.stats(),
+        "web_search_cache": search_cache.stats(),
+        "stats_cache": stats_engine.stats(),
+        "plan_cache": store.plan_cache_stats(),
+        "password_hasher": password_hasher.stats(),
+        "shared_state": shared_state.stats()
+    }
+
+
 @app.get("/")
 async def root():
     """API 정보"""
@@ -97,54 +194,6 @@ async def root():
     }
 
 
-@app.on_event("startup")
-async def startup_event():
-    print(f"""
-{Colors.CYAN}{'='*70}
-
-    ____        _
-   |  _ \\ __ _| | ___  __ _ _ __ _ __
-   | |_) / _` | |/ _ \\/ _` | '__| '_ \\
-   |  __/ (_| | |  __/ (_| | |  | | | |
-   |_|   \\__,_|_|\\___|\\__,_|_|  |_| |_|
-
-   Backend Server v2.0.0 (Secure Edition)
-
-{'='*70}{Colors.ENDC}
-
-{Colors.GREEN}[SECURITY]{Colors.ENDC}
-  - bcrypt 비밀번호 해싱
-  - JWT 토큰 인증 (24시간 만료)
-  - Rate Limiting 활성화
-  - CORS 화이트리스트 적용
-
-{Colors.GREEN}[DATABASE]{Colors.ENDC}
-  - SQLite 영속성 저장소
-  - 자동 테이블 생성
-
-{Colors.GREEN}[SERVER READY]{Colors.ENDC} http://localhost:8000
-{Colors.BLUE}[API DOCS]{Colors.ENDC}     http://localhost:8000/docs
-
-{Colors.YELLOW}━━━ 모듈 구조 ━━━{Colors.ENDC}
-  routers/
-     auth.py        - 인증 (회원가입/로그인/로그아웃)
-     quiz.py        - 퀴즈 (생성/채점)
-     profile.py     - 프로필 (조회/수정)
-     home.py        - 홈 (대시보드)
-     plans.py       - 학습 계획 (CRUD)
-     recommend.py   - AI 강좌 추천
-     friends.py     - 친구 (추가/삭제/목록)
-     notifications.py - 알림
-     review.py      - 복습 자료
-
-  services/
-     store.py       - SQLite 데이터 저장소
-     gpt_service.py - GPT 호출
-
-{Colors.CYAN}대기 중... Flutter 앱에서 요청을 보내주세요!{Colors.ENDC}
-""")
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
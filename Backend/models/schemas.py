@@ -45,6 +45,20 @@ class PlanGenerateRequest(BaseModel):
     selfLevel: str
 
 
+class TaskUpdateItem(BaseModel):
+    date: str
+    task_id: str
+    completed: bool
+
+
+class BulkTaskUpdateRequest(BaseModel):
+    updates: List[TaskUpdateItem]
+
+
+class ActivePlanRequest(BaseModel):
+    plan_id: int
+
+
 class AddFriendRequest(BaseModel):
     code: str
 
@@ -9,11 +9,13 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from models.schemas import SignupRequest, LoginRequest
-from services.store import store
+from services.shared_state import SharedStateLimitStorage  # noqa: F401 - palearn-shared:// 저장소 등록
+from services.store import async_store
 from utils.logger import log_request, log_stage, log_success, log_error, log_navigation
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
-limiter = Limiter(key_func=get_remote_address)
+# 요청 횟수는 공유 상태에 기록 - 워커가 여러 개여도 제한이 워커 수만큼 늘어나지 않음
+limiter = Limiter(key_func=get_remote_address, storage_uri="palearn-shared://")
 
 
 # ==================== 입력 검증 함수 ====================
@@ -60,7 +62,7 @@ async def get_current_user(authorization: str = Header(None)) -> Dict:
         raise HTTPException(status_code=401, detail="인증 토큰이 필요합니다.")
 
     token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
-    user = store.get_user_by_token(token)
+    user = await async_store.get_user_by_token(token)
 
     if not user:
         raise HTTPException(status_code=401, detail="유효하지 않거나 만료된 토큰입니다.")
@@ -95,7 +97,7 @@ async def signup(request: Request, data: SignupRequest):
     if not sanitized_name or len(sanitized_name) < 2:
         raise HTTPException(status_code=400, detail="이름은 2자 이상이어야 합니다.")
 
-    user = store.create_user(
+    user = await async_store.create_user(
         username=sanitized_username,
         email=data.email.lower().strip(),  # 이메일 정규화
         password=data.password,
@@ -128,7 +130,7 @@ async def login(request: Request, data: LoginRequest):
     # 이메일 정규화
     email = data.email.lower().strip()
 
-    result = store.login(email, data.password)
+    result = await async_store.login(email, data.password)
 
     if not result:
         log_error(f"로그인 실패: {email}")
@@ -153,7 +155,7 @@ async def logout(current_user: Dict = Depends(get_current_user), authorization:
 
     if authorization:
         token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
-        store.logout(token)
+        await async_store.logout(token)
 
     log_success(f"로그아웃 완료: {current_user['name']}")
     return {"success": True, "message": "로그아웃되었습니다."}
@@ -2,18 +2,20 @@
 """친구 관련 라우터"""
 
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Optional
-from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from datetime import datetime
+import asyncio
+import time
 
 from models.schemas import AddFriendRequest, CheckFriendPlanRequest
-from services.store import store
+from services.shared_state import shared_state
+from services.store import async_store
 from utils.logger import log_request, log_stage, log_success, log_error, log_navigation
 from .auth import get_current_user
 
 router = APIRouter(prefix="/friends", tags=["Friends"])
 
-# 응원하기 쓰로틀링 (user_id -> {friend_id: last_cheer_time})
-_cheer_throttle: Dict[str, Dict[str, datetime]] = {}
+# 응원하기 쓰로틀링 - 공유 상태의 cheer:{user_id}:{friend_id} 키 (값: 마지막 응원 시각, 쿨다운 후 만료)
 CHEER_COOLDOWN_MINUTES = 5
 
 
@@ -23,34 +25,29 @@ async def get_friends(current_user: Dict = Depends(get_current_user)):
     log_stage(8, "친구 목록", current_user['name'])
     log_navigation(current_user['name'], "친구 화면")
 
-    user_id = current_user['user_id']
+    return await friend_list(current_user['user_id'])
+
 
+async def friend_list(user_id: str) -> List[Dict]:
+    """친구 + 샘플 친구 목록 (오늘 완료율 포함)"""
     # 실제 친구 목록 가져오기
-    real_friends = store.get_friends(user_id)
-
-    friends = []
-    for friend in real_friends:
-        today_rate = 0
-        friend_plans = store.get_plans(friend['user_id'])
-        if friend_plans:
-            today_str = date.today().isoformat()
-            for plan in friend_plans:
-                for day in plan.get('daily_schedule', []):
-                    if day['date'] == today_str:
-                        total = len(day['tasks'])
-                        completed = sum(1 for t in day['tasks'] if t.get('completed', False))
-                        today_rate = int((completed / total * 100) if total > 0 else 0)
-                        break
-
-        friends.append({
+    real_friends = await async_store.get_friends(user_id)
+
+    # 친구 수와 무관하게 한 번의 쿼리로 오늘 완료율 계산
+    rates = await async_store.get_today_rates([f['user_id'] for f in real_friends])
+
+    friends = [
+        {
             "id": friend['user_id'],
             "name": friend['name'],
             "avatarUrl": friend.get('photo_url'),
-            "todayRate": today_rate
-        })
+            "todayRate": rates.get(friend['user_id'], 0)
+        }
+        for friend in real_friends
+    ]
 
     # 샘플 친구도 항상 포함
-    sample_friends = store.get_sample_friends()
+    sample_friends = await async_store.get_sample_friends()
     friends.extend(sample_friends)
 
     return friends
@@ -64,7 +61,7 @@ async def add_friend(request: AddFriendRequest, current_user: Dict = Depends(get
     friend_code = request.code.upper()
 
     # 친구 코드로 사용자 찾기
-    friend = store.get_user_by_friend_code(friend_code)
+    friend = await async_store.get_user_by_friend_code(friend_code)
 
     if not friend:
         log_error(f"친구 코드 없음: {friend_code}")
@@ -76,15 +73,15 @@ async def add_friend(request: AddFriendRequest, current_user: Dict = Depends(get
         raise HTTPException(status_code=400, detail="자기 자신은 친구로 추가할 수 없습니다.")
 
     # 이미 친구인지 확인
-    existing_friends = store.get_friends(user_id)
+    existing_friends = await async_store.get_friends(user_id)
     if any(f['user_id'] == friend_id for f in existing_friends):
         raise HTTPException(status_code=400, detail="이미 친구입니다.")
 
     # 친구 추가
-    store.add_friend(user_id, friend_id)
+    await async_store.add_friend(user_id, friend_id)
 
     # 알림 추가
-    store.add_notification(friend_id, f"{current_user['name']}님이 친구로 추가했습니다.")
+    await async_store.add_notification(friend_id, f"{current_user['name']}님이 친구로 추가했습니다.")
 
     log_success(f"친구 추가 완료: {friend['name']}")
 
@@ -112,12 +109,12 @@ async def get_friend_plans(
     if not friend_id.startswith('sample-friend-'):
         # 실제 친구인지 확인
         user_id = current_user['user_id']
-        friends = store.get_friends(user_id)
+        friends = await async_store.get_friends(user_id)
         if not any(f['user_id'] == friend_id for f in friends):
             raise HTTPException(status_code=403, detail="친구가 아닙니다.")
 
     target_date = date or datetime.today().strftime('%Y-%m-%d')
-    plans = store.get_friend_plans_by_date(friend_id, target_date)
+    plans = await async_store.get_friend_plans_by_date(friend_id, target_date)
 
     return plans
 
@@ -131,27 +128,22 @@ async def check_friend_plan(
     """친구 응원하기 (쓰로틀링 적용: 5분당 1회)"""
     user_id = current_user['user_id']
 
-    # 쓰로틀링 확인
-    now = datetime.now()
-    if user_id not in _cheer_throttle:
-        _cheer_throttle[user_id] = {}
-
-    last_cheer = _cheer_throttle[user_id].get(friend_id)
-    if last_cheer:
-        time_diff = now - last_cheer
-        if time_diff < timedelta(minutes=CHEER_COOLDOWN_MINUTES):
-            remaining = CHEER_COOLDOWN_MINUTES - int(time_diff.total_seconds() / 60)
-            raise HTTPException(
-                status_code=429,
-                detail=f"잠시 후에 다시 응원할 수 있습니다. ({remaining}분 후)"
-            )
+    # 쓰로틀링 확인 - 키가 없을 때만 기록되므로 여러 워커에서 동시에 와도 1건만 통과
+    now = time.time()
+    key = f"cheer:{user_id}:{friend_id}"
+    if not await asyncio.to_thread(shared_state.add, key, now, CHEER_COOLDOWN_MINUTES * 60):
+        last_cheer = await asyncio.to_thread(shared_state.get, key) or now
+        remaining = CHEER_COOLDOWN_MINUTES - int((now - last_cheer) / 60)
+        raise HTTPException(
+            status_code=429,
+            detail=f"잠시 후에 다시 응원할 수 있습니다. ({remaining}분 후)"
+        )
 
     # 쓰로틀링 통과 - 응원 전송
-    _cheer_throttle[user_id][friend_id] = now
 
-    friend = store.get_user_by_id(friend_id)
+    friend = await async_store.get_user_by_id(friend_id)
     if friend:
-        store.add_notification(
+        await async_store.add_notification(
             friend_id,
             f"{current_user['name']}님이 응원합니다! 💪"
         )
@@ -4,36 +4,61 @@
 from fastapi import APIRouter, Depends
 from typing import Dict
 from datetime import date
+import asyncio
 
-from services.store import store
+from services.store import async_store
 from utils.logger import log_request, log_stage, log_navigation
 from .auth import get_current_user
+from .friends import friend_list
+from .notifications import notification_lists
+from .plans import load_current_plan, plan_titles_for_scope, review_items, yesterday_review
 
 router = APIRouter(prefix="/home", tags=["Home"])
 
 
+async def _header(current_user: Dict) -> Dict:
+    user_id = current_user['user_id']
+    # 오늘 진행률은 daily_progress 집계에서 바로 조회
+    rates = await async_store.get_today_rates([user_id], date.today().isoformat())
+    return {
+        "name": current_user['name'],
+        "todayProgress": rates.get(user_id, 0)
+    }
+
+
 @router.get("/header")
 async def get_home_header(current_user: Dict = Depends(get_current_user)):
     log_request("GET /home/header", current_user['name'])
     log_stage(3, "홈 화면", current_user['name'])
     log_navigation(current_user['name'], "홈 화면")
 
+    return await _header(current_user)
+
+
+@router.get("/dashboard")
+async def get_home_dashboard(scope: str = "daily", current_user: Dict = Depends(get_current_user)):
+    """앱 시작 시 필요한 데이터를 한 번에 반환
+
+    /home/header, /plans, /plans/review, /plans/yesterday_review, /notifications, /friends
+    응답을 같은 형식 그대로 묶음 - 인증 1회, 현재 계획 로드 1회
+    """
+    log_request("GET /home/dashboard", current_user['name'], f"scope={scope}")
+    log_stage(3, "홈 화면", current_user['name'])
+    log_navigation(current_user['name'], "홈 화면")
+
     user_id = current_user['user_id']
-    plans = store.plans.get(user_id, [])
-
-    today_progress = 0
-    if plans:
-        current_plan = plans[-1]
-        if 'daily_schedule' in current_plan:
-            today_str = date.today().isoformat()
-            for day in current_plan['daily_schedule']:
-                if day['date'] == today_str:
-                    total = len(day['tasks'])
-                    completed = sum(1 for t in day['tasks'] if t.get('completed', False))
-                    today_progress = int((completed / total * 100) if total > 0 else 0)
-                    break
+    header, current_plan, notifications, friends = await asyncio.gather(
+        _header(current_user),
+        load_current_plan(user_id),
+        notification_lists(user_id),
+        friend_list(user_id),
+    )
 
     return {
-        "name": current_user['name'],
-        "todayProgress": today_progress
+        "header": header,
+        "plans": plan_titles_for_scope(current_plan, scope),
+        "review": review_items(current_plan),
+        "yesterday_review": yesterday_review(current_plan),
+        "notifications": notifications,
+        "friends": friends,
     }
@@ -4,7 +4,7 @@
 from fastapi import APIRouter, Depends
 from typing import Dict
 
-from services.store import store
+from services.store import async_store
 from utils.logger import log_request, log_stage, log_success, log_navigation
 from .auth import get_current_user
 
@@ -17,8 +17,12 @@ async def get_notifications(current_user: Dict = Depends(get_current_user)):
     log_stage(9, "알림 확인", current_user['name'])
     log_navigation(current_user['name'], "알림 화면")
 
-    user_id = current_user['user_id']
-    notifications = store.get_notifications(user_id)
+    return await notification_lists(current_user['user_id'])
+
+
+async def notification_lists(user_id: str) -> Dict:
+    """새 알림 / 읽은 알림 목록"""
+    notifications = await async_store.get_notifications(user_id)
 
     return {
         "new_alerts": notifications.get('new', []),
@@ -29,7 +33,7 @@ async def get_notifications(current_user: Dict = Depends(get_current_user)):
 @router.post("/read")
 async def mark_notifications_read(current_user: Dict = Depends(get_current_user)):
     user_id = current_user['user_id']
-    store.mark_notifications_read(user_id)
+    await async_store.mark_notifications_read(user_id)
 
     log_success("알림 읽음 처리 완료")
     return {"success": True}
@@ -2,38 +2,22 @@
 """계획 적용 관련 라우터 - 강좌 커리큘럼 기반 학습 계획 생성"""
 
 from fastapi import APIRouter, Depends
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+import asyncio
 import uuid
 
 from models.schemas import ApplyRecommendationRequest
-from services.store import store
+from services.store import async_store
 from services.gpt_service import call_gpt, extract_json
-from services.web_search import search_materials_for_topic
+from services.web_search import attach_materials
+from services.plan_jobs import plan_jobs, PlanJob
 from utils.logger import log_request, log_success, log_error, log_navigation, log_info
 from .auth import get_current_user
 
 router = APIRouter(prefix="/plan", tags=["Plan"])
 
 
-def _get_materials_for_task(topic: str) -> dict:
-    """태스크에 대한 학습 자료 검색"""
-    try:
-        return search_materials_for_topic(topic)
-    except Exception as e:
-        log_info(f"웹 검색 실패, 기본 URL 사용: {e}")
-        from urllib.parse import quote_plus
-        search_query = quote_plus(topic)
-        default_materials = [
-            {"title": f"{topic} 강의 영상", "type": "유튜브", "url": f"https://www.youtube.com/results?search_query={search_query}+강의", "description": "유튜브에서 검색"},
-            {"title": f"{topic} 블로그 글", "type": "블로그", "url": f"https://www.google.com/search?q={search_query}+블로그", "description": "구글에서 검색"},
-        ]
-        return {
-            "related_materials": default_materials,
-            "review_materials": default_materials
-        }
-
-
 def _flatten_curriculum(curriculum) -> List[Dict]:
     """커리큘럼을 평탄화하여 모든 강의 목록 추출"""
     all_lessons = []
@@ -72,13 +56,14 @@ def _flatten_curriculum(curriculum) -> List[Dict]:
     return all_lessons
 
 
-def _create_plan_with_gpt(
+async def _create_plan_with_gpt(
     course: Dict,
     skill: str,
     hour_per_day: float,
     start_date: str,
     rest_days: List[str],
-    level: str
+    level: str,
+    job: Optional[PlanJob] = None
 ) -> Dict:
     """GPT를 사용하여 커리큘럼 기반 학습 계획 생성"""
 
@@ -174,23 +159,28 @@ def _create_plan_with_gpt(
 
 지금 바로 JSON을 출력하세요:"""
 
-    response = call_gpt(prompt, use_search=False)
+    if job:
+        job.set_stage("gpt")
+    response = await call_gpt(prompt, use_search=False)
     data = extract_json(response)
 
     if data and 'daily_schedule' in data:
         log_success("GPT 학습 계획 생성 성공")
         # 각 태스크에 UUID와 학습 자료 추가
-        for day in data['daily_schedule']:
+        material_items = []
+        for day_index, day in enumerate(data['daily_schedule']):
             for task in day['tasks']:
                 if 'id' not in task or not task['id'].startswith('uuid'):
                     task['id'] = str(uuid.uuid4())
                 if 'completed' not in task:
                     task['completed'] = False
-                # 학습 자료 검색
-                search_topic = f"{skill} {task.get('title', '')}"
-                materials = _get_materials_for_task(search_topic)
-                task['related_materials'] = materials.get('related_materials', [])
-                task['review_materials'] = materials.get('review_materials', [])
+                material_items.append((day_index, task, f"{skill} {task.get('title', '')}"))
+
+        # 학습 자료 검색 (중복 제거 + 병렬, blocking HTTP는 스레드에서)
+        if job:
+            job.set_stage("materials")
+            job.set_totals(days=len({i for i, _, _ in material_items}), tasks=len(material_items))
+        await asyncio.to_thread(attach_materials, material_items, job)
 
         # 강좌 정보 추가
         data['course_info'] = {
@@ -211,9 +201,13 @@ def _create_plan_from_curriculum(
     hour_per_day: float,
     start_date: str,
     rest_days: List[str],
-    level: str
+    level: str,
+    job: Optional[PlanJob] = None
 ) -> Dict:
-    """커리큘럼을 기반으로 학습 계획 생성 (폴백용) - 하루 2~5개 태스크 포함"""
+    """커리큘럼을 기반으로 학습 계획 생성 (폴백용) - 하루 2~5개 태스크 포함
+
+    웹 검색을 블로킹으로 수행하므로 이벤트 루프에서는 asyncio.to_thread로 호출
+    """
 
     course_title = course.get('title', '학습 강좌')
     curriculum = course.get('curriculum', course.get('syllabus', []))
@@ -247,6 +241,7 @@ def _create_plan_from_curriculum(
     # 최대 4주(28일) 동안 배정
     max_days = 28
     days_count = 0
+    material_items = []
 
     # 태스크 타입별 시간 분배 템플릿
     def _get_task_time(task_type: str, hour_per_day: float) -> str:
@@ -283,12 +278,8 @@ def _create_plan_from_curriculum(
             section_name = lesson_data["section"]
             description = lesson_data.get("description", "")
 
-            # 학습 자료 검색
-            search_topic = f"{skill} {lesson_title}"
-            materials = _get_materials_for_task(search_topic)
-
-            # 1. 메인 강의 태스크
-            day_tasks.append({
+            # 1. 메인 강의 태스크 (학습 자료는 아래에서 일괄 검색)
+            lecture_task = {
                 "id": str(uuid.uuid4()),
                 "title": f"📹 {lesson_title}",
                 "description": f"[{section_name}] {description}" if description else f"[{section_name}] {lesson_title} 강의 시청",
@@ -296,9 +287,9 @@ def _create_plan_from_curriculum(
                 "completed": False,
                 "section": section_name,
                 "task_type": "lecture",
-                "related_materials": materials.get('related_materials', []),
-                "review_materials": materials.get('review_materials', [])
-            })
+            }
+            day_tasks.append(lecture_task)
+            material_items.append((len(schedule), lecture_task, f"{skill} {lesson_title}"))
 
             # 2. 실습 태스크 추가
             day_tasks.append({
@@ -367,6 +358,12 @@ def _create_plan_from_curriculum(
         current_date += timedelta(days=1)
         days_count += 1
 
+    # 메인 강의 학습 자료 일괄 검색 (중복 제거 + 병렬)
+    if job:
+        job.set_stage("materials")
+        job.set_totals(days=len(schedule), tasks=len(material_items))
+    attach_materials(material_items, job)
+
     # 계획 기간 계산
     if schedule:
         total_days = (datetime.fromisoformat(schedule[-1]["date"]) - datetime.fromisoformat(schedule[0]["date"])).days + 1
@@ -388,12 +385,20 @@ def _create_plan_from_curriculum(
     }
 
 
-@router.post("/apply_recommendation")
+@router.post("/apply_recommendation", status_code=202)
 async def apply_recommendation(request: ApplyRecommendationRequest, current_user: Dict = Depends(get_current_user)):
-    """선택한 강좌의 커리큘럼을 기반으로 GPT가 학습 계획 생성"""
+    """선택한 강좌 기반 계획 생성 작업 등록 - job_id를 즉시 반환하고 GET /plans/jobs/{job_id}로 조회"""
     log_request("POST /plan/apply_recommendation", current_user['name'])
 
     user_id = current_user['user_id']
+    user_name = current_user['name']
+    job = plan_jobs.submit(user_id, "apply_recommendation", lambda job: _run_apply_job(job, request, user_id, user_name))
+
+    return {"success": True, "job_id": job.job_id, "state": job.state, "status_url": f"/plans/jobs/{job.job_id}"}
+
+
+async def _run_apply_job(job: PlanJob, request: ApplyRecommendationRequest, user_id: str, user_name: str) -> Dict:
+    """GPT 계획 생성 → 커리큘럼 단순 배치 → GPT 프롬프트 순으로 시도 (백그라운드 워커에서 실행)"""
     course = request.selected_course
 
     log_info(f"선택 강좌: {course.get('title', 'Unknown')}")
@@ -402,39 +407,44 @@ async def apply_recommendation(request: ApplyRecommendationRequest, current_user
 
     # 1차: GPT로 학습 계획 생성 (우선)
     log_info("GPT로 학습 계획 생성 시도...")
-    plan = _create_plan_with_gpt(
+    plan = await _create_plan_with_gpt(
         course=course,
         skill=request.skill,
         hour_per_day=request.hourPerDay,
         start_date=request.startDate,
         rest_days=request.restDays,
-        level=request.quiz_level
+        level=request.quiz_level,
+        job=job
     )
 
     if plan and plan.get('daily_schedule'):
-        store.plans[user_id].append(plan)
+        job.set_stage("saving")
+        await async_store.add_plan(user_id, plan)
         log_success(f"GPT 기반 계획 생성 완료: {plan.get('plan_name')}")
         log_info(f"총 {len(plan['daily_schedule'])}일, {sum(len(d['tasks']) for d in plan['daily_schedule'])}개 태스크")
-        log_navigation(current_user['name'], "홈 화면")
-        return {"success": True, "plan": plan}
+        log_navigation(user_name, "홈 화면")
+        return plan
 
     # 2차: 폴백 - 커리큘럼 기반 단순 배치
     log_info("GPT 계획 생성 실패, 커리큘럼 기반 단순 배치로 폴백")
-    plan = _create_plan_from_curriculum(
+    plan = await asyncio.to_thread(
+        _create_plan_from_curriculum,
         course=course,
         skill=request.skill,
         hour_per_day=request.hourPerDay,
         start_date=request.startDate,
         rest_days=request.restDays,
-        level=request.quiz_level
+        level=request.quiz_level,
+        job=job
     )
 
     if plan and plan.get('daily_schedule'):
-        store.plans[user_id].append(plan)
+        job.set_stage("saving")
+        await async_store.add_plan(user_id, plan)
         log_success(f"커리큘럼 기반 계획 생성 완료: {plan.get('plan_name')}")
         log_info(f"총 {len(plan['daily_schedule'])}일, {sum(len(d['tasks']) for d in plan['daily_schedule'])}개 태스크")
-        log_navigation(current_user['name'], "홈 화면")
-        return {"success": True, "plan": plan}
+        log_navigation(user_name, "홈 화면")
+        return plan
 
     # 3차: 최종 폴백 - GPT 프롬프트로 생성
     log_info("커리큘럼 없음, GPT 프롬프트로 계획 생성 시도")
@@ -487,25 +497,30 @@ async def apply_recommendation(request: ApplyRecommendationRequest, current_user
 ```
 """
 
-    response = call_gpt(prompt, use_search=False)
+    job.set_stage("gpt")
+    response = await call_gpt(prompt, use_search=False)
     data = extract_json(response)
 
     if data and 'daily_schedule' in data:
-        for day in data['daily_schedule']:
+        material_items = []
+        for day_index, day in enumerate(data['daily_schedule']):
             for task in day['tasks']:
                 if 'id' not in task:
                     task['id'] = str(uuid.uuid4())
                 if 'completed' not in task:
                     task['completed'] = False
-                # 학습 자료 추가
-                materials = _get_materials_for_task(task.get('title', request.skill))
-                task['related_materials'] = materials.get('related_materials', [])
-                task['review_materials'] = materials.get('review_materials', [])
+                material_items.append((day_index, task, task.get('title', request.skill)))
 
-        store.plans[user_id].append(data)
+        # 학습 자료 추가 (중복 제거 + 병렬)
+        job.set_stage("materials")
+        job.set_totals(days=len({i for i, _, _ in material_items}), tasks=len(material_items))
+        await asyncio.to_thread(attach_materials, material_items, job)
+
+        job.set_stage("saving")
+        await async_store.add_plan(user_id, data)
         log_success("GPT 기반 계획 생성 완료")
-        log_navigation(current_user['name'], "홈 화면")
-        return {"success": True, "plan": data}
+        log_navigation(user_name, "홈 화면")
+        return data
 
     log_error("계획 생성 실패")
-    return {"success": False, "message": "계획 생성에 실패했습니다."}
+    raise RuntimeError("계획 생성에 실패했습니다.")
@@ -2,19 +2,24 @@
 """학습 계획 관련 라우터"""
 
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict
+from typing import Dict, List, Optional
 from datetime import datetime, date, timedelta
+import asyncio
 import uuid
 
-from models.schemas import PlanGenerateRequest, ApplyRecommendationRequest
-from services.store import store
-from services.gpt_service import call_gpt, extract_json
-from services.web_search import search_materials_for_topic
+from models.schemas import PlanGenerateRequest, ActivePlanRequest, BulkTaskUpdateRequest
+from services.store import async_store
+from services.gpt_service import call_gpt, call_gpt_json, extract_json
+from services.web_search import attach_materials
+from services.plan_jobs import plan_jobs, PlanJob
 from utils.logger import log_request, log_stage, log_success, log_navigation, log_info
 from .auth import get_current_user
 
 router = APIRouter(prefix="/plans", tags=["Plans"])
 
+# 일괄 태스크 업데이트 1회 요청의 최대 항목 수
+BULK_TASK_UPDATE_MAX_ITEMS = 500
+
 
 @router.get("/all")
 async def get_all_plans(current_user: Dict = Depends(get_current_user)):
@@ -22,13 +27,33 @@ async def get_all_plans(current_user: Dict = Depends(get_current_user)):
     log_request("GET /plans/all", current_user['name'])
 
     user_id = current_user['user_id']
-    plans = store.plans.get(user_id, [])
+    plans = await async_store.get_plans(user_id)
 
     return plans
 
 
+@router.get("/active")
+async def get_active_plan(current_user: Dict = Depends(get_current_user)):
+    """현재 계획 정보 (일정 제외)"""
+    user_id = current_user['user_id']
+    plan_id = await async_store.get_active_plan_id(user_id)
+    return {"plan_id": plan_id}
+
+
+@router.post("/active")
+async def set_active_plan(request: ActivePlanRequest, current_user: Dict = Depends(get_current_user)):
+    """현재 계획 변경 - 홈/복습/날짜별 조회가 이 계획을 기준으로 동작"""
+    log_request("POST /plans/active", current_user['name'], f"plan_id={request.plan_id}")
+
+    if not await async_store.set_active_plan(current_user['user_id'], request.plan_id):
+        raise HTTPException(status_code=404, detail="계획을 찾을 수 없습니다.")
+
+    log_success(f"현재 계획 변경: {request.plan_id}")
+    return {"success": True, "plan_id": request.plan_id}
+
+
 @router.get("/related_materials")
-async def get_related_materials(topic: str, current_user: Dict = Depends(get_current_user)):
+async def get_related_materials(topic: str, refresh: bool = False, current_user: Dict = Depends(get_current_user)):
     """특정 학습 주제에 대한 연관 자료 검색"""
     log_request("GET /plans/related_materials", current_user['name'], f"topic={topic}")
 
@@ -83,8 +108,7 @@ Return ONLY valid JSON. No markdown code blocks, no explanations.
 Now search and return verified materials for: "{topic}"
 """
 
-    response = call_gpt(prompt, use_search=True)
-    data = extract_json(response)
+    data = await call_gpt_json(prompt, use_search=True, cache_kind="related_materials", required_key="materials", refresh=refresh)
 
     if data and 'materials' in data:
         valid_materials = [m for m in data['materials'] if 'example' not in m.get('url', '').lower()]
@@ -104,7 +128,7 @@ Now search and return verified materials for: "{topic}"
 
 
 @router.get("/course_details")
-async def get_course_details(topic: str, current_user: Dict = Depends(get_current_user)):
+async def get_course_details(topic: str, refresh: bool = False, current_user: Dict = Depends(get_current_user)):
     """주제에 대한 상세 커리큘럼 정보 검색 (강의명, 목차, 영상 목록 포함)"""
     log_request("GET /plans/course_details", current_user['name'], f"topic={topic}")
 
@@ -199,8 +223,7 @@ For each course/playlist found, extract:
 Search and provide detailed curriculum information for: "{topic}"
 Output ONLY valid JSON."""
 
-    response = call_gpt(prompt, use_search=True)
-    data = extract_json(response)
+    data = await call_gpt_json(prompt, use_search=True, cache_kind="course_details", required_key="courses", refresh=refresh)
 
     if data and ('courses' in data or 'youtube_playlists' in data):
         log_success(f"상세 커리큘럼 정보 검색 완료")
@@ -222,17 +245,11 @@ Output ONLY valid JSON."""
     }
 
 
-@router.get("")
-async def get_plans(scope: str = "daily", current_user: Dict = Depends(get_current_user)):
-    log_request("GET /plans", current_user['name'], f"scope={scope}")
-
-    user_id = current_user['user_id']
-    plans = store.plans.get(user_id, [])
-
-    if not plans:
+def plan_titles_for_scope(current_plan: Optional[Dict], scope: str = "daily") -> List[str]:
+    """현재 계획에서 범위(daily/weekly/monthly)에 해당하는 태스크 제목 목록"""
+    if not current_plan:
         return []
 
-    current_plan = plans[-1]
     today = date.today()
     result = []
 
@@ -254,15 +271,11 @@ async def get_plans(scope: str = "daily", current_user: Dict = Depends(get_curre
     return result
 
 
-@router.get("/review")
-async def get_review_plans(current_user: Dict = Depends(get_current_user)):
-    user_id = current_user['user_id']
-    plans = store.plans.get(user_id, [])
-
-    if not plans:
+def review_items(current_plan: Optional[Dict]) -> List[Dict]:
+    """현재 계획에서 어제 완료한 태스크 (복습 항목)"""
+    if not current_plan:
         return []
 
-    current_plan = plans[-1]
     yesterday = (date.today() - timedelta(days=1)).isoformat()
 
     result = []
@@ -276,18 +289,11 @@ async def get_review_plans(current_user: Dict = Depends(get_current_user)):
     return result
 
 
-@router.get("/yesterday_review")
-async def get_yesterday_review(current_user: Dict = Depends(get_current_user)):
-    """어제 학습 내용 기반 복습 자료 반환 (유튜브 1개 + 블로그 1개)"""
-    log_request("GET /plans/yesterday_review", current_user['name'])
-
-    user_id = current_user['user_id']
-    plans = store.plans.get(user_id, [])
-
-    if not plans:
+def yesterday_review(current_plan: Optional[Dict]) -> Dict:
+    """현재 계획의 어제 학습 내용 기반 복습 자료 (유튜브 1개 + 블로그 1개)"""
+    if not current_plan:
         return {"has_review": False, "materials": [], "yesterday_topic": ""}
 
-    current_plan = plans[-1]
     yesterday = (date.today() - timedelta(days=1)).isoformat()
 
     # 어제 학습한 내용 찾기
@@ -327,32 +333,58 @@ async def get_yesterday_review(current_user: Dict = Depends(get_current_user)):
     }
 
 
-def _get_materials_for_task(topic: str) -> dict:
-    """태스크에 대한 학습 자료 검색 (웹 검색 API 사용)"""
-    try:
-        return search_materials_for_topic(topic)
-    except Exception as e:
-        log_info(f"웹 검색 실패, 기본 URL 사용: {e}")
-        # 실패 시 기본 검색 URL
-        from urllib.parse import quote_plus
-        search_query = quote_plus(topic)
-        default_materials = [
-            {"title": f"{topic} 강의 영상", "type": "유튜브", "url": f"https://www.youtube.com/results?search_query={search_query}+강의", "description": "유튜브에서 검색"},
-            {"title": f"{topic} 블로그 글", "type": "블로그", "url": f"https://www.google.com/search?q={search_query}+블로그", "description": "구글에서 검색"},
-        ]
-        return {
-            "related_materials": default_materials,
-            "review_materials": default_materials
-        }
+async def load_current_plan(user_id: str) -> Optional[Dict]:
+    """사용자의 현재 계획 (없으면 None) - 다른 계획의 일정은 읽지 않음"""
+    return await async_store.get_active_plan(user_id)
+
+
+@router.get("")
+async def get_plans(scope: str = "daily", current_user: Dict = Depends(get_current_user)):
+    log_request("GET /plans", current_user['name'], f"scope={scope}")
+
+    current_plan = await load_current_plan(current_user['user_id'])
+    return plan_titles_for_scope(current_plan, scope)
 
 
-@router.post("/generate")
+@router.get("/review")
+async def get_review_plans(current_user: Dict = Depends(get_current_user)):
+    current_plan = await load_current_plan(current_user['user_id'])
+    return review_items(current_plan)
+
+
+@router.get("/yesterday_review")
+async def get_yesterday_review(current_user: Dict = Depends(get_current_user)):
+    """어제 학습 내용 기반 복습 자료 반환 (유튜브 1개 + 블로그 1개)"""
+    log_request("GET /plans/yesterday_review", current_user['name'])
+
+    current_plan = await load_current_plan(current_user['user_id'])
+    return yesterday_review(current_plan)
+
+
+@router.post("/generate", status_code=202)
 async def generate_plan(request: PlanGenerateRequest, current_user: Dict = Depends(get_current_user)):
+    """계획 생성 작업 등록 - job_id를 즉시 반환하고 GET /plans/jobs/{job_id}로 진행 상황 조회"""
     log_request("POST /plans/generate", current_user['name'], f"skill={request.skill}")
     log_stage(7, "계획 생성", current_user['name'])
 
     user_id = current_user['user_id']
+    user_name = current_user['name']
+    job = plan_jobs.submit(user_id, "generate", lambda job: _run_generate_job(job, request, user_id, user_name))
+
+    return {"job_id": job.job_id, "state": job.state, "status_url": f"/plans/jobs/{job.job_id}"}
+
+
+@router.get("/jobs/{job_id}")
+async def get_plan_job(job_id: str, current_user: Dict = Depends(get_current_user)):
+    """계획 생성 작업 상태/진행률/완성된 계획 조회"""
+    job = await plan_jobs.snapshot(job_id, current_user['user_id'])
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job
 
+
+async def _run_generate_job(job: PlanJob, request: PlanGenerateRequest, user_id: str, user_name: str) -> Dict:
+    """GPT 계획 생성 + 태스크별 학습 자료 검색 + 저장 (백그라운드 워커에서 실행)"""
     # 쉬는 요일 처리 - 프론트에서 '월', '화' 형식으로 오므로 그대로 사용
     rest_days_str = ', '.join(request.restDays) if request.restDays else '없음'
     rest_days_list = request.restDays if request.restDays else []
@@ -445,7 +477,8 @@ Adjust depth based on learner level: {request.selfLevel}
 
 Output ONLY the JSON object. No markdown, no explanations."""
 
-    response = call_gpt(prompt, use_search=False)
+    job.set_stage("gpt")
+    response = await call_gpt(prompt, use_search=False)
     data = extract_json(response)
 
     if data and 'daily_schedule' in data:
@@ -462,7 +495,8 @@ Output ONLY the JSON object. No markdown, no explanations."""
                 filtered_schedule.append(day)  # 날짜 파싱 실패시 일단 포함
         data['daily_schedule'] = filtered_schedule
         log_info("학습 자료 검색 시작...")
-        for day in data['daily_schedule']:
+        material_items = []
+        for day_index, day in enumerate(data['daily_schedule']):
             for task in day['tasks']:
                 if 'id' not in task:
                     task['id'] = str(uuid.uuid4())
@@ -470,19 +504,24 @@ Output ONLY the JSON object. No markdown, no explanations."""
                     task['completed'] = False
                 # 각 태스크에 연관 자료 미리 추가 (웹 검색 API 사용)
                 if 'related_materials' not in task or 'review_materials' not in task:
-                    materials = _get_materials_for_task(task.get('title', request.skill))
-                    task['related_materials'] = materials.get('related_materials', [])
-                    task['review_materials'] = materials.get('review_materials', [])
+                    material_items.append((day_index, task, task.get('title', request.skill)))
 
-        store.plans[user_id].append(data)
+        # 중복 제거 + 병렬 검색 (블로킹 HTTP는 스레드에서)
+        job.set_stage("materials")
+        job.set_totals(days=len({i for i, _, _ in material_items}), tasks=len(material_items))
+        await asyncio.to_thread(attach_materials, material_items, job)
+
+        job.set_stage("saving")
+        await async_store.add_plan(user_id, data)
         log_success(f"학습 계획 생성 완료: {data.get('plan_name', 'Unknown')}")
-        log_navigation(current_user['name'], "퀴즈 화면")
+        log_navigation(user_name, "퀴즈 화면")
         return data
 
     # 기본 계획 생성
     start = datetime.strptime(request.startDate.split('T')[0], '%Y-%m-%d').date()
     schedule = []
     day_names = ['월', '화', '수', '목', '금', '토', '일']
+    material_items = []
 
     for i in range(28):
         current_date = start + timedelta(days=i)
@@ -492,29 +531,31 @@ Output ONLY the JSON object. No markdown, no explanations."""
             continue
 
         task_title = f"{request.skill} 학습 Day {len(schedule) + 1}"
-        materials = _get_materials_for_task(task_title)
+        task = {
+            "id": str(uuid.uuid4()),
+            "title": task_title,
+            "description": f"{request.skill} 학습을 진행합니다.",
+            "duration": f"{request.hourPerDay}시간",
+            "completed": False,
+        }
+        material_items.append((len(schedule), task, task_title))
         schedule.append({
             "date": current_date.isoformat(),
-            "tasks": [
-                {
-                    "id": str(uuid.uuid4()),
-                    "title": task_title,
-                    "description": f"{request.skill} 학습을 진행합니다.",
-                    "duration": f"{request.hourPerDay}시간",
-                    "completed": False,
-                    "related_materials": materials.get('related_materials', []),
-                    "review_materials": materials.get('review_materials', [])
-                }
-            ]
+            "tasks": [task]
         })
 
+    job.set_stage("materials")
+    job.set_totals(days=len(schedule), tasks=len(material_items))
+    await asyncio.to_thread(attach_materials, material_items, job)
+
     plan = {
         "plan_name": f"{request.skill} 학습 계획",
         "total_duration": "4주",
         "daily_schedule": schedule
     }
 
-    store.plans[user_id].append(plan)
+    job.set_stage("saving")
+    await async_store.add_plan(user_id, plan)
     log_success(f"기본 학습 계획 생성 완료")
     return plan
 
@@ -527,22 +568,19 @@ async def get_plans_by_date(
     """특정 날짜의 상세 계획 조회"""
     log_request("GET /plans/date", current_user['name'], f"date={target_date}")
 
-    user_id = current_user['user_id']
-    plans = store.plans.get(user_id, [])
+    # 현재 계획의 해당 날짜만 조회
+    current_plan = await async_store.get_active_plan_day(current_user['user_id'], target_date)
 
-    if not plans:
+    if not current_plan:
         return {"date": target_date, "tasks": [], "message": "아직 학습 계획이 없습니다."}
 
-    current_plan = plans[-1]
-
-    for day in current_plan.get('daily_schedule', []):
-        if day['date'] == target_date:
-            return {
-                "date": target_date,
-                "tasks": day['tasks'],
-                "plan_name": current_plan.get('plan_name', '학습 계획'),
-                "message": None
-            }
+    if current_plan['tasks'] is not None:
+        return {
+            "date": target_date,
+            "tasks": current_plan['tasks'],
+            "plan_name": current_plan.get('plan_name', '학습 계획'),
+            "message": None
+        }
 
     return {"date": target_date, "tasks": [], "message": "해당 날짜에 계획이 없습니다."}
 
@@ -557,14 +595,29 @@ async def update_task(
     user_id = current_user['user_id']
 
     # store의 update_task를 사용하여 DB에 영구 저장
-    success = store.update_task(user_id, date, task_id, completed)
+    success = await async_store.update_task(user_id, date, task_id, completed)
 
     if success:
-        # 메모리 캐시도 무효화 (다음 조회 시 DB에서 다시 로드)
-        if hasattr(store.plans, '_cache') and user_id in store.plans._cache:
-            del store.plans._cache[user_id]
-
         log_success(f"태스크 업데이트: {task_id} → {'완료' if completed else '미완료'}")
         return {"success": True}
 
     raise HTTPException(status_code=404, detail="Task not found")
+
+
+@router.post("/tasks/bulk")
+async def update_tasks_bulk(request: BulkTaskUpdateRequest, current_user: Dict = Depends(get_current_user)):
+    """태스크 완료 상태 일괄 업데이트 (오프라인 중 쌓인 변경 동기화용) - 한 트랜잭션, 항목별 결과 반환"""
+    log_request("POST /plans/tasks/bulk", current_user['name'], f"items={len(request.updates)}")
+
+    if len(request.updates) > BULK_TASK_UPDATE_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {BULK_TASK_UPDATE_MAX_ITEMS}개까지 업데이트할 수 있습니다.")
+
+    results = await async_store.update_tasks(
+        current_user['user_id'],
+        [item.model_dump() for item in request.updates]
+    )
+    updated = sum(1 for r in results if r['changed'])
+    failed = sum(1 for r in results if not r['success'])
+    log_success(f"태스크 일괄 업데이트: {updated}개 변경, {failed}개 없음")
+
+    return {"success": failed == 0, "updated": updated, "failed": failed, "results": results}
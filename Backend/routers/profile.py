@@ -3,10 +3,9 @@
 
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict
-import hashlib
 
 from models.schemas import ProfileUpdateRequest
-from services.store import store
+from services.store import async_store
 from utils.logger import log_request, log_stage, log_success, log_navigation
 from .auth import get_current_user
 
@@ -33,20 +32,18 @@ async def get_profile(current_user: Dict = Depends(get_current_user)):
 async def update_profile(request: ProfileUpdateRequest, current_user: Dict = Depends(get_current_user)):
     log_request("POST /profile/update", current_user['name'])
 
-    user = store.users.get(request.user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    if request.email:
-        user['email'] = request.email
-    if request.name:
-        user['name'] = request.name
-    if request.birth:
-        user['birth'] = request.birth
-    if request.photo_url:
-        user['photo_url'] = request.photo_url
-    if request.password:
-        user['password'] = hashlib.sha256(request.password.encode()).hexdigest()
+    if request.user_id != current_user['user_id']:
+        raise HTTPException(status_code=403, detail="본인 프로필만 수정할 수 있습니다.")
+
+    # DB 반영 + 인증 캐시의 사용자 정보 무효화
+    await async_store.update_user(
+        current_user['user_id'],
+        email=request.email,
+        name=request.name,
+        birth=request.birth,
+        photo_url=request.photo_url,
+        password=request.password,
+    )
 
     log_success(f"프로필 업데이트 완료: {current_user['name']}")
     return {"success": True}
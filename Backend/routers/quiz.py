@@ -2,22 +2,34 @@
 """퀴즈 관련 라우터"""
 
 from fastapi import APIRouter, Depends
-from typing import Dict
+from typing import Dict, List
+import asyncio
+import os
 
 from models.schemas import QuizSubmitRequest
-from services.store import store
-from services.gpt_service import call_gpt, extract_json
+from services.shared_state import shared_state
+from services.gpt_service import call_gpt_json
 from utils.logger import log_request, log_stage, log_success, log_navigation
 from .auth import get_current_user
 
 router = APIRouter(prefix="/quiz", tags=["Quiz"])
 
+# 최근 출제한 퀴즈 정답 보관 시간(초) - 출제와 채점이 다른 워커로 가도 되도록 공유 상태에 저장
+QUIZ_ANSWERS_TTL = float(os.getenv("QUIZ_ANSWERS_TTL", "86400"))
+
+
+async def save_quiz_answers(user_id: str, quizzes: List[Dict]):
+    """채점에 필요한 id/정답만 저장 (사용자당 최근 1세트)"""
+    answers = [{"id": q.get("id"), "answerKey": q.get("answerKey", "")} for q in quizzes]
+    await asyncio.to_thread(shared_state.set, f"quiz_answers:{user_id}", answers, QUIZ_ANSWERS_TTL)
+
 
 @router.get("/items")
 async def get_quiz_items(
     skill: str = "general",
     level: str = "초급",
     limit: int = 10,
+    refresh: bool = False,
     current_user: Dict = Depends(get_current_user)
 ):
     log_request("GET /quiz/items", current_user['name'], f"skill={skill}, level={level}, limit={limit}")
@@ -91,11 +103,10 @@ SCHEMA RULES:
 
 Generate quiz now. Output JSON only."""
 
-    response = call_gpt(prompt, use_search=False)
-    data = extract_json(response)
+    data = await call_gpt_json(prompt, use_search=False, cache_kind="quiz", required_key="quizzes", refresh=refresh)
 
     if data and 'quizzes' in data:
-        store.quiz_answers[current_user['user_id']] = data['quizzes']
+        await save_quiz_answers(current_user['user_id'], data['quizzes'])
         log_success(f"퀴즈 {len(data['quizzes'])}개 생성 완료")
         return data['quizzes']
 
@@ -112,7 +123,7 @@ Generate quiz now. Output JSON only."""
         {"id": 9, "type": "OX", "question": "IP 주소는 인터넷에서 컴퓨터를 식별하는 고유한 주소입니다.", "options": [], "answerKey": "O", "explanation": "정답입니다. IP(Internet Protocol) 주소는 네트워크상에서 각 장치를 식별하기 위한 고유한 숫자 주소입니다. 현재 IPv4(32비트, 예: 192.168.0.1)와 IPv6(128비트)가 함께 사용되고 있습니다."},
         {"id": 10, "type": "OX", "question": "클라우드 컴퓨팅은 인터넷 연결 없이도 사용할 수 있습니다.", "options": [], "answerKey": "X", "explanation": "틀립니다. 클라우드 컴퓨팅은 인터넷을 통해 원격 서버의 컴퓨팅 리소스(저장소, 처리 능력 등)를 사용하는 기술입니다. 따라서 기본적으로 인터넷 연결이 필수이며, 오프라인에서는 사용할 수 없습니다."},
     ]
-    store.quiz_answers[current_user['user_id']] = default_quizzes
+    await save_quiz_answers(current_user['user_id'], default_quizzes)
     return default_quizzes[:limit]
 
 
@@ -121,7 +132,7 @@ async def grade_quiz(request: QuizSubmitRequest, current_user: Dict = Depends(ge
     log_request("POST /quiz/grade", current_user['name'], f"answers={len(request.answers)}개")
     log_stage(5, "퀴즈 채점", current_user['name'])
 
-    saved_quizzes = store.quiz_answers.get(current_user['user_id'], [])
+    saved_quizzes = await asyncio.to_thread(shared_state.get, f"quiz_answers:{current_user['user_id']}") or []
     answer_map = {q['id']: q['answerKey'] for q in saved_quizzes}
 
     total = len(request.answers)
@@ -5,9 +5,8 @@ from fastapi import APIRouter, Depends
 from typing import Dict
 import uuid
 
-from models.schemas import SelectCourseRequest, ApplyRecommendationRequest
-from services.store import store
-from services.gpt_service import call_gpt, extract_json, get_search_status
+from models.schemas import SelectCourseRequest
+from services.gpt_service import call_gpt_json, get_search_status, track_user_search_status
 from utils.logger import log_request, log_stage, log_success, log_navigation, log_info
 from .auth import get_current_user
 
@@ -15,15 +14,16 @@ router = APIRouter(prefix="/recommend", tags=["Recommend"])
 
 
 @router.get("/search_status")
-async def get_current_search_status():
-    """현재 AI 검색 상태 반환 (프론트엔드 로딩 화면용)"""
-    return get_search_status()
+async def get_current_search_status(current_user: Dict = Depends(get_current_user)):
+    """현재 사용자의 AI 검색 상태 반환 (프론트엔드 로딩 화면용)"""
+    return await get_search_status(current_user['user_id'])
 
 
 @router.get("/courses")
 async def get_recommended_courses(
     skill: str = "programming",
     level: str = "초급",
+    refresh: bool = False,
     current_user: Dict = Depends(get_current_user)
 ):
     log_request("GET /recommend/courses", current_user['name'], f"skill={skill}, level={level}")
@@ -103,8 +103,8 @@ async def get_recommended_courses(
 
 JSON만 출력하세요."""
 
-    response = call_gpt(prompt, use_search=True)
-    data = extract_json(response)
+    await track_user_search_status(current_user['user_id'])
+    data = await call_gpt_json(prompt, use_search=True, cache_kind="recommend", required_key="recommendations", refresh=refresh)
 
     if data and 'error' not in data:
         # ai_summary 추출 (프론트에서 표시용)
@@ -5,8 +5,8 @@ from fastapi import APIRouter, Depends
 from typing import Dict, List
 from datetime import date, timedelta
 
-from services.store import store
-from services.gpt_service import call_gpt, extract_json
+from services.store import async_store
+from services.gpt_service import call_gpt_json
 from utils.logger import log_request, log_success, log_navigation, log_info
 from .auth import get_current_user
 
@@ -16,26 +16,22 @@ router = APIRouter(prefix="/review", tags=["Review"])
 @router.get("/yesterday")
 async def get_review_materials(
     user_id: str = None,
+    refresh: bool = False,
     current_user: Dict = Depends(get_current_user)
 ):
     log_request("GET /review/yesterday", current_user['name'])
     log_navigation(current_user['name'], "복습 화면")
 
     uid = user_id or current_user['user_id']
-    plans = store.plans.get(uid, [])
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    # 현재 계획의 어제 날짜만 조회
+    current_plan = await async_store.get_active_plan_day(uid, yesterday)
 
-    if not plans:
+    if not current_plan:
         log_info("학습 계획이 없습니다")
         return {"materials": [], "topics": [], "message": "아직 학습 계획이 없습니다."}
 
-    current_plan = plans[-1]
-    yesterday = (date.today() - timedelta(days=1)).isoformat()
-
-    completed_topics = []
-    for day in current_plan.get('daily_schedule', []):
-        if day['date'] == yesterday:
-            completed_topics = [t['title'] for t in day['tasks'] if t.get('completed', False)]
-            break
+    completed_topics = [t['title'] for t in current_plan['tasks'] or [] if t.get('completed', False)]
 
     if not completed_topics:
         log_info("어제 완료한 학습 항목이 없습니다")
@@ -89,8 +85,7 @@ async def get_review_materials(
 - 반드시 한국어 또는 영어로 된 실제 자료
 """
 
-    response = call_gpt(prompt, use_search=True)
-    data = extract_json(response)
+    data = await call_gpt_json(prompt, use_search=True, cache_kind="review", required_key="materials", refresh=refresh)
 
     if data and 'materials' in data:
         valid_materials = [m for m in data['materials'] if 'example' not in m.get('url', '').lower()]
@@ -122,22 +117,15 @@ async def get_yesterday_topics(
     """어제 완료한 학습 주제 목록 조회"""
     log_request("GET /review/topics", current_user['name'])
 
-    uid = current_user['user_id']
-    plans = store.plans.get(uid, [])
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    current_plan = await async_store.get_active_plan_day(current_user['user_id'], yesterday)
 
-    if not plans:
+    if not current_plan:
         return {"topics": [], "date": None}
 
-    current_plan = plans[-1]
-    yesterday = (date.today() - timedelta(days=1)).isoformat()
-
-    completed_topics = []
-    for day in current_plan.get('daily_schedule', []):
-        if day['date'] == yesterday:
-            completed_topics = [
-                {"title": t['title'], "completed": t.get('completed', False)}
-                for t in day['tasks']
-            ]
-            break
+    completed_topics = [
+        {"title": t['title'], "completed": t.get('completed', False)}
+        for t in current_plan['tasks'] or []
+    ]
 
     return {"topics": completed_topics, "date": yesterday}
@@ -0,0 +1,23 @@
+# Backend/routers/sync.py
+"""모바일 클라이언트 델타 동기화 라우터"""
+
+from fastapi import APIRouter, Depends
+from typing import Dict, Optional
+
+from services.store import async_store
+from utils.logger import log_request
+from .auth import get_current_user
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+@router.get("")
+async def sync_changes(since: Optional[int] = None, current_user: Dict = Depends(get_current_user)):
+    """since 커서 이후 변경된 계획/태스크/알림/친구만 반환
+
+    응답의 cursor를 다음 요청의 since로 사용합니다.
+    full=true면 전체 스냅샷이므로 로컬 데이터를 응답으로 교체해야 합니다 (최초 동기화 또는 오래된 커서).
+    """
+    log_request("GET /sync", current_user['name'], f"since={since}")
+
+    return await async_store.get_changes(current_user['user_id'], since)
@@ -0,0 +1,38 @@
+# Backend/scripts/backfill_daily_progress.py
+"""daily_progress 집계 테이블 재계산
+
+집계는 계획 저장/태스크 갱신 시 자동으로 유지되므로 평소에는 필요 없고,
+DB를 직접 수정했거나 소요 시간 파싱 규칙이 바뀐 경우에 실행합니다.
+
+사용법:
+    cd Backend
+    python scripts/backfill_daily_progress.py            # 전체 사용자
+    python scripts/backfill_daily_progress.py --user ID  # 한 사용자
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.store import store, DB_PATH  # noqa: E402
+from utils.logger import log_info, log_success  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="daily_progress 재계산")
+    parser.add_argument("--user", help="이 사용자만 재계산 (생략 시 전체)")
+    args = parser.parse_args()
+
+    log_info(f"daily_progress 재계산 시작: {DB_PATH}" + (f" (user={args.user})" if args.user else ""))
+    started = time.perf_counter()
+    rows = store.rebuild_daily_progress(args.user)
+    log_success(f"daily_progress {rows}행 재계산 완료 ({time.perf_counter() - started:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
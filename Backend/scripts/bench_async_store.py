@@ -0,0 +1,133 @@
+# Backend/scripts/bench_async_store.py
+"""동시 요청 처리량 벤치마크 - 동기 store 호출(이전) vs async_store(이후)
+
+인증된 요청 하나가 하는 DB 작업(사용자 조회 + 계획 조회 + 알림 조회, 계획 캐시 미사용)과
+짧은 네트워크 대기를 흉내 낸 코루틴을 동시에 실행하고,
+처리량 / 요청 지연 / 이벤트 루프 지연(heartbeat)을 비교합니다.
+
+사용법:
+    cd Backend
+    python scripts/bench_async_store.py --concurrency 50 --rounds 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_tmp_dir = tempfile.mkdtemp(prefix="palearn-bench-")
+os.environ["PALEARN_DB_PATH"] = os.path.join(_tmp_dir, "palearn.db")
+
+from services.store import store, async_store  # noqa: E402
+
+SAMPLE_USERS = ['sample-friend-001', 'sample-friend-002', 'sample-friend-003']
+
+
+def seed(days: int = 28, tasks_per_day: int = 5):
+    """샘플 사용자마다 28일 x 5개 태스크 계획 추가"""
+    for user_id in SAMPLE_USERS:
+        schedule = [
+            {
+                'date': f"2030-01-{(d % 28) + 1:02d}",
+                'tasks': [
+                    {'id': f"{user_id}-{d}-{t}", 'title': f"벤치마크 태스크 {d}-{t}", 'duration': '30분',
+                     'completed': False, 'related_materials': [{'title': 'x', 'url': 'https://example.org'}]}
+                    for t in range(tasks_per_day)
+                ]
+            }
+            for d in range(days)
+        ]
+        store.save_plan(user_id, "벤치마크 계획", "4주", schedule)
+        for i in range(10):
+            store.add_notification(user_id, f"벤치마크 알림 {i}")
+
+
+async def request_sync(user_id: str, io_wait: float):
+    """이전 방식: async 핸들러 안에서 동기 store 호출"""
+    store.get_user_by_id(user_id)
+    store.get_plans(user_id, use_cache=False)
+    store.get_notifications(user_id)
+    await asyncio.sleep(io_wait)
+
+
+async def request_async(user_id: str, io_wait: float):
+    """이후 방식: async_store await"""
+    await async_store.get_user_by_id(user_id)
+    await async_store.get_plans(user_id, use_cache=False)
+    await async_store.get_notifications(user_id)
+    await asyncio.sleep(io_wait)
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] if values else 0.0
+
+
+async def run(handler, concurrency: int, rounds: int, io_wait: float) -> dict:
+    latencies = []
+    lags = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        # 1ms마다 깨어나야 하는 코루틴 - 늦게 깨어난 만큼이 루프가 막힌 시간
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    async def worker(index: int):
+        user_id = SAMPLE_USERS[index % len(SAMPLE_USERS)]
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await handler(user_id, io_wait)
+            latencies.append(time.perf_counter() - start)
+
+    beat = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await beat
+
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "loop_lag_p99_ms": _percentile(lags, 0.99) * 1000,
+        "loop_lag_max_ms": max(lags) * 1000 if lags else 0.0,
+    }
+
+
+async def main(args):
+    seed()
+    io_wait = args.io_ms / 1000
+
+    # 워밍업 (커넥션/스레드 생성)
+    await run(request_async, 4, 2, io_wait)
+
+    results = {
+        "sync (이전)": await run(request_sync, args.concurrency, args.rounds, io_wait),
+        "async_store (이후)": await run(request_async, args.concurrency, args.rounds, io_wait),
+    }
+
+    print(f"\n동시성 {args.concurrency}, 코루틴당 {args.rounds}회, 네트워크 대기 {args.io_ms}ms")
+    print(f"{'mode':<20}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'lag p99':>10}{'lag max':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<20}{r['throughput']:>10.1f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['loop_lag_p99_ms']:>10.2f}{r['loop_lag_max_ms']:>10.2f}")
+    print(f"\nDB 풀: {store.pool_stats()}")
+    async_store.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="async_store 동시 처리량 벤치마크")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--io-ms", type=float, default=5.0, help="요청당 네트워크 대기 시뮬레이션(ms)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,116 @@
+# Backend/scripts/bench_login_storm.py
+"""로그인 폭주 부하 테스트 - bcrypt가 다른 요청 지연에 주는 영향
+
+수업 시작 시각처럼 로그인이 한꺼번에 몰리는 동안, 로그인과 무관한 요청(알림 + 현재 계획 조회)의
+지연을 측정합니다.
+
+- 폭주 없음: 기준 지연
+- 이전: DataStore.login을 DB 스레드 풀에서 실행 (bcrypt가 DB 스레드를 점유)
+- 이후: AsyncDataStore.login (DB 조회만 DB 스레드, bcrypt는 전용 워커 풀)
+
+사용법:
+    cd Backend
+    python scripts/bench_login_storm.py --logins 64 --concurrency 32 --cost 12
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_tmp_dir = tempfile.mkdtemp(prefix="palearn-bench-")
+os.environ["PALEARN_DB_PATH"] = os.path.join(_tmp_dir, "palearn.db")
+
+from services.store import store, async_store  # noqa: E402
+from services.password_hasher import password_hasher  # noqa: E402
+
+PROBE_USER = 'sample-friend-001'
+EMAIL = "storm@palearn.com"
+PASSWORD = "Storm123!"
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] if values else 0.0
+
+
+async def probe(stop: asyncio.Event, latencies: list, interval: float):
+    """로그인과 무관한 요청을 일정 간격으로 반복"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await async_store.get_notifications(PROBE_USER)
+        await async_store.get_active_plan(PROBE_USER)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def storm(mode: str, logins: int, concurrency: int) -> float:
+    """로그인 logins회를 concurrency개씩 동시에 실행, 소요 시간 반환"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            if mode == "이전":
+                result = await async_store.run(store.login, EMAIL, PASSWORD)
+            else:
+                result = await async_store.login(EMAIL, PASSWORD)
+            assert result, "로그인 실패"
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    return time.perf_counter() - start
+
+
+async def run_mode(mode: str, args) -> dict:
+    latencies = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop, latencies, args.interval))
+    if mode == "폭주 없음":
+        await asyncio.sleep(args.idle)
+        elapsed = 0.0
+    else:
+        elapsed = await storm(mode, args.logins, args.concurrency)
+    stop.set()
+    await probe_task
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": _percentile(latencies, 0.95) * 1000,
+        "max": max(latencies) * 1000,
+        "probes": len(latencies),
+        "logins_per_sec": args.logins / elapsed if elapsed else 0.0,
+    }
+
+
+async def main(args):
+    password_hasher.rounds = args.cost
+    store.create_user("storm", EMAIL, PASSWORD, "부하테스트", "2000-01-01")
+
+    results = {}
+    for mode in ("폭주 없음", "이전", "이후"):
+        results[mode] = await run_mode(mode, args)
+
+    print(f"\n로그인 {args.logins}회 (동시 {args.concurrency}), bcrypt cost {args.cost}, "
+          f"DB 스레드 {async_store._executor._max_workers}개 / bcrypt 워커 {password_hasher.workers}개")
+    print(f"{'mode':<12}{'probe p50':>12}{'probe p95':>12}{'probe max':>12}{'probes':>8}{'login/s':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<12}{r['p50']:>12.2f}{r['p95']:>12.2f}{r['max']:>12.2f}{r['probes']:>8}{r['logins_per_sec']:>10.1f}")
+    print(f"\nbcrypt 워커 풀: {password_hasher.stats()}")
+    async_store.shutdown()
+    password_hasher.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로그인 폭주 부하 테스트")
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--cost", type=int, default=12, help="bcrypt work factor")
+    parser.add_argument("--interval", type=float, default=0.01, help="무관한 요청 간격(초)")
+    parser.add_argument("--idle", type=float, default=1.0, help="폭주 없음 측정 시간(초)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
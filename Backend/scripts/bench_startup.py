@@ -0,0 +1,79 @@
+# Backend/scripts/bench_startup.py
+"""서버 시작 시간 측정 - import / lifespan 시작 / 첫 요청
+
+매 회 새 프로세스에서 측정합니다 (모듈 캐시 영향 제거).
+
+- 새 DB: DB 파일이 없는 상태 (스키마 생성 + 샘플 데이터)
+- 기존 DB: 이미 초기화된 DB (스키마 버전이 같으면 테이블 생성 생략)
+
+사용법:
+    cd Backend
+    python scripts/bench_startup.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 자식 프로세스에서 실행 - 단계별 경과 시간(ms)을 JSON으로 출력
+_CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    started = time.perf_counter()
+    assert client.get("/health").status_code == 200
+    first = time.perf_counter()
+print(json.dumps({
+    "import": (imported - start) * 1000,
+    "startup": (started - imported) * 1000,
+    "first_request": (first - started) * 1000,
+    "total": (first - start) * 1000,
+}))
+'''
+
+
+def run_once(db_path: str) -> dict:
+    env = dict(os.environ, PALEARN_DB_PATH=db_path)
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args):
+    tmp_dir = tempfile.mkdtemp(prefix="palearn-bench-")
+    db_path = os.path.join(tmp_dir, "palearn.db")
+    results = {"새 DB": [], "기존 DB": []}
+    try:
+        for _ in range(args.runs):
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+            results["새 DB"].append(run_once(db_path))
+            results["기존 DB"].append(run_once(db_path))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"\n시작 시간 (ms, {args.runs}회 중앙값)")
+    print(f"{'mode':<10}{'import':>10}{'startup':>10}{'1st req':>10}{'total':>10}")
+    for mode, runs in results.items():
+        med = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+        print(f"{mode:<10}{med['import']:>10.1f}{med['startup']:>10.1f}{med['first_request']:>10.1f}{med['total']:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="서버 시작 시간 측정")
+    parser.add_argument("--runs", type=int, default=5)
+    sys.exit(main(parser.parse_args()))
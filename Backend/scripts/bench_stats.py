@@ -0,0 +1,161 @@
+# Backend/scripts/bench_stats.py
+"""/stats 계산 벤치마크 - 계획 전체 재스캔(이전) vs 통계 엔진(이후)
+
+계획이 수십 개인 사용자를 만들고 summary + weekly + achievements 세 화면을
+한 번씩 계산하는 비용을 비교합니다.
+
+- 이전: 엔드포인트마다 get_plans()로 전체 일정을 읽고 날짜별로 반복 스캔
+- 엔진(cold): daily_progress 1회 조회로 스냅샷 생성 후 세 응답 계산
+- 엔진(warm): 메모이제이션된 스냅샷 재사용
+
+사용법:
+    cd Backend
+    python scripts/bench_stats.py --plans 40 --days 28 --tasks 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_tmp_dir = tempfile.mkdtemp(prefix="palearn-bench-")
+os.environ["PALEARN_DB_PATH"] = os.path.join(_tmp_dir, "palearn.db")
+
+from services.store import store, async_store  # noqa: E402
+from services.stats_engine import stats_engine  # noqa: E402
+
+USER_ID = 'sample-friend-001'
+
+
+def seed(plans: int, days: int, tasks: int):
+    """오늘 이전 날짜에 걸친 계획 여러 개 추가 (완료 여부는 무작위)"""
+    rng = random.Random(42)
+    today = datetime.now().date()
+    for p in range(plans):
+        start = today - timedelta(days=rng.randint(0, 120))
+        schedule = [
+            {
+                'date': (start + timedelta(days=d)).isoformat(),
+                'tasks': [
+                    {'id': f"bench-{p}-{d}-{t}", 'title': f"벤치마크 태스크 {d}-{t}", 'duration': '30분',
+                     'completed': rng.random() < 0.6, 'related_materials': [{'title': 'x', 'url': 'https://example.org'}]}
+                    for t in range(tasks)
+                ]
+            }
+            for d in range(days)
+        ]
+        store.save_plan(USER_ID, f"벤치마크 계획 {p % 5}", "4주", schedule)
+
+
+def legacy_stats(today) -> dict:
+    """이전 방식: 엔드포인트 3개가 각각 get_plans() 후 반복 스캔"""
+    result = {}
+    for endpoint in ('summary', 'weekly', 'achievements'):
+        plans = store.get_plans(USER_ID, use_cache=False)
+        if endpoint == 'summary':
+            total = completed = 0
+            for plan in plans:
+                for day in plan['daily_schedule']:
+                    total += len(day['tasks'])
+                    completed += sum(1 for t in day['tasks'] if t.get('completed'))
+            daily = []
+            for i in range(6, -1, -1):
+                target = (today - timedelta(days=i)).isoformat()
+                tasks = [t for plan in plans for day in plan['daily_schedule'] if day['date'] == target for t in day['tasks']]
+                daily.append((len(tasks), sum(1 for t in tasks if t.get('completed'))))
+            streak = 0
+            for i in range(30):
+                target = (today - timedelta(days=i)).isoformat()
+                if any(t.get('completed') for plan in plans for day in plan['daily_schedule']
+                       if day['date'] == target for t in day['tasks']):
+                    streak += 1
+                else:
+                    break
+            result[endpoint] = (total, completed, daily, streak)
+        elif endpoint == 'weekly':
+            start = today - timedelta(days=today.weekday())
+            week = []
+            for i in range(7):
+                target = (start + timedelta(days=i)).isoformat()
+                tasks = [t for plan in plans for day in plan['daily_schedule'] if day['date'] == target for t in day['tasks']]
+                week.append((len(tasks), sum(1 for t in tasks if t.get('completed'))))
+            result[endpoint] = week
+        else:
+            result[endpoint] = (sum(1 for plan in plans for day in plan['daily_schedule']
+                                    for t in day['tasks'] if t.get('completed')), len(plans))
+    return result
+
+
+async def engine_stats(today, cold: bool) -> dict:
+    if cold:
+        stats_engine.invalidate(USER_ID)
+    snapshot = await stats_engine.snapshot(USER_ID)
+    summary = snapshot.summary(today)
+    weekly = snapshot.weekly(today)
+    achievements = {a['id']: a for a in snapshot.achievements()['achievements']}
+    return {
+        # 이전 방식은 연속 학습일을 최대 30일까지만 셌으므로 같은 기준으로 비교
+        'summary': (summary['totalTasks'], summary['completedTasks'],
+                    [(d['total'], d['completed']) for d in summary['dailyProgress']], min(summary['streakDays'], 30)),
+        'weekly': [(d['tasks'], d['completed']) for d in weekly['days']],
+        # 업적 진행도는 목표치로 잘리므로 원천 카운터와 비교 (hundred_tasks 진행도로 일관성 확인)
+        'achievements': (snapshot.completed_tasks if achievements['hundred_tasks']['progress'] == min(snapshot.completed_tasks, 100) else None,
+                         snapshot.plan_count),
+    }
+
+
+def _timed(samples):
+    return statistics.median(samples) * 1000, max(samples) * 1000
+
+
+async def main(args):
+    seed(args.plans, args.days, args.tasks)
+    today = datetime.now().date()
+
+    expected = legacy_stats(today)
+    actual = await engine_stats(today, cold=True)
+    if expected != actual:
+        print("결과 불일치!")
+        print(expected)
+        print(actual)
+        return 1
+
+    runs = {"이전 (get_plans x3)": [], "엔진 cold": [], "엔진 warm": []}
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        legacy_stats(today)
+        runs["이전 (get_plans x3)"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await engine_stats(today, cold=True)
+        runs["엔진 cold"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await engine_stats(today, cold=False)
+        runs["엔진 warm"].append(time.perf_counter() - start)
+
+    print(f"\n계획 {args.plans}개 x {args.days}일 x 태스크 {args.tasks}개, {args.rounds}회 반복 (summary+weekly+achievements)")
+    print(f"{'mode':<24}{'p50 ms':>10}{'max ms':>10}")
+    for mode, samples in runs.items():
+        p50, worst = _timed(samples)
+        print(f"{mode:<24}{p50:>10.2f}{worst:>10.2f}")
+    print(f"\n통계 캐시: {stats_engine.stats()}")
+    async_store.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/stats 계산 벤치마크")
+    parser.add_argument("--plans", type=int, default=40)
+    parser.add_argument("--days", type=int, default=28)
+    parser.add_argument("--tasks", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=10)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,139 @@
+# Backend/scripts/check_query_plans.py
+"""DataStore 쿼리 플랜 점검 - 전체 테이블 스캔(SCAN)이 있으면 실패
+
+임시 DB에서 DataStore의 공개 메서드를 모두 실행하며 실제로 나간 SQL을 수집하고,
+각 SQL에 EXPLAIN QUERY PLAN을 돌려 인덱스를 타지 않는 접근 경로를 찾습니다.
+
+사용법:
+    cd Backend
+    python scripts/check_query_plans.py
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# store 모듈 import 전에 임시 DB로 전환 (실제 DB를 건드리지 않음)
+_tmp_dir = tempfile.mkdtemp(prefix="palearn-qp-")
+os.environ["PALEARN_DB_PATH"] = os.path.join(_tmp_dir, "palearn.db")
+
+from services.store import store, DB_PATH  # noqa: E402
+from utils.logger import log_info, log_success, log_error  # noqa: E402
+
+# 점검 대상 문장 (DDL/PRAGMA/트랜잭션 제어 제외)
+_CHECKED_STATEMENT = re.compile(r"^\s*(SELECT|UPDATE|DELETE|INSERT|WITH)\b", re.IGNORECASE)
+# 전체 스캔: "SCAN users", "SCAN f USING COVERING INDEX ..." (인덱스 전체 순회도 포함)
+_FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)")
+# 리터럴을 ?로 바꿔 같은 모양의 쿼리를 한 번만 점검
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def exercise_store():
+    """DataStore 공개 메서드를 한 번씩 호출"""
+    user = store.create_user("qp", "qp@palearn.com", "Password1", "플랜점검", "2000-01-01")
+    user_id = user['user_id']
+    friend_id = 'sample-friend-001'
+    today = '2030-01-01'
+
+    login = store.login("qp@palearn.com", "Password1")
+    store.get_user_by_token(login['token'])
+    store.get_user_id_by_token(login['token'])
+    store.get_user_by_friend_code('SAMPLE01')
+    store.update_user(user_id, name="플랜점검2")
+
+    store.add_friend(user_id, friend_id)
+    store.get_friends(user_id)
+    store.get_sample_friends()
+    store.get_today_rates([user_id, friend_id], today)
+    store.get_friend_plans_by_date(friend_id, today)
+    store.remove_friend(user_id, friend_id)
+
+    store.save_plan(user_id, "점검 계획", "1주", [
+        {'date': today, 'tasks': [{'id': 'qp-task-1', 'title': '점검', 'duration': '30분', 'completed': False}]}
+    ])
+    plans = store.get_plans(user_id)
+    store.get_plan_summaries(user_id)
+    store.get_plan_day_tasks(plans[0]['id'], today)
+    store.get_active_plan(user_id)
+    store.get_active_plan_day(user_id, today)
+    store.get_active_plan_id(user_id)
+    store.set_active_plan(user_id, plans[0]['id'])
+    store.update_task(user_id, today, 'qp-task-1', True)
+    store.get_daily_progress(user_id, today, today)
+    store.get_progress_totals(user_id)
+    store.get_plan_task_counts(user_id)
+    store.rebuild_daily_progress(user_id)
+    store.get_gamification(user_id)
+    store.update_task(user_id, today, 'qp-task-1', False)
+    store.update_tasks(user_id, [{'date': today, 'task_id': 'qp-task-1', 'completed': True},
+                                 {'date': today, 'task_id': 'qp-task-1', 'completed': False}])
+    store.get_activity_range(user_id, 'day', today, today)
+
+    store.add_notification(user_id, "점검 알림")
+    store.get_notifications(user_id)
+    store.mark_notifications_read(user_id)
+
+    # 델타 동기화 - 전체 스냅샷 / 변경분 / 로그 정리
+    cursor = store.get_changes(user_id)['cursor']
+    store.add_notification(user_id, "동기화 점검")
+    store.get_changes(user_id, cursor)
+    store._change_log_purged_at = 0
+    store._purge_change_log()
+
+    store.save_quiz_answers(user_id, [{'id': 1, 'answerKey': 'O'}])
+    store.get_quiz_answers(user_id)
+
+    store.logout(login['token'])
+    store.verify_token(login['token'])
+    store.purge_expired_tokens()
+
+
+def explain(conn: sqlite3.Connection, sql: str):
+    """EXPLAIN QUERY PLAN 결과의 detail 목록"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def main() -> int:
+    # 스키마 생성/마이그레이션은 1회성이므로 점검 대상에서 제외
+    store.open()
+    statements = []
+    store._pool.set_trace_callback(statements.append)
+    exercise_store()
+    store._pool.set_trace_callback(None)
+
+    unique = {}
+    for sql in statements:
+        sql = " ".join(sql.split())
+        if _CHECKED_STATEMENT.match(sql):
+            unique.setdefault(_LITERAL.sub("?", sql), sql)
+
+    conn = sqlite3.connect(DB_PATH)
+    failures = 0
+    for shape, sql in unique.items():
+        plan = explain(conn, sql)
+        scans = [d for d in plan if _FULL_SCAN.match(d)]
+        sorts = [d for d in plan if d.startswith("USE TEMP B-TREE")]
+        if scans:
+            failures += 1
+            log_error(shape)
+            for detail in plan:
+                print(f"      {detail}")
+        elif sorts:
+            log_info(f"(정렬) {shape} → {', '.join(sorts)}")
+    conn.close()
+
+    if failures:
+        log_error(f"전체 스캔 쿼리 {failures}개 / 점검 {len(unique)}개")
+        return 1
+
+    log_success(f"쿼리 {len(unique)}개 모두 인덱스 사용")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
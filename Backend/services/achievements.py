@@ -0,0 +1,22 @@
+# Backend/services/achievements.py
+"""업적 정의 - 해금 판정(store)과 통계 응답(stats_engine)이 함께 사용"""
+
+from typing import Dict, List
+
+# (id, 제목, 설명, 아이콘, 기준, 목표) - 기준: completed(완료 태스크 수) / plans(계획 수)
+ACHIEVEMENTS = [
+    ('first_task', '첫 발걸음', '첫 번째 학습 완료', '🎯', 'completed', 1),
+    ('ten_tasks', '열심히 학습 중', '10개의 학습 완료', '📚', 'completed', 10),
+    ('fifty_tasks', '학습 전문가', '50개의 학습 완료', '🏆', 'completed', 50),
+    ('hundred_tasks', '학습 마스터', '100개의 학습 완료', '👑', 'completed', 100),
+    ('first_plan', '계획의 시작', '첫 번째 학습 계획 생성', '📝', 'plans', 1),
+    ('three_plans', '다양한 학습', '3개의 학습 계획 생성', '📖', 'plans', 3),
+]
+
+
+def newly_unlocked(counters: Dict[str, int], unlocked: set) -> List[tuple]:
+    """아직 해금되지 않았고 목표를 달성한 업적 목록"""
+    return [
+        achievement for achievement in ACHIEVEMENTS
+        if achievement[0] not in unlocked and counters.get(achievement[4], 0) >= achievement[5]
+    ]
@@ -0,0 +1,160 @@
+# Backend/services/db_pool.py
+"""SQLite 커넥션 풀 - 요청마다 connect/close 하지 않고 장기 커넥션을 재사용"""
+
+from contextlib import contextmanager
+from typing import Dict
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# 데이터베이스 경로 (PALEARN_DB_PATH로 재지정 가능 - 스크립트/벤치마크용)
+DB_PATH = os.getenv("PALEARN_DB_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "palearn.db"))
+
+# 풀 설정 (환경변수로 조정 가능)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+
+class PoolTimeoutError(Exception):
+    """풀에서 커넥션을 제한 시간 내에 얻지 못함"""
+
+
+class ConnectionPool:
+    """크기가 제한된 SQLite 커넥션 풀
+
+    - 커넥션은 필요할 때 size개까지 생성되고, 이후에는 반납된 커넥션을 재사용
+    - LIFO 큐를 사용해 최근에 쓰인(캐시가 따뜻한) 커넥션을 우선 재사용
+    - 각 커넥션은 sqlite3의 prepared statement 캐시(cached_statements)를 유지
+    """
+
+    def __init__(self, db_path: str, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT,
+                 cached_statements: int = DB_STATEMENT_CACHE_SIZE):
+        self.db_path = db_path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._trace_callback = None
+
+        # 메트릭
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        """새 커넥션 생성 (풀 전용 설정 적용)"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,  # 스레드 간 재사용 (한 번에 한 스레드만 사용)
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        # WAL: 읽기와 쓰기가 서로를 막지 않음
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if self._trace_callback:
+            conn.set_trace_callback(self._trace_callback)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """풀에서 커넥션 대여 (필요 시 생성, 가득 차면 timeout까지 대기)"""
+        start = time.perf_counter()
+        waited = False
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            create = False
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    create = True
+
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                waited = True
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise PoolTimeoutError(f"DB 커넥션 대기 시간 초과 ({self.timeout}s)")
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+            self._total_wait += elapsed
+            self._max_wait = max(self._max_wait, elapsed)
+
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """커넥션 반납 (열린 트랜잭션은 롤백)"""
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        """트랜잭션 단위 커넥션 대여 - 정상 종료 시 commit, 예외 시 rollback"""
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def set_trace_callback(self, callback):
+        """실행되는 모든 SQL을 callback으로 전달 (쿼리 플랜 점검용, None이면 해제)"""
+        self._trace_callback = callback
+        # 유휴 커넥션을 닫아 이후 새로 만드는 커넥션에 적용
+        self.close_all()
+
+    def close_all(self):
+        """유휴 커넥션 모두 종료"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+    def stats(self) -> Dict:
+        """풀 사용 현황 및 대기 시간 메트릭"""
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": self._idle.qsize(),
+                "in_use": self._created - self._idle.qsize(),
+                "checkouts": checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": round(self._total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
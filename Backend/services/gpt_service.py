@@ -1,72 +1,204 @@
 # Backend/services/gpt_service.py
 """OpenAI GPT 서비스"""
 
+from contextvars import ContextVar
+import asyncio
 import json
 import re
 import os
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, List, Sequence, Tuple
 from dotenv import load_dotenv
 
+from services.db_pool import ConnectionPool
+from services.result_cache import ResultCache
+from services.shared_state import shared_state
+from services.store import DB_PATH
 from utils.logger import log_info, log_error, log_gpt
 
 load_dotenv()
 
 # OpenAI 클라이언트 설정 - API 키가 없어도 서버가 시작되도록 함
+# openai 패키지 import가 무거우므로(약 1초) 첫 GPT 호출 때 생성
 _openai_api_key = os.getenv("OPENAI_API_KEY")
 client = None
+_client_initialized = False
 
-if _openai_api_key:
+
+def _get_client():
+    """OpenAI 클라이언트 (최초 호출 시 1회 생성, 키가 없거나 실패하면 None)"""
+    global client, _client_initialized
+    if client is not None or _client_initialized:
+        return client
+    _client_initialized = True
+
+    if not _openai_api_key:
+        log_info("OPENAI_API_KEY가 설정되지 않음 - GPT 기능 비활성화")
+        return None
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=_openai_api_key)
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(api_key=_openai_api_key)
         log_info("OpenAI 클라이언트 초기화 성공")
     except Exception as e:
         log_error(f"OpenAI 클라이언트 초기화 실패: {e}")
         client = None
-else:
-    log_info("OPENAI_API_KEY가 설정되지 않음 - GPT 기능 비활성화")
+    return client
 
 # 모델 설정 - fallback 지원
 OPENAI_MODEL_SEARCH_PRIMARY = "gpt-5-search-api"  # 1차 웹 검색용 모델
 OPENAI_MODEL_SEARCH_FALLBACK = "gpt-4o-search-preview"  # 2차 fallback 모델
 OPENAI_MODEL_NORMAL = "gpt-4o"  # 일반 모델
 
-# 현재 사용 중인 모델 상태 (프론트엔드에서 조회 가능)
-current_search_status = {"model": None, "status": "idle"}
+# GPT 응답 캐시 설정 - 파싱된 JSON을 SQLite에 보관 (GPT_CACHE_ENABLED=0이면 우회)
+GPT_CACHE_ENABLED = os.getenv("GPT_CACHE_ENABLED", "1") != "0"
+GPT_CACHE_MAX_ENTRIES = int(os.getenv("GPT_CACHE_MAX_ENTRIES", "2000"))
+
+# 프롬프트 종류별 TTL(초) - 웹 검색 결과(강좌/자료)는 짧게, 퀴즈는 길게
+GPT_CACHE_TTLS = {
+    "quiz": 7 * 86400,
+    "recommend": 86400,
+    "course_details": 3 * 86400,
+    "related_materials": 3 * 86400,
+    "review": 86400,
+}
+
+gpt_cache = ResultCache(
+    ConnectionPool(DB_PATH, size=2),
+    table="gpt_cache",
+    max_entries=GPT_CACHE_MAX_ENTRIES,
+    enabled=GPT_CACHE_ENABLED,
+)
+
+# 검색 상태 보고 대상 - 요청/작업 단위로 contextvar에 연결해 동시 사용자 간에 섞이지 않음
+_search_status_sink: ContextVar[Optional[Dict]] = ContextVar("gpt_search_status_sink", default=None)
+# upstream 호출 안에서 갱신할 상태 dict 목록 (공유 호출을 기다리는 요청들의 sink 포함)
+_upstream_status_sinks: ContextVar[Sequence[Dict]] = ContextVar("gpt_upstream_status_sinks", default=())
+# 사용자별 최근 검색 상태 보관 시간(초) - /recommend/search_status가 다른 워커로 가도 되도록 공유 상태에 저장
+_SEARCH_STATUS_TTL = 3600
+
+# 진행 중인 동일 요청 공유 (single-flight) - 키: 정규화된 프롬프트 + 검색 여부
+_inflight: Dict[str, Tuple[asyncio.Task, List[Dict]]] = {}
+_singleflight_stats = {"upstream_calls": 0, "coalesced": 0}
+
+
+def report_search_status_to(sink: Dict):
+    """현재 요청/작업에서 나가는 GPT 호출의 검색 상태를 sink dict에 기록"""
+    _search_status_sink.set(sink)
+
+
+class SearchStatus(dict):
+    """검색 상태 sink - 값이 바뀔 때마다 on_change 호출 (계획 생성 작업의 상태 기록 등)"""
+
+    def __init__(self, on_change: Optional[Callable[[], None]] = None):
+        super().__init__(model=None, status="idle")
+        self.on_change = on_change
+
+
+class _UserSearchStatus(SearchStatus):
+    """사용자별 검색 상태 sink - 바뀔 때마다 공유 상태에 기록"""
+
+    def __init__(self, user_id: str):
+        super().__init__()
+        self.key = f"search_status:{user_id}"
+
+
+async def _publish_search_status(sinks: Sequence[Dict]):
+    """sink 값 변경 후 호출 - 다른 워커에서 조회할 수 있도록 기록"""
+    for sink in sinks:
+        if isinstance(sink, _UserSearchStatus):
+            await asyncio.to_thread(shared_state.set, sink.key, dict(sink), _SEARCH_STATUS_TTL)
+        elif isinstance(sink, SearchStatus) and sink.on_change:
+            sink.on_change()
+
+
+async def track_user_search_status(user_id: str) -> Dict:
+    """사용자별 검색 상태를 새로 만들고 현재 요청에 연결"""
+    status = _UserSearchStatus(user_id)
+    await _publish_search_status([status])
+    report_search_status_to(status)
+    return status
 
 
-def get_search_status() -> dict:
-    """현재 검색 상태 반환"""
-    return current_search_status
+async def get_search_status(user_id: str) -> dict:
+    """사용자의 최근 검색 상태 반환"""
+    status = await asyncio.to_thread(shared_state.get, f"search_status:{user_id}")
+    return status or {"model": None, "status": "idle"}
 
 
-def call_gpt(prompt: str, use_search: bool = False) -> str:
-    """GPT 호출 - fallback 로직 포함"""
-    global current_search_status
+async def _set_search_status(model: Optional[str], status: str):
+    sinks = _upstream_status_sinks.get()
+    for sink in sinks:
+        sink["model"] = model
+        sink["status"] = status
+    await _publish_search_status(sinks)
+
+
+async def _complete(model: str, prompt: str) -> str:
+    """단일 chat completion 호출 (이벤트 루프를 막지 않음)"""
+    messages = [{"role": "user", "content": prompt}]
+    response = await _get_client().chat.completions.create(
+        model=model,
+        messages=messages
+    )
+    return response.choices[0].message.content
+
+
+def get_singleflight_stats() -> dict:
+    """single-flight 메트릭 (upstream_calls: 실제 호출, coalesced: 공유로 절약된 호출)"""
+    return {**_singleflight_stats, "in_flight": len(_inflight)}
+
+
+async def call_gpt(prompt: str, use_search: bool = False) -> str:
+    """GPT 호출 - 같은 프롬프트가 이미 진행 중이면 그 결과를 함께 기다림"""
+    key = ResultCache.make_key(use_search, prompt)
+    sink = _search_status_sink.get()
+    entry = _inflight.get(key)
+
+    if entry is None:
+        _singleflight_stats["upstream_calls"] += 1
+        sinks = [sink] if sink is not None else []
+
+        async def upstream():
+            _upstream_status_sinks.set(sinks)
+            return await _call_gpt_upstream(prompt, use_search)
+
+        task = asyncio.ensure_future(upstream())
+        _inflight[key] = (task, sinks)
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        task, sinks = entry
+        _singleflight_stats["coalesced"] += 1
+        log_info("동일한 GPT 요청이 진행 중 - 결과 공유")
+        if sink is not None:
+            if sinks:
+                sink.update(sinks[0])
+            sinks.append(sink)
+            await _publish_search_status([sink])
+
+    # shield: 한 요청이 취소(클라이언트 연결 종료)돼도 공유 호출은 계속 진행
+    return await asyncio.shield(task)
+
+
+async def _call_gpt_upstream(prompt: str, use_search: bool = False) -> str:
+    """GPT 호출 - fallback 로직 포함 (AsyncOpenAI)"""
 
     # 클라이언트가 없으면 더미 응답 반환
-    if client is None:
+    if _get_client() is None:
         log_error("OpenAI 클라이언트가 초기화되지 않음")
-        current_search_status = {"model": None, "status": "unavailable"}
+        await _set_search_status(None, "unavailable")
         return '{"error": "GPT 서비스를 사용할 수 없습니다. API 키를 확인하세요."}'
 
     if use_search:
         # 1차 시도: gpt-5-search-api
-        current_search_status = {"model": "gpt-5-search-api", "status": "searching"}
+        await _set_search_status("gpt-5-search-api", "searching")
         log_info(f"GPT 호출 중... (1차: gpt-5-search-api)")
 
         try:
-            messages = [{"role": "user", "content": prompt}]
-            response = client.chat.completions.create(
-                model=OPENAI_MODEL_SEARCH_PRIMARY,
-                messages=messages
-            )
-            content = response.choices[0].message.content
+            content = await _complete(OPENAI_MODEL_SEARCH_PRIMARY, prompt)
 
             # 응답이 JSON을 포함하는지 확인 (검색 거부 응답 감지)
             if '```json' in content or '"recommendations"' in content or '"id"' in content:
                 log_gpt(prompt[:100], content)
-                current_search_status = {"model": "gpt-5-search-api", "status": "completed"}
+                await _set_search_status("gpt-5-search-api", "completed")
                 return content
             else:
                 log_info("1차 모델이 JSON 응답을 반환하지 않음, fallback 시도")
@@ -76,7 +208,7 @@ def call_gpt(prompt: str, use_search: bool = False) -> str:
             log_error(f"1차 모델 실패: {str(e)}")
 
             # 2차 시도: gpt-4o-search-preview (fallback)
-            current_search_status = {"model": "gpt-4o-search-preview (fallback)", "status": "searching"}
+            await _set_search_status("gpt-4o-search-preview (fallback)", "searching")
             log_info(f"GPT fallback 호출 중... (2차: gpt-4o-search-preview)")
 
             try:
@@ -87,30 +219,20 @@ def call_gpt(prompt: str, use_search: bool = False) -> str:
 
 ⚠️ 중요: 위 요청에 대해 반드시 JSON 형식으로만 응답하세요. 추가 질문이나 설명 없이 오직 JSON만 출력합니다."""
 
-                messages = [{"role": "user", "content": fallback_prompt}]
-                response = client.chat.completions.create(
-                    model=OPENAI_MODEL_SEARCH_FALLBACK,
-                    messages=messages
-                )
-                content = response.choices[0].message.content
+                content = await _complete(OPENAI_MODEL_SEARCH_FALLBACK, fallback_prompt)
                 log_gpt(prompt[:100], content)
-                current_search_status = {"model": "gpt-4o-search-preview (fallback)", "status": "completed"}
+                await _set_search_status("gpt-4o-search-preview (fallback)", "completed")
                 return content
 
             except Exception as e2:
                 log_error(f"2차 모델도 실패: {str(e2)}")
-                current_search_status = {"model": None, "status": "failed"}
+                await _set_search_status(None, "failed")
                 return f"GPT 호출 중 오류: {str(e2)}"
     else:
         # 일반 모델 사용
         try:
             log_info(f"GPT 호출 중... (일반 모델: gpt-4o)")
-            messages = [{"role": "user", "content": prompt}]
-            response = client.chat.completions.create(
-                model=OPENAI_MODEL_NORMAL,
-                messages=messages
-            )
-            content = response.choices[0].message.content
+            content = await _complete(OPENAI_MODEL_NORMAL, prompt)
             log_gpt(prompt[:100], content)
             return content
 
@@ -119,6 +241,34 @@ def call_gpt(prompt: str, use_search: bool = False) -> str:
             return f"GPT 호출 중 오류: {str(e)}"
 
 
+async def call_gpt_json(prompt: str, use_search: bool = False, cache_kind: Optional[str] = None,
+                        required_key: Optional[str] = None, refresh: bool = False) -> Optional[Dict]:
+    """GPT 호출 + JSON 추출 - cache_kind가 있으면 결과를 캐시
+
+    - required_key가 있으면 해당 키가 포함된 응답만 캐시 (오류/거부 응답 제외)
+    - refresh=True면 캐시를 읽지 않고 새로 호출한 뒤 덮어씀
+    """
+    key = None
+    if cache_kind and gpt_cache.enabled:
+        model = OPENAI_MODEL_SEARCH_PRIMARY if use_search else OPENAI_MODEL_NORMAL
+        key = gpt_cache.make_key(cache_kind, model, use_search, prompt)
+        if not refresh:
+            cached = await asyncio.to_thread(gpt_cache.get, key)
+            if cached is not None:
+                log_info(f"GPT 캐시 적중 ({cache_kind})")
+                sink = _search_status_sink.get()
+                if sink is not None:
+                    sink.update(model="cache", status="completed")
+                    await _publish_search_status([sink])
+                return cached
+
+    data = extract_json(await call_gpt(prompt, use_search=use_search))
+
+    if key and isinstance(data, dict) and 'error' not in data and (required_key is None or data.get(required_key)):
+        await asyncio.to_thread(gpt_cache.set, key, data, cache_kind, GPT_CACHE_TTLS.get(cache_kind))
+    return data
+
+
 def extract_json(text: str) -> Optional[Dict]:
     """GPT 응답에서 JSON을 추출 - 더 robust한 파싱"""
     def clean_json_string(json_str: str) -> str:
@@ -0,0 +1,143 @@
+# Backend/services/password_hasher.py
+"""bcrypt 해싱/검증 전용 워커 풀
+
+bcrypt는 1회에 수백 ms의 CPU를 쓰므로 DB 스레드 풀이나 이벤트 루프에서 실행하지 않고
+크기가 제한된 별도 스레드 풀에서 실행합니다 (bcrypt는 계산 중 GIL을 놓으므로 스레드로 병렬 처리됨).
+대기 중인 작업이 상한을 넘으면 PasswordHasherBusy로 즉시 거절합니다.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+import asyncio
+import os
+import re
+import threading
+import time
+
+import bcrypt
+
+# 해싱 설정 (환경변수로 조정 가능)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+_COST = re.compile(r'^\$2[abxy]?\$(\d{2})\$')
+
+
+class PasswordHasherBusy(Exception):
+    """해싱 대기열이 가득 참 (잠시 후 재시도)"""
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    """bcrypt 해싱 (호출 스레드에서 실행)"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    """bcrypt 검증 (호출 스레드에서 실행)"""
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    except Exception:
+        return False
+
+
+def hash_cost(hashed: str) -> Optional[int]:
+    """해시에 기록된 work factor (형식이 다르면 None)"""
+    match = _COST.match(hashed or '')
+    return int(match.group(1)) if match else None
+
+
+class PasswordHasher:
+    """크기가 제한된 bcrypt 워커 풀 + 대기열 메트릭"""
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING,
+                 rounds: int = BCRYPT_ROUNDS):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="palearn-bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0  # 대기 + 실행 중
+        self._running = 0
+        self._max_pending_seen = 0
+        self._completed = 0
+        self._rejected = 0
+        self._rehashed = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """설정된 work factor와 다른 해시인지 (로그인 성공 시 다시 해싱)"""
+        cost = hash_cost(hashed)
+        return cost is not None and cost != self.rounds
+
+    def record_rehash(self):
+        with self._lock:
+            self._rehashed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit(verify_password, password, hashed)
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PasswordHasherBusy()
+            self._pending += 1
+            self._max_pending_seen = max(self._max_pending_seen, self._pending)
+        submitted = time.perf_counter()
+
+        def run():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._wait_total += started - submitted
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_total += finished - started
+
+        def release(_future):
+            # 완료뿐 아니라 대기 중 취소(연결 끊김, 타임아웃)된 작업도 자리 반납
+            with self._lock:
+                self._pending -= 1
+
+        try:
+            future = self._executor.submit(run)
+        except Exception:
+            release(None)
+            raise
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict:
+        """대기열 깊이 / 처리량 / 평균 대기·실행 시간"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "queued": self._pending - self._running,
+                "running": self._running,
+                "max_pending_seen": self._max_pending_seen,
+                "completed": completed,
+                "rejected": self._rejected,
+                "rehashed": self._rehashed,
+                "avg_wait_ms": round(self._wait_total / completed * 1000, 1) if completed else 0.0,
+                "avg_run_ms": round(self._run_total / completed * 1000, 1) if completed else 0.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher()
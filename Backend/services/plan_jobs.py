@@ -0,0 +1,248 @@
+# Backend/services/plan_jobs.py
+"""학습 계획 생성 백그라운드 작업 큐
+
+POST 요청은 작업을 큐에 넣고 job_id만 즉시 반환하고,
+워커가 GPT 호출 + 웹 검색 파이프라인을 실행합니다.
+클라이언트는 GET /plans/jobs/{job_id}로 상태/진행률/완성된 계획을 조회합니다.
+작업 상태는 변경될 때마다 공유 상태에도 기록되므로, 조회 요청이 다른 워커로 가도 응답할 수 있습니다.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import os
+import threading
+import time
+import uuid
+
+from services.gpt_service import SearchStatus, report_search_status_to
+from services.shared_state import shared_state
+from utils.logger import log_info, log_error, log_success
+
+# 작업 설정 (환경변수로 조정 가능)
+PLAN_JOB_WORKERS = int(os.getenv("PLAN_JOB_WORKERS", "4"))
+PLAN_JOB_TTL = float(os.getenv("PLAN_JOB_TTL", "3600"))  # 완료된 작업 보관 시간(초)
+PLAN_JOB_MAX = int(os.getenv("PLAN_JOB_MAX", "1000"))  # 보관할 최대 작업 수
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class PlanJob:
+    """계획 생성 작업 1건 - 진행률은 워커 스레드에서도 갱신될 수 있음"""
+
+    def __init__(self, user_id: str, kind: str, on_change: Optional[Callable[["PlanJob"], None]] = None):
+        self.job_id = str(uuid.uuid4())
+        self.user_id = user_id
+        self.kind = kind
+        self.state = QUEUED
+        self.stage = "queued"
+        self.days_total: Optional[int] = None
+        self.days_done = 0
+        self.tasks_total: Optional[int] = None
+        self.tasks_done = 0
+        self.search = SearchStatus(on_change=self._search_changed)
+        self.plan: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._on_change = on_change
+
+    def _touch(self):
+        self.updated_at = datetime.now().isoformat()
+
+    def _changed(self):
+        if self._on_change:
+            self._on_change(self)
+
+    def _search_changed(self):
+        """GPT 검색 상태 변경 (report_search_status_to로 연결된 self.search)"""
+        with self._lock:
+            self._touch()
+        self._changed()
+
+    def set_stage(self, stage: str):
+        """진행 단계 변경 (gpt / materials / saving ...)"""
+        with self._lock:
+            self.stage = stage
+            self._touch()
+        self._changed()
+
+    def set_totals(self, days: Optional[int] = None, tasks: Optional[int] = None):
+        """전체 일수/태스크 수 설정"""
+        with self._lock:
+            self.days_total = days
+            self.tasks_total = tasks
+            self.days_done = 0
+            self.tasks_done = 0
+            self._touch()
+        self._changed()
+
+    def advance(self, tasks: int = 0, days: int = 0):
+        """진행률 증가"""
+        with self._lock:
+            self.tasks_done += tasks
+            self.days_done += days
+            self._touch()
+        self._changed()
+
+    def to_dict(self) -> Dict:
+        """API 응답 형식"""
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "kind": self.kind,
+                "state": self.state,
+                "progress": {
+                    "stage": self.stage,
+                    "days_total": self.days_total,
+                    "days_done": self.days_done,
+                    "tasks_total": self.tasks_total,
+                    "tasks_done": self.tasks_done,
+                },
+                "search": dict(self.search),
+                "plan": self.plan,
+                "error": self.error,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+            }
+
+
+class PlanJobQueue:
+    """asyncio 워커 기반 작업 큐 (워커는 첫 submit 시 이벤트 루프에서 시작)"""
+
+    def __init__(self, workers: int = PLAN_JOB_WORKERS):
+        self.workers = max(1, workers)
+        self._jobs: Dict[str, PlanJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._completed = 0
+        self._failed = 0
+        # 공유 상태 기록 - 전용 스레드 1개에서 순서대로 (이벤트 루프/워커 스레드를 막지 않음)
+        self._publisher: Optional[ThreadPoolExecutor] = None
+        self._publish_pending = set()
+        self._publish_lock = threading.Lock()
+        self._published = 0
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="palearn-job-publish")
+            self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    def _publish(self, job: PlanJob):
+        """작업 상태 기록 예약 - 이미 예약돼 있으면 그 기록이 최신 상태를 가져감"""
+        with self._publish_lock:
+            if job.job_id in self._publish_pending or self._publisher is None:
+                return
+            self._publish_pending.add(job.job_id)
+        self._publisher.submit(self._write_snapshot, job)
+
+    def _write_snapshot(self, job: PlanJob):
+        with self._publish_lock:
+            self._publish_pending.discard(job.job_id)
+        try:
+            shared_state.set(f"plan_job:{job.job_id}", {"user_id": job.user_id, "job": job.to_dict()}, PLAN_JOB_TTL)
+            with self._publish_lock:
+                self._published += 1
+        except Exception as e:
+            log_error(f"계획 생성 작업 상태 기록 실패 ({job.job_id}): {e}")
+
+    async def _worker(self, index: int):
+        while True:
+            job, runner = await self._queue.get()
+            job.state = RUNNING
+            job.set_stage("started")
+            # 이 작업에서 나가는 GPT 호출의 검색 상태는 job.search에만 기록됨
+            report_search_status_to(job.search)
+            try:
+                plan = await runner(job)
+                job.plan = plan
+                job.state = SUCCEEDED
+                job.set_stage("done")
+                self._completed += 1
+                log_success(f"계획 생성 작업 완료: {job.job_id}")
+            except Exception as e:
+                job.error = str(e) or type(e).__name__
+                job.state = FAILED
+                job.set_stage("failed")
+                self._failed += 1
+                log_error(f"계획 생성 작업 실패 ({job.job_id}): {job.error}")
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+    def submit(self, user_id: str, kind: str, runner: Callable[[PlanJob], Awaitable[Dict]]) -> PlanJob:
+        """작업 등록 - runner(job)는 완성된 계획을 반환하거나 예외를 던짐"""
+        self._ensure_workers()
+        self._prune()
+        job = PlanJob(user_id, kind, on_change=self._publish)
+        self._jobs[job.job_id] = job
+        self._publish(job)
+        self._queue.put_nowait((job, runner))
+        log_info(f"계획 생성 작업 등록: {job.job_id} (대기 {self._queue.qsize()}건)")
+        return job
+
+    def get(self, job_id: str, user_id: str) -> Optional[PlanJob]:
+        """본인 작업만 조회"""
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    async def snapshot(self, job_id: str, user_id: str) -> Optional[Dict]:
+        """본인 작업의 API 응답 - 이 워커에 없으면 다른 워커가 기록한 공유 상태에서 조회"""
+        job = self.get(job_id, user_id)
+        if job is not None:
+            return job.to_dict()
+        shared = await asyncio.to_thread(shared_state.get, f"plan_job:{job_id}")
+        if shared is None or shared["user_id"] != user_id:
+            return None
+        return shared["job"]
+
+    def _prune(self):
+        """TTL이 지났거나 개수 제한을 넘은 완료 작업 제거"""
+        now = time.time()
+        finished = sorted(
+            (j for j in self._jobs.values() if j.finished_at is not None),
+            key=lambda j: j.finished_at
+        )
+        overflow = max(0, len(self._jobs) - PLAN_JOB_MAX)
+        for i, job in enumerate(finished):
+            if i < overflow or now - job.finished_at > PLAN_JOB_TTL:
+                del self._jobs[job.job_id]
+
+    def stats(self) -> Dict:
+        """큐 메트릭"""
+        states = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        for job in self._jobs.values():
+            states[job.state] += 1
+        return {
+            "workers": self.workers,
+            "queued": states[QUEUED],
+            "running": states[RUNNING],
+            "completed_total": self._completed,
+            "failed_total": self._failed,
+            "retained": len(self._jobs),
+            "published": self._published,
+        }
+
+    async def shutdown(self):
+        """워커 종료"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        if self._publisher is not None:
+            self._publisher.shutdown(wait=True)
+            self._publisher = None
+
+
+plan_jobs = PlanJobQueue()
@@ -0,0 +1,157 @@
+# Backend/services/result_cache.py
+"""SQLite 기반 결과 캐시 - TTL 만료 + 개수 제한 LRU 제거 + 적중률 메트릭
+
+비싼 외부 호출(GPT 등)의 파싱된 결과를 JSON으로 저장합니다.
+테이블은 첫 사용 시 생성되며, 서버 재시작 후에도 유지됩니다.
+"""
+
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import threading
+import time
+
+from services.db_pool import ConnectionPool
+from utils.logger import log_error
+
+
+class ResultCache:
+    """이름(table) 단위로 분리되는 영속 캐시"""
+
+    def __init__(self, pool: ConnectionPool, table: str, max_entries: int = 2000,
+                 default_ttl: float = 86400, prune_every: int = 50, enabled: bool = True):
+        self._pool = pool
+        self.table = table
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.prune_every = max(1, prune_every)
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._ready = False
+        self._hits = 0
+        self._misses = 0
+        self._sets = 0
+        self._evictions = 0
+        self._errors = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """공백을 정규화한 구성요소들의 sha256 키"""
+        normalized = "\x1f".join(" ".join(str(p).split()) for p in parts)
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _ensure_table(self):
+        """테이블/인덱스 생성 (최초 1회)"""
+        if self._ready:
+            return
+        with self._pool.connection() as conn:
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table}_last_used ON {self.table}(last_used)')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table}_expires ON {self.table}(expires_at)')
+        self._ready = True
+
+    def get(self, key: str) -> Optional[Any]:
+        """만료되지 않은 값 반환 (없으면 None) - 적중 시 LRU 시각 갱신"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            self._ensure_table()
+            with self._pool.connection() as conn:
+                row = conn.execute(
+                    f'SELECT value FROM {self.table} WHERE key = ? AND expires_at > ?', (key, now)
+                ).fetchone()
+                if row:
+                    conn.execute(f'UPDATE {self.table} SET last_used = ? WHERE key = ?', (now, key))
+        except Exception as e:
+            # 캐시 장애가 요청 실패로 번지지 않도록 miss로 처리
+            log_error(f"캐시 조회 실패({self.table}): {e}")
+            with self._lock:
+                self._errors += 1
+            return None
+
+        with self._lock:
+            if row:
+                self._hits += 1
+            else:
+                self._misses += 1
+        return json.loads(row['value']) if row else None
+
+    def set(self, key: str, value: Any, kind: str = "default", ttl: Optional[float] = None):
+        """값 저장 (prune_every번마다 만료/초과 항목 정리)"""
+        if not self.enabled:
+            return
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        try:
+            self._ensure_table()
+            with self._pool.connection() as conn:
+                conn.execute(
+                    f'INSERT OR REPLACE INTO {self.table} (key, kind, value, created_at, expires_at, last_used) '
+                    f'VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, kind, json.dumps(value, ensure_ascii=False), now, now + ttl, now)
+                )
+        except Exception as e:
+            log_error(f"캐시 저장 실패({self.table}): {e}")
+            with self._lock:
+                self._errors += 1
+            return
+
+        with self._lock:
+            self._sets += 1
+            should_prune = self._sets % self.prune_every == 0
+        if should_prune:
+            # 정리 실패가 저장 요청을 실패시키지 않도록 (조회 경로와 동일하게 기록만)
+            try:
+                self.prune()
+            except Exception as e:
+                log_error(f"캐시 정리 실패({self.table}): {e}")
+                with self._lock:
+                    self._errors += 1
+
+    def prune(self) -> int:
+        """만료 항목 삭제 후 max_entries 초과분을 오래 안 쓰인 순서로 제거"""
+        self._ensure_table()
+        with self._pool.connection() as conn:
+            removed = conn.execute(f'DELETE FROM {self.table} WHERE expires_at <= ?', (time.time(),)).rowcount
+            count = conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+            if count > self.max_entries:
+                removed += conn.execute(
+                    f'DELETE FROM {self.table} WHERE key IN '
+                    f'(SELECT key FROM {self.table} ORDER BY last_used LIMIT ?)',
+                    (count - self.max_entries,)
+                ).rowcount
+        with self._lock:
+            self._evictions += removed
+        return removed
+
+    def clear(self):
+        """전체 삭제"""
+        self._ensure_table()
+        with self._pool.connection() as conn:
+            conn.execute(f'DELETE FROM {self.table}')
+
+    def stats(self) -> Dict:
+        """적중률 메트릭"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "sets": self._sets,
+                "evictions": self._evictions,
+                "errors": self._errors,
+                "max_entries": self.max_entries,
+            }
@@ -0,0 +1,346 @@
+# Backend/services/shared_state.py
+"""워커 간 공유 상태 저장소 - uvicorn --workers N / 여러 인스턴스에서 같은 값을 보도록
+
+퀴즈 정답, 응원 쓰로틀, 검색 상태, 계획/통계 캐시 버전, 계획 생성 작업 상태, Rate Limit 카운터처럼
+요청이 어느 워커로 가든 같아야 하는 값을 저장합니다.
+인터페이스는 Redis 명령에 그대로 대응하는 키-값 + TTL + 원자적 카운터이며, 값은 JSON으로 저장됩니다.
+
+SHARED_STATE_URL로 백엔드를 선택합니다.
+- sqlite:// (기본) - 서버 DB 파일의 shared_state 테이블 (같은 호스트의 워커끼리 공유)
+- sqlite:///경로/파일.db - 별도 SQLite 파일
+- redis://host:6379/0 - Redis (redis 패키지 필요, 여러 호스트에서 공유)
+- memory:// - 프로세스 메모리 (워커 1개일 때만)
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+import json
+import os
+import threading
+import time
+import urllib.parse
+
+from limits.storage import Storage
+
+from services.db_pool import ConnectionPool, DB_PATH
+
+# 공유 상태 설정 (환경변수로 조정 가능)
+SHARED_STATE_URL = os.getenv("SHARED_STATE_URL", "sqlite://")
+SHARED_STATE_PURGE_INTERVAL = float(os.getenv("SHARED_STATE_PURGE_INTERVAL", "300"))  # 만료 항목 정리 주기(초)
+
+
+class SharedState(ABC):
+    """공유 상태 인터페이스 - ttl은 초 단위, None이면 만료 없음 (메서드를 모두 구현해야 생성 가능)"""
+
+    backend = "base"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """만료되지 않은 값 (없으면 None) - Redis GET"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """값 저장 (기존 값/TTL 덮어씀) - Redis SET PX"""
+
+    @abstractmethod
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """키가 없을 때만 저장, 저장했으면 True - Redis SET NX PX"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Redis DEL"""
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """원자적 증가 후 값 반환 - ttl은 키가 새로 생길 때만 적용 (Redis INCRBY + PEXPIRE)"""
+
+    @abstractmethod
+    def ttl(self, key: str) -> Optional[float]:
+        """남은 유효 시간(초) - 키가 없거나 만료가 없으면 None (Redis PTTL)"""
+
+    def stats(self) -> Dict:
+        return {"backend": self.backend}
+
+
+class MemorySharedState(SharedState):
+    """프로세스 메모리 구현 (워커 1개 / 스크립트용)"""
+
+    backend = "memory"
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}  # key → (value, expires_at | None)
+        self._lock = threading.Lock()
+        self._purged_at = time.time()
+
+    def _live(self, key: str, now: float):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry
+
+    def _purge(self, now: float):
+        if now - self._purged_at < SHARED_STATE_PURGE_INTERVAL:
+            return
+        self._purged_at = now
+        for key in [k for k, (_, exp) in self._data.items() if exp is not None and exp <= now]:
+            del self._data[key]
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._live(key, time.time())
+            return entry[0] if entry else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            self._data[key] = (value, now + ttl if ttl else None)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._live(key, now) is not None:
+                return False
+            self._data[key] = (value, now + ttl if ttl else None)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        with self._lock:
+            entry = self._live(key, now)
+            if entry is None:
+                entry = (0, now + ttl if ttl else None)
+            value = int(entry[0]) + amount
+            self._data[key] = (value, entry[1])
+            return value
+
+    def ttl(self, key: str) -> Optional[float]:
+        now = time.time()
+        with self._lock:
+            entry = self._live(key, now)
+            return entry[1] - now if entry and entry[1] is not None else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"backend": self.backend, "keys": len(self._data)}
+
+
+class SqliteSharedState(SharedState):
+    """SQLite 구현 - 같은 DB 파일을 여는 모든 프로세스가 공유 (쓰기는 문장 1개 = 트랜잭션 1개)"""
+
+    backend = "sqlite"
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._pool = ConnectionPool(db_path, size=2)
+        self._lock = threading.Lock()
+        self._ready = False
+        self._purged_at = time.time()
+        self._purged = 0
+
+    def _ensure_table(self):
+        """테이블/인덱스 생성 (최초 1회)"""
+        if self._ready:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._pool.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS shared_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_shared_state_expires ON shared_state(expires_at)')
+        self._ready = True
+
+    def _purge(self, conn, now: float):
+        """만료 항목 삭제 (SHARED_STATE_PURGE_INTERVAL마다 1회)"""
+        with self._lock:
+            if now - self._purged_at < SHARED_STATE_PURGE_INTERVAL:
+                return
+            self._purged_at = now
+        removed = conn.execute('DELETE FROM shared_state WHERE expires_at <= ?', (now,)).rowcount
+        with self._lock:
+            self._purged += removed
+
+    def get(self, key: str) -> Optional[Any]:
+        self._ensure_table()
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                'SELECT value FROM shared_state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+                (key, time.time())
+            ).fetchone()
+        return json.loads(row['value']) if row else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._ensure_table()
+        now = time.time()
+        with self._pool.connection() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False), now + ttl if ttl else None)
+            )
+            self._purge(conn, now)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        self._ensure_table()
+        now = time.time()
+        with self._pool.connection() as conn:
+            # 만료된 기존 값만 덮어씀 - 살아 있는 값이 있으면 변경 0행
+            inserted = conn.execute(
+                '''
+                INSERT INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+                WHERE shared_state.expires_at IS NOT NULL AND shared_state.expires_at <= ?
+                ''',
+                (key, json.dumps(value, ensure_ascii=False), now + ttl if ttl else None, now)
+            ).rowcount
+        return inserted == 1
+
+    def delete(self, key: str):
+        self._ensure_table()
+        with self._pool.connection() as conn:
+            conn.execute('DELETE FROM shared_state WHERE key = ?', (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        self._ensure_table()
+        now = time.time()
+        with self._pool.connection() as conn:
+            # SET 절의 컬럼은 갱신 전 값 - 만료된 키는 amount / 새 TTL로 다시 시작
+            row = conn.execute(
+                '''
+                INSERT INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = CASE WHEN expires_at IS NOT NULL AND expires_at <= ?
+                                 THEN excluded.value ELSE CAST(value AS INTEGER) + ? END,
+                    expires_at = CASE WHEN expires_at IS NOT NULL AND expires_at <= ?
+                                      THEN excluded.expires_at ELSE expires_at END
+                RETURNING value
+                ''',
+                (key, amount, now + ttl if ttl else None, now, amount, now)
+            ).fetchone()
+            self._purge(conn, now)
+        return int(row['value'])
+
+    def ttl(self, key: str) -> Optional[float]:
+        self._ensure_table()
+        now = time.time()
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                'SELECT expires_at FROM shared_state WHERE key = ? AND expires_at > ?', (key, now)
+            ).fetchone()
+        return row['expires_at'] - now if row else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"backend": self.backend, "purged": self._purged, "db_pool": self._pool.stats()}
+
+
+class RedisSharedState(SharedState):
+    """Redis 구현 - 여러 호스트의 워커가 공유 (키 앞에 prefix를 붙여 다른 서비스와 분리)"""
+
+    backend = "redis"
+
+    # 새로 생긴 키에만 만료 설정 (INCRBY 결과가 amount와 같으면 새 키)
+    _INCR_SCRIPT = """
+    local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+    if value == tonumber(ARGV[1]) and tonumber(ARGV[2]) > 0 then
+        redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    end
+    return value
+    """
+
+    def __init__(self, url: str, prefix: str = "palearn:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("SHARED_STATE_URL=redis:// 를 쓰려면 redis 패키지가 필요합니다 (pip install redis)") from e
+        self._redis = redis.Redis.from_url(url)
+        self._incr = self._redis.register_script(self._INCR_SCRIPT)
+        self.prefix = prefix
+
+    @staticmethod
+    def _px(ttl: Optional[float]) -> Optional[int]:
+        return max(1, int(ttl * 1000)) if ttl else None
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._redis.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._redis.set(self.prefix + key, json.dumps(value, ensure_ascii=False), px=self._px(ttl))
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return bool(self._redis.set(self.prefix + key, json.dumps(value, ensure_ascii=False),
+                                    px=self._px(ttl), nx=True))
+
+    def delete(self, key: str):
+        self._redis.delete(self.prefix + key)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        return int(self._incr(keys=[self.prefix + key], args=[amount, self._px(ttl) or 0]))
+
+    def ttl(self, key: str) -> Optional[float]:
+        ms = self._redis.pttl(self.prefix + key)
+        return ms / 1000 if ms >= 0 else None
+
+
+def create_shared_state(url: str) -> SharedState:
+    """SHARED_STATE_URL 형식의 문자열로 백엔드 생성"""
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme == "sqlite":
+        return SqliteSharedState(parsed.path or DB_PATH)
+    if parsed.scheme in ("redis", "rediss"):
+        return RedisSharedState(url)
+    if parsed.scheme == "memory":
+        return MemorySharedState()
+    raise ValueError(f"지원하지 않는 SHARED_STATE_URL: {url}")
+
+
+class SharedStateLimitStorage(Storage):
+    """slowapi(limits) 저장소 어댑터 - Limiter(storage_uri="palearn-shared://")로 사용
+
+    fixed-window 전략에 필요한 카운터만 구현합니다 (moving-window 미지원).
+    """
+
+    STORAGE_SCHEME = ["palearn-shared"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._state = shared_state
+
+    @property
+    def base_exceptions(self):
+        return Exception
+
+    def incr(self, key: str, expiry: float, amount: int = 1) -> int:
+        return self._state.incr(f"ratelimit:{key}", amount, ttl=expiry)
+
+    def get(self, key: str) -> int:
+        return int(self._state.get(f"ratelimit:{key}") or 0)
+
+    def get_expiry(self, key: str) -> float:
+        return time.time() + (self._state.ttl(f"ratelimit:{key}") or 0)
+
+    def check(self) -> bool:
+        try:
+            self._state.get("ratelimit:check")
+            return True
+        except Exception:
+            return False
+
+    def reset(self) -> Optional[int]:
+        # 키 전체 삭제는 지원하지 않음 (카운터는 TTL로 만료)
+        return None
+
+    def clear(self, key: str):
+        self._state.delete(f"ratelimit:{key}")
+
+
+shared_state = create_shared_state(SHARED_STATE_URL)
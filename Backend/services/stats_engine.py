@@ -0,0 +1,191 @@
+# Backend/services/stats_engine.py
+"""학습 통계 엔진 - /stats 엔드포인트 공용 계산
+
+사용자의 daily_progress 집계를 한 번 읽어 날짜 → 진행률 인덱스(스냅샷)를 만들고,
+summary / weekly는 이 스냅샷에서 계산합니다. 연속 학습일과 업적은 store가 이벤트 방식으로
+유지하는 게이미피케이션 상태(gamification_state / user_achievements)를 그대로 사용합니다.
+스냅샷은 사용자별로 메모이제이션하며 계획 저장/태스크 갱신 시(store.progress_version) 폐기됩니다.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+import os
+
+from services.achievements import ACHIEVEMENTS
+from services.store import async_store
+from services.ttl_cache import TTLCache
+
+# 스냅샷 캐시 설정 - TTL은 다른 워커 프로세스에서 일어난 변경의 최대 반영 지연
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "60"))
+STATS_CACHE_MAX_ENTRIES = int(os.getenv("STATS_CACHE_MAX_ENTRIES", "5000"))
+
+DAY_NAMES = ['월', '화', '수', '목', '금', '토', '일']
+
+
+def _rate(completed: int, total: int) -> int:
+    return int(completed / total * 100) if total > 0 else 0
+
+
+def achievements_response(game: Dict) -> Dict:
+    """업적 응답 - 저장된 게이미피케이션 상태만 사용 (일정 조회 없음)"""
+    counters = {'completed': game['completed_tasks'], 'plans': game['plan_count']}
+    unlocked_at = game['achievements']
+    achievements = [
+        {
+            'id': achievement_id,
+            'title': title,
+            'description': description,
+            'icon': icon,
+            'unlocked': achievement_id in unlocked_at,
+            'unlockedAt': unlocked_at.get(achievement_id),
+            'progress': min(counters[metric], target),
+            'target': target
+        }
+        for achievement_id, title, description, icon, metric, target in ACHIEVEMENTS
+    ]
+    unlocked_count = sum(1 for a in achievements if a['unlocked'])
+    return {
+        'achievements': achievements,
+        'unlockedCount': unlocked_count,
+        'totalCount': len(achievements)
+    }
+
+
+class StatsSnapshot:
+    """사용자 1명의 통계 원천 데이터 (날짜별 진행률 + 계획별 합계 + 게이미피케이션 상태)"""
+
+    def __init__(self, days: List[Dict], plans: List[Dict], game: Dict):
+        self.game = game
+        self.by_date: Dict[str, Dict] = {}
+        self.total_tasks = 0
+        self.completed_tasks = 0
+        self.study_days = 0
+        for row in days:
+            self.by_date[row['date']] = row
+            self.total_tasks += row['total']
+            self.completed_tasks += row['completed']
+            if row['total']:
+                self.study_days += 1
+
+        # 같은 이름의 계획은 한 주제로 합산 (get_plans 정렬 순서 유지)
+        self.plan_count = len(plans)
+        self.topics: Dict[str, Dict[str, int]] = {}
+        for plan in plans:
+            topic = self.topics.setdefault(plan.get('plan_name') or '기타', {'total': 0, 'completed': 0})
+            topic['total'] += plan['total']
+            topic['completed'] += plan['completed']
+
+    def day(self, day: date) -> Dict:
+        row = self.by_date.get(day.isoformat())
+        return {'total': row['total'], 'completed': row['completed']} if row else {'total': 0, 'completed': 0}
+
+    def streak(self, today: date) -> int:
+        """오늘부터 거꾸로 완료 태스크가 있는 연속 일수 (저장된 연속 학습일 상태 사용)"""
+        last = self.game.get('last_active_date')
+        if not last:
+            return 0
+        if last <= today.isoformat():
+            # last_active_date가 가장 늦은 활동일이므로 오늘이 아니면 오늘은 미완료
+            return self.game['current_streak'] if last == today.isoformat() else 0
+
+        # 미래 날짜 태스크를 먼저 완료한 경우 - 날짜 인덱스로 직접 계산
+        streak = 0
+        while self.day(today - timedelta(days=streak))['completed'] > 0:
+            streak += 1
+        return streak
+
+    def summary(self, today: date) -> Dict:
+        daily_progress = []
+        for i in range(6, -1, -1):
+            target = today - timedelta(days=i)
+            day = self.day(target)
+            daily_progress.append({
+                'date': target.isoformat(),
+                'dayName': DAY_NAMES[target.weekday()],
+                'rate': _rate(day['completed'], day['total']),
+                'completed': day['completed'],
+                'total': day['total']
+            })
+
+        topic_stats = [
+            {'name': name, 'total': data['total'], 'completed': data['completed'],
+             'rate': _rate(data['completed'], data['total'])}
+            for name, data in self.topics.items()
+        ]
+        # 완료율 기준 정렬
+        topic_stats.sort(key=lambda x: x['rate'], reverse=True)
+
+        return {
+            'totalTasks': self.total_tasks,
+            'completedTasks': self.completed_tasks,
+            'overallRate': _rate(self.completed_tasks, self.total_tasks),
+            'totalStudyDays': self.study_days,
+            'streakDays': self.streak(today),
+            'longestStreak': self.game['longest_streak'],
+            'dailyProgress': daily_progress,
+            'topicStats': topic_stats,
+            'totalPlans': self.plan_count
+        }
+
+    def weekly(self, today: date) -> Dict:
+        start_of_week = today - timedelta(days=today.weekday())
+        weekly_data = []
+        total_tasks = 0
+        total_completed = 0
+        for i in range(7):
+            target = start_of_week + timedelta(days=i)
+            day = self.day(target)
+            total_tasks += day['total']
+            total_completed += day['completed']
+            weekly_data.append({
+                'date': target.isoformat(),
+                'dayName': DAY_NAMES[i],
+                'tasks': day['total'],
+                'completed': day['completed'],
+                'rate': _rate(day['completed'], day['total'])
+            })
+
+        return {
+            'weekStart': start_of_week.isoformat(),
+            'weekEnd': (start_of_week + timedelta(days=6)).isoformat(),
+            'totalTasks': total_tasks,
+            'totalCompleted': total_completed,
+            'weeklyRate': _rate(total_completed, total_tasks),
+            'days': weekly_data
+        }
+
+    def achievements(self) -> Dict:
+        return achievements_response(self.game)
+
+
+class StatsEngine:
+    """사용자별 스냅샷 메모이제이션 (버전이 바뀌거나 TTL이 지나면 다시 계산)"""
+
+    def __init__(self, max_entries: int = STATS_CACHE_MAX_ENTRIES, ttl: float = STATS_CACHE_TTL):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    async def snapshot(self, user_id: str) -> StatsSnapshot:
+        # 버전은 데이터를 읽기 전에 확인 - 읽는 도중 커밋된 변경은 다음 호출에서 반영
+        version = await async_store.progress_version(user_id)
+        cached = self._cache.get(user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        days = await async_store.get_daily_progress(user_id)
+        plans = await async_store.get_plan_task_counts(user_id)
+        game = await async_store.get_gamification(user_id)
+        snapshot = StatsSnapshot(days, plans, game)
+        self._cache.set(user_id, (version, snapshot))
+        return snapshot
+
+    def invalidate(self, user_id: Optional[str] = None):
+        if user_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(user_id)
+
+    def stats(self) -> Dict:
+        return self._cache.stats()
+
+
+stats_engine = StatsEngine()
@@ -1,82 +1,172 @@
 # Backend/services/store.py
 """SQLite 기반 영속성 데이터 저장소 + bcrypt 비밀번호 해싱"""
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+import asyncio
+import functools
 import uuid
 import hashlib
 import sqlite3
 import json
 import os
-import bcrypt
+import re
+import threading
+import time
 from jose import jwt
 
+from services.achievements import newly_unlocked
+from services.db_pool import ConnectionPool, DB_POOL_SIZE, DB_PATH
+from services.shared_state import SharedState, shared_state
+from services.password_hasher import password_hasher, hash_password, verify_password
+from services.ttl_cache import TTLCache
+
 # JWT 설정
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "palearn-secret-key-change-in-production-2024")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
-# 데이터베이스 경로
-DB_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "palearn.db")
-
-
-class PlansList(list):
-    """append 시 자동으로 DB에 저장하는 특수 리스트"""
-    def __init__(self, store, user_id, initial_data=None):
-        super().__init__(initial_data or [])
-        self._store = store
-        self._user_id = user_id
-
-    def append(self, plan):
-        """계획 추가 시 DB에도 저장"""
-        super().append(plan)
-        # DB에 저장
-        self._store.save_plan(
-            self._user_id,
-            plan.get('plan_name', '학습 계획'),
-            plan.get('total_duration', ''),
-            plan.get('daily_schedule', [])
-        )
-
-
-class PlansProxy:
-    """plans 딕셔너리처럼 동작하는 프록시 클래스"""
-    def __init__(self, store):
-        self._store = store
-        self._cache = {}
-
-    def get(self, user_id: str, default=None):
-        """딕셔너리의 get처럼 동작"""
-        plans = self._store.get_plans(user_id)
-        return plans if plans else (default if default is not None else [])
+# 스키마 버전 (PRAGMA user_version) - 마이그레이션 추가 시 1씩 증가
+# v1: plans.daily_schedule JSON → plan_days / plan_tasks 정규화
+# v2: token_blacklist(JWT 원문) → revoked_tokens(토큰 해시 + 만료 시각)
+# v3: daily_progress 집계 테이블 백필
+# v4: gamification_state / user_achievements 백필
+# v5: users.active_plan_id (현재 계획 포인터) 추가 - 가장 최근 계획으로 채움
+# v6: change_log 기준점 (이전 데이터는 전체 동기화로만 전달)
+# v7: 데이터 변경 없음 - 이후로는 버전이 같으면 CREATE 문을 실행하지 않음
+# v8: task_events.plan_task_id (완료 취소 시 차감할 이벤트를 계획 태스크 행으로 찾음)
+SCHEMA_VERSION = 8
+
+# 폐기 토큰 목록 동기화 주기(초) - 다른 프로세스에서 추가된 폐기 토큰 반영
+REVOKED_TOKEN_REFRESH_INTERVAL = float(os.getenv("REVOKED_TOKEN_REFRESH_INTERVAL", "5"))
+# 만료된 폐기 토큰 정리 주기(초)
+REVOKED_TOKEN_PURGE_INTERVAL = float(os.getenv("REVOKED_TOKEN_PURGE_INTERVAL", "3600"))
+
+# 인증 캐시 (토큰 → user_id/exp/사용자 행) - 매 요청마다 JWT 검증 + 사용자 조회 생략
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "30"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+# 샘플 계정 비밀번호('Sample123!')의 미리 계산한 bcrypt 해시 (cost 12)
+# 시작 시 bcrypt를 돌리지 않음 - BCRYPT_ROUNDS가 다르면 첫 로그인 때 재해싱
+SAMPLE_PASSWORD_HASH = "$2b$12$jxWR3/ibvm9G1insTy3Pf.H8AMQDluCqwvXBUezsjGALYJGdZqaPy"
+
+# 계획 캐시 (사용자별 전체 계획 / 현재 계획) - 크기는 직렬화된 태스크 JSON 길이 기준 근사치
+PLAN_CACHE_TTL = float(os.getenv("PLAN_CACHE_TTL", "60"))
+PLAN_CACHE_MAX_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "2000"))
+PLAN_CACHE_MAX_BYTES = int(os.getenv("PLAN_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# 변경 로그 (델타 동기화) - 보관 기간이 지난 항목은 정리, 그보다 오래된 커서는 전체 동기화
+CHANGE_LOG_RETENTION_DAYS = int(os.getenv("CHANGE_LOG_RETENTION_DAYS", "30"))
+CHANGE_LOG_PURGE_INTERVAL = float(os.getenv("CHANGE_LOG_PURGE_INTERVAL", "3600"))
+# IN (...) 조회 1회당 최대 파라미터 수
+_IN_CHUNK = 500
+
+# 태스크 소요 시간 문자열 파싱 ("1시간 30분", "45분", "1.5시간", "12:30")
+_DURATION_HOURS = re.compile(r'(\d+(?:\.\d+)?)\s*(?:시간|hours?|hrs?|h\b)', re.IGNORECASE)
+_DURATION_MINUTES = re.compile(r'(\d+)\s*(?:분|minutes?|mins?|m\b)', re.IGNORECASE)
+_DURATION_CLOCK = re.compile(r'^\s*(?:(\d+):)?(\d{1,2}):(\d{2})\s*$')
+
+
+def _duration_minutes(duration: Optional[str]) -> int:
+    """소요 시간 문자열 → 분 (알 수 없으면 0)"""
+    if not duration:
+        return 0
+    clock = _DURATION_CLOCK.match(duration)
+    if clock:
+        # 강의 길이 표기 (H:MM:SS / MM:SS)
+        hours, minutes, seconds = int(clock.group(1) or 0), int(clock.group(2)), int(clock.group(3))
+        return hours * 60 + minutes + (1 if seconds >= 30 else 0)
+    hours = sum(float(h) for h in _DURATION_HOURS.findall(duration))
+    minutes = sum(int(m) for m in _DURATION_MINUTES.findall(duration))
+    return int(hours * 60) + minutes
+
+
+# 같은 날짜에 같은 task_id가 여러 계획에 있을 때 현재 계획의 태스크를 먼저 선택 (파라미터: user_id)
+_ACTIVE_PLAN_FIRST = "ORDER BY plan_id = (SELECT active_plan_id FROM users WHERE user_id = ?) DESC, plan_id"
+
+
+# 학습 활동 집계 단위
+ACTIVITY_GRANULARITIES = ('day', 'week', 'month')
+
+
+def activity_period(day, granularity: str) -> str:
+    """날짜가 속한 집계 구간의 시작일 (day / week=월요일 / month=1일)"""
+    if granularity == 'week':
+        day = day - timedelta(days=day.weekday())
+    elif granularity == 'month':
+        day = day.replace(day=1)
+    return day.isoformat()
+
+
+class PlanCache:
+    """사용자별 계획 캐시 (버전 + 항목 수/크기 제한 LRU)
+
+    쓰기 경로는 커밋 후 invalidate()로 버전을 올리고 항목을 지웁니다.
+    읽기 경로는 DB 조회 전에 버전을 받아 두고, 조회 중 버전이 바뀌었으면 결과를 캐시하지 않습니다.
+    버전은 공유 상태에 있으므로 다른 워커의 쓰기도 다음 조회에서 반영됩니다.
+    반환되는 계획 dict는 캐시와 공유되므로 호출자가 수정하면 안 됩니다.
+    """
+
+    KINDS = ('all', 'active')
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, state: SharedState):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes)
+        self._state = state
+        self._stale = 0
+
+    def version(self, user_id: str) -> int:
+        return self._state.get(f"plan_version:{user_id}") or 0
+
+    def get(self, user_id: str, kind: str, version: int):
+        """같은 버전으로 저장된 값 (없으면 None)"""
+        cached = self._cache.get((user_id, kind))
+        if cached is None or cached[0] != version:
+            return None
+        return cached[1]
 
-    def __getitem__(self, user_id: str):
-        """plans[user_id] 접근"""
-        if user_id not in self._cache:
-            plans = self._store.get_plans(user_id)
-            self._cache[user_id] = PlansList(self._store, user_id, plans)
-        return self._cache[user_id]
+    def set(self, user_id: str, kind: str, version: int, value, size: int):
+        """조회 시작 후 버전이 바뀌지 않은 경우에만 저장"""
+        if self.version(user_id) != version:
+            self._stale += 1
+            return
+        self._cache.set((user_id, kind), (version, value), size=size)
 
-    def __setitem__(self, user_id: str, value):
-        """plans[user_id] = value 설정"""
-        self._cache[user_id] = PlansList(self._store, user_id, value)
+    def invalidate(self, user_id: str):
+        """쓰기 반영 - 트랜잭션 커밋 후 호출"""
+        self._state.incr(f"plan_version:{user_id}")
+        for kind in self.KINDS:
+            self._cache.pop((user_id, kind))
 
-    def setdefault(self, user_id: str, default=None):
-        """딕셔너리의 setdefault처럼 동작"""
-        if user_id not in self._cache:
-            plans = self._store.get_plans(user_id)
-            self._cache[user_id] = PlansList(self._store, user_id, plans if plans else (default if default is not None else []))
-        return self._cache[user_id]
+    def stats(self) -> Dict:
+        stats = self._cache.stats()
+        stats["stale_discards"] = self._stale
+        return stats
 
 
 class DataStore:
     def __init__(self):
-        self._ensure_db_dir()
-        self._init_db()
-        # plans 프록시 - 기존 코드와 호환성 유지
-        self.plans = PlansProxy(self)
+        # DB 작업은 open()에서 (서버는 lifespan 시작 시, 스크립트는 첫 쿼리 때)
+        self._pool = ConnectionPool(DB_PATH)
+        self._ready = False
+        self._opening = False
+        self._open_lock = threading.RLock()
+        # 폐기 토큰 (token_hash → 만료 시각) - 인증 시 DB 조회 없이 메모리에서 확인
+        self._revoked: Dict[str, float] = {}
+        self._revoked_lock = threading.Lock()
+        self._revoked_last_id = 0
+        self._revoked_synced_at = 0.0
+        self._revoked_purged_at = 0.0
+        # 인증 캐시 - 로그아웃/토큰 폐기/프로필 수정 시 무효화
+        self._auth_cache = TTLCache(max_entries=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_CACHE_TTL)  # token → user_id/만료
+        # 사용자 행은 user_id 단위로 한 번만 캐시 - 무효화가 그 사용자 항목 하나만 지움
+        self._user_cache = TTLCache(max_entries=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_CACHE_TTL)
+        # 사용자별 진행률 변경 번호 (커밋 후 증가, 워커 간 공유) - 통계 메모이제이션 무효화용
+        self._state = shared_state
+        self._change_log_purged_at = 0.0
+        # 계획 캐시 - 계획 저장/태스크 갱신/현재 계획 변경 시 무효화
+        self._plan_cache = PlanCache(PLAN_CACHE_MAX_ENTRIES, PLAN_CACHE_MAX_BYTES, PLAN_CACHE_TTL, shared_state)
         # 기타 메모리 캐시
-        self.quiz_answers = {}
         self.notifications_cache = {}
 
     def _ensure_db_dir(self):
@@ -85,104 +175,334 @@ class DataStore:
         if not os.path.exists(db_dir):
             os.makedirs(db_dir)
 
-    def _get_connection(self):
-        """SQLite 연결 반환"""
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def open(self):
+        """DB 디렉토리/스키마/샘플 데이터 준비 (최초 1회, 여러 번 호출해도 안전)"""
+        if self._ready:
+            return
+        with self._open_lock:
+            # _opening: 초기화 중인 스레드 자신의 쿼리는 그대로 진행
+            if self._ready or self._opening:
+                return
+            self._opening = True
+            try:
+                self._ensure_db_dir()
+                self._init_db()
+                self._sync_revoked_tokens()
+                self.init_sample_data()
+                self._ready = True
+            finally:
+                self._opening = False
+
+    def _connection(self):
+        """풀에서 커넥션 대여 (with 블록 = 트랜잭션, 종료 시 commit/rollback 후 반납)"""
+        if not self._ready:
+            self.open()
+        return self._pool.connection()
+
+    def pool_stats(self) -> Dict:
+        """커넥션 풀 메트릭 (대여 횟수, 대기 시간 등)"""
+        return self._pool.stats()
+
+    def plan_cache_stats(self) -> Dict:
+        """계획 캐시 메트릭 (적중률, 제거 횟수, 사용 크기 등)"""
+        return self._plan_cache.stats()
 
     def _init_db(self):
-        """데이터베이스 테이블 초기화"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        """데이터베이스 테이블 초기화 - 스키마 버전이 최신이면 생략
 
-        # Users 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id TEXT PRIMARY KEY,
-                username TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                name TEXT NOT NULL,
-                birth TEXT,
-                photo_url TEXT,
-                friend_code TEXT UNIQUE NOT NULL,
-                created_at TEXT NOT NULL
-            )
-        ''')
+        테이블/인덱스를 추가하거나 바꿀 때는 SCHEMA_VERSION도 올려야 기존 DB에 반영됩니다.
+        """
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            if cursor.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+                return
 
-        # Friendships 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS friendships (
-                user_id TEXT NOT NULL,
-                friend_id TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                PRIMARY KEY (user_id, friend_id),
-                FOREIGN KEY (user_id) REFERENCES users(user_id),
-                FOREIGN KEY (friend_id) REFERENCES users(user_id)
-            )
-        ''')
+            # Users 테이블
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    email TEXT UNIQUE NOT NULL,
+                    password TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    birth TEXT,
+                    photo_url TEXT,
+                    friend_code TEXT UNIQUE NOT NULL,
+                    created_at TEXT NOT NULL,
+                    active_plan_id INTEGER  -- 현재 계획 (plans.id), 계획 저장 시 새 계획으로 변경
+                )
+            ''')
 
-        # Plans 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS plans (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                plan_name TEXT NOT NULL,
-                total_duration TEXT,
-                daily_schedule TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        ''')
+            # Friendships 테이블
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS friendships (
+                    user_id TEXT NOT NULL,
+                    friend_id TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (user_id, friend_id),
+                    FOREIGN KEY (user_id) REFERENCES users(user_id),
+                    FOREIGN KEY (friend_id) REFERENCES users(user_id)
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_friendships_friend ON friendships (friend_id, user_id)")
 
-        # Notifications 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS notifications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                message TEXT NOT NULL,
-                is_read INTEGER DEFAULT 0,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        ''')
+            # Plans 테이블
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS plans (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    plan_name TEXT NOT NULL,
+                    total_duration TEXT,
+                    daily_schedule TEXT,  -- 레거시 JSON (v1 마이그레이션 후 NULL)
+                    created_at TEXT NOT NULL,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_plans_user_created ON plans (user_id, created_at)")
 
-        # Quiz Answers 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS quiz_answers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                quiz_data TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
+            # Plan Days 테이블 (계획 → 날짜)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS plan_days (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    plan_id INTEGER NOT NULL,
+                    user_id TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    extra TEXT,  -- date/tasks 외 필드 JSON
+                    FOREIGN KEY (plan_id) REFERENCES plans(id)
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_plan_days_user_date ON plan_days (user_id, date)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_plan_days_plan_date ON plan_days (plan_id, date)")
+
+            # Plan Tasks 테이블 (날짜 → 태스크)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS plan_tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    plan_id INTEGER NOT NULL,
+                    day_id INTEGER NOT NULL,
+                    user_id TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    title TEXT,
+                    duration TEXT,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    data TEXT NOT NULL,  -- 태스크 원본 JSON (completed 제외)
+                    FOREIGN KEY (plan_id) REFERENCES plans(id),
+                    FOREIGN KEY (day_id) REFERENCES plan_days(id)
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_plan_tasks_user_date ON plan_tasks (user_id, date)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_plan_tasks_task ON plan_tasks (task_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_plan_tasks_day ON plan_tasks (day_id, position)")
+
+            # Notifications 테이블
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS notifications (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    is_read INTEGER DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+            ''')
+            # get_notifications가 테이블을 읽지 않도록 is_read, message까지 포함한 커버링 인덱스
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_notifications_user_created "
+                "ON notifications (user_id, created_at, is_read, message)"
             )
-        ''')
 
-        # Tokens 테이블 (블랙리스트용)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS token_blacklist (
-                token TEXT PRIMARY KEY,
-                blacklisted_at TEXT NOT NULL
+            # Quiz Answers 테이블
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS quiz_answers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    quiz_data TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_quiz_answers_user_created ON quiz_answers (user_id, created_at)")
+
+            # 일별 진행률 집계 (사용자 + 날짜, 모든 계획 합산) - 계획 저장/태스크 갱신 시 같은 트랜잭션에서 갱신
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS daily_progress (
+                    user_id TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    completed INTEGER NOT NULL,
+                    minutes_total INTEGER NOT NULL,
+                    minutes_done INTEGER NOT NULL,
+                    PRIMARY KEY (user_id, date)
+                ) WITHOUT ROWID
+            ''')
+
+            # 게이미피케이션 상태 (연속 학습일 + 누적 카운터) - 계획 저장/태스크 갱신 시 이벤트 방식으로 갱신
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS gamification_state (
+                    user_id TEXT PRIMARY KEY,
+                    current_streak INTEGER NOT NULL DEFAULT 0,  -- last_active_date로 끝나는 연속 일수
+                    longest_streak INTEGER NOT NULL DEFAULT 0,
+                    last_active_date TEXT,  -- 완료 태스크가 있는 가장 늦은 날짜
+                    completed_tasks INTEGER NOT NULL DEFAULT 0,
+                    total_tasks INTEGER NOT NULL DEFAULT 0,
+                    plan_count INTEGER NOT NULL DEFAULT 0,
+                    updated_at TEXT
+                )
+            ''')
+
+            # 해금된 업적 (한 번 해금되면 유지)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS user_achievements (
+                    user_id TEXT NOT NULL,
+                    achievement_id TEXT NOT NULL,
+                    unlocked_at TEXT NOT NULL,
+                    PRIMARY KEY (user_id, achievement_id)
+                ) WITHOUT ROWID
+            ''')
+
+            # 태스크 완료 이벤트 로그 (추가 전용) - completed=0은 완료 취소
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS task_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    plan_task_id INTEGER,  -- plan_tasks.id (task_id는 계획 안에서만 고유)
+                    date TEXT NOT NULL,  -- 계획상 날짜
+                    completed INTEGER NOT NULL,
+                    minutes INTEGER NOT NULL,
+                    completed_at TEXT NOT NULL  -- 이벤트 발생 시각
+                )
+            ''')
+
+            # 실제 학습 활동 집계 (완료 시각 기준, 일/주/월) - period: 해당 일 / 주의 월요일 / 월의 1일
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS activity_rollups (
+                    user_id TEXT NOT NULL,
+                    granularity TEXT NOT NULL,
+                    period TEXT NOT NULL,
+                    completed INTEGER NOT NULL,
+                    minutes INTEGER NOT NULL,
+                    PRIMARY KEY (user_id, granularity, period)
+                ) WITHOUT ROWID
+            ''')
+
+            # 변경 로그 (델타 동기화용, 추가 전용) - seq가 동기화 커서
+            # entity: plan / task(plan_tasks.id) / notification / notifications(읽음 처리) / friend / active_plan
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS change_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    entity TEXT NOT NULL,
+                    entity_id TEXT NOT NULL,
+                    op TEXT NOT NULL,  -- upsert / delete / read
+                    changed_at TEXT NOT NULL
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_log_user_seq ON change_log (user_id, seq)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_log_changed_at ON change_log (changed_at)")
+
+            # 폐기 토큰 테이블 (로그아웃) - JWT 원문 대신 sha256 해시, 만료 후 정리
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS revoked_tokens (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    token_hash TEXT NOT NULL UNIQUE,
+                    expires_at REAL NOT NULL,
+                    revoked_at TEXT NOT NULL
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires ON revoked_tokens(expires_at)')
+
+            self._migrate(cursor)
+
+    def _migrate(self, cursor):
+        """PRAGMA user_version 기반 스키마 마이그레이션"""
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+
+        if version < 1:
+            # v1: daily_schedule JSON blob → plan_days / plan_tasks
+            cursor.execute(
+                "SELECT id, user_id, daily_schedule FROM plans WHERE daily_schedule IS NOT NULL"
             )
-        ''')
+            for row in cursor.fetchall():
+                schedule = json.loads(row['daily_schedule']) if row['daily_schedule'] else []
+                self._insert_schedule(cursor, row['id'], row['user_id'], schedule)
+            cursor.execute("UPDATE plans SET daily_schedule = NULL WHERE daily_schedule IS NOT NULL")
+
+        if version < 2:
+            # v2: token_blacklist(JWT 원문, 정리 없음) → revoked_tokens(해시 + 만료 시각)
+            legacy = cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'token_blacklist'"
+            ).fetchone()
+            if legacy:
+                now = time.time()
+                for row in cursor.execute("SELECT token, blacklisted_at FROM token_blacklist").fetchall():
+                    expires_at = self._token_expiry(row['token'])
+                    if expires_at > now:
+                        cursor.execute(
+                            "INSERT OR IGNORE INTO revoked_tokens (token_hash, expires_at, revoked_at) VALUES (?, ?, ?)",
+                            (self._token_hash(row['token']), expires_at, row['blacklisted_at'])
+                        )
+                cursor.execute("DROP TABLE token_blacklist")
+
+        if version < 3:
+            # v3: 기존 plan_tasks로 daily_progress 채우기
+            self._rebuild_daily_progress(cursor)
+
+        if version < 4:
+            # v4: daily_progress로 연속 학습일/카운터/업적 채우기 (알림 없이)
+            self._rebuild_gamification(cursor)
+
+        if version < 5:
+            # v5: 현재 계획 포인터 - 기존 사용자는 가장 최근 계획
+            columns = {row['name'] for row in cursor.execute("PRAGMA table_info(users)").fetchall()}
+            if 'active_plan_id' not in columns:
+                cursor.execute("ALTER TABLE users ADD COLUMN active_plan_id INTEGER")
+            cursor.execute('''
+                UPDATE users SET active_plan_id = (SELECT MAX(id) FROM plans WHERE plans.user_id = users.user_id)
+                WHERE active_plan_id IS NULL
+            ''')
+
+        if version < 6:
+            # v6: 커서가 항상 1 이상이 되도록 기준점 기록 - 이 시점 이전 데이터는 since 없는 전체 동기화로 받음
+            self._log_change(cursor, '*', 'baseline', '*')
+
+        # v7: 변경 없음 - 스키마 버전이 최신이면 테이블 생성을 생략하도록 바뀐 시점 표시
+
+        if version < 8:
+            # v8: 이벤트에 계획 태스크 행 id 기록 - 기존 이벤트는 (사용자, task_id, 날짜)가 한 행에만 맞을 때 채움
+            columns = {row['name'] for row in cursor.execute("PRAGMA table_info(task_events)").fetchall()}
+            if 'plan_task_id' not in columns:
+                cursor.execute("ALTER TABLE task_events ADD COLUMN plan_task_id INTEGER")
+            cursor.execute("DROP INDEX IF EXISTS idx_task_events_user_task")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_task_events_plan_task ON task_events (plan_task_id, id)")
+            cursor.execute('''
+                UPDATE task_events SET plan_task_id = (
+                    SELECT MIN(p.id) FROM plan_tasks p
+                    WHERE p.user_id = task_events.user_id AND p.task_id = task_events.task_id AND p.date = task_events.date
+                )
+                WHERE plan_task_id IS NULL AND (
+                    SELECT COUNT(*) FROM plan_tasks p
+                    WHERE p.user_id = task_events.user_id AND p.task_id = task_events.task_id AND p.date = task_events.date
+                ) = 1
+            ''')
 
-        conn.commit()
-        conn.close()
+        if version < SCHEMA_VERSION:
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
     # ==================== 비밀번호 해싱 (bcrypt) ====================
 
+    # 동기 경로(스크립트/샘플 데이터)용 - 라우터는 AsyncDataStore를 통해 bcrypt 전용 워커 풀 사용
+
     def _hash_password(self, password: str) -> str:
-        """bcrypt로 비밀번호 해싱"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """bcrypt로 비밀번호 해싱 (설정된 work factor)"""
+        return hash_password(password, password_hasher.rounds)
 
     def _verify_password(self, password: str, hashed: str) -> bool:
         """bcrypt로 비밀번호 검증"""
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
-        except Exception:
-            return False
+        return verify_password(password, hashed)
 
     # ==================== JWT 토큰 관리 ====================
 
@@ -193,65 +513,122 @@ class DataStore:
             "sub": user_id,
             "exp": expire,
             "iat": datetime.utcnow(),
+            "jti": uuid.uuid4().hex,  # 같은 초에 발급된 토큰도 서로 구분 (폐기 시 다른 세션에 영향 없음)
             "type": "access"
         }
         return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-    def verify_token(self, token: str) -> Optional[str]:
-        """JWT 토큰 검증 후 user_id 반환"""
+    @staticmethod
+    def _token_hash(token: str) -> str:
+        """폐기 목록 키 - 토큰 원문 대신 sha256"""
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _token_expiry(token: str) -> float:
+        """토큰의 exp (epoch 초) - 파싱 불가 시 최대 수명 기준"""
         try:
-            # 블랙리스트 확인
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT token FROM token_blacklist WHERE token = ?", (token,))
-            if cursor.fetchone():
-                conn.close()
-                return None
-            conn.close()
+            return float(jwt.get_unverified_claims(token)["exp"])
+        except Exception:
+            return time.time() + ACCESS_TOKEN_EXPIRE_HOURS * 3600
+
+    def _sync_revoked_tokens(self):
+        """DB의 새 폐기 토큰을 메모리에 반영 (마지막 id 이후만 조회) + 주기적으로 만료분 정리"""
+        now = time.time()
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT id, token_hash, expires_at FROM revoked_tokens WHERE id > ? ORDER BY id",
+                (self._revoked_last_id,)
+            ).fetchall()
+
+        with self._revoked_lock:
+            for row in rows:
+                if row['expires_at'] > now:
+                    self._revoked[row['token_hash']] = row['expires_at']
+                self._revoked_last_id = max(self._revoked_last_id, row['id'])
+            self._revoked_synced_at = time.monotonic()
+
+        if time.monotonic() - self._revoked_purged_at >= REVOKED_TOKEN_PURGE_INTERVAL:
+            self.purge_expired_tokens()
+
+    def purge_expired_tokens(self) -> int:
+        """만료된 폐기 토큰 삭제 (만료된 토큰은 jwt.decode에서 이미 거부됨)"""
+        now = time.time()
+        with self._connection() as conn:
+            removed = conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (now,)).rowcount
+
+        with self._revoked_lock:
+            for token_hash in [h for h, exp in self._revoked.items() if exp <= now]:
+                del self._revoked[token_hash]
+            self._revoked_purged_at = time.monotonic()
+        return removed
+
+    def _is_revoked(self, token: str) -> bool:
+        """폐기 여부 확인 (주기적으로 DB의 새 폐기 토큰 반영)"""
+        if time.monotonic() - self._revoked_synced_at >= REVOKED_TOKEN_REFRESH_INTERVAL:
+            self._sync_revoked_tokens()
+        return self._token_hash(token) in self._revoked
 
+    def verify_token(self, token: str) -> Optional[str]:
+        """JWT 토큰 검증 후 user_id 반환 (폐기 여부는 메모리에서 확인)"""
+        try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            return payload.get("sub")
         except Exception:
             return None
 
+        if self._is_revoked(token):
+            return None
+        return payload.get("sub")
+
     def blacklist_token(self, token: str):
-        """토큰을 블랙리스트에 추가"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "INSERT OR IGNORE INTO token_blacklist (token, blacklisted_at) VALUES (?, ?)",
-                (token, datetime.now().isoformat())
+        """토큰 폐기 - DB 기록 후 메모리 목록에 즉시 반영"""
+        token_hash = self._token_hash(token)
+        expires_at = self._token_expiry(token)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO revoked_tokens (token_hash, expires_at, revoked_at) VALUES (?, ?, ?)",
+                (token_hash, expires_at, datetime.now().isoformat())
             )
-            conn.commit()
-        finally:
-            conn.close()
+        with self._revoked_lock:
+            self._revoked[token_hash] = expires_at
+        self._auth_cache.pop(token)
+
+    def revoked_token_stats(self) -> Dict:
+        """폐기 토큰 메모리 목록 + 인증 캐시 현황"""
+        with self._revoked_lock:
+            stats = {"revoked_in_memory": len(self._revoked), "last_id": self._revoked_last_id}
+        stats["token_cache"] = self._auth_cache.stats()
+        stats["user_cache"] = self._user_cache.stats()
+        return stats
 
     # ==================== 사용자 관리 ====================
 
-    def create_user(self, username: str, email: str, password: str, name: str, birth: str, photo_url: str = None) -> Optional[Dict]:
-        """사용자 생성 (bcrypt 해싱)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    def email_registered(self, email: str) -> bool:
+        """이미 가입된 이메일인지"""
+        with self._connection() as conn:
+            return conn.execute("SELECT 1 FROM users WHERE email = ?", (email,)).fetchone() is not None
 
+    def create_user(self, username: str, email: str, password: str, name: str, birth: str, photo_url: str = None,
+                    password_hash: Optional[str] = None) -> Optional[Dict]:
+        """사용자 생성 (password_hash가 없으면 여기서 bcrypt 해싱)"""
         # 이메일 중복 확인
-        cursor.execute("SELECT user_id FROM users WHERE email = ?", (email,))
-        if cursor.fetchone():
-            conn.close()
+        if self.email_registered(email):
             return None
 
         user_id = str(uuid.uuid4())
         friend_code = hashlib.md5(user_id.encode()).hexdigest()[:8].upper()
-        password_hash = self._hash_password(password)
+        # bcrypt는 커넥션을 점유하지 않은 상태에서 수행
+        password_hash = password_hash or self._hash_password(password)
         created_at = datetime.now().isoformat()
 
-        cursor.execute('''
-            INSERT INTO users (user_id, username, email, password, name, birth, photo_url, friend_code, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (user_id, username, email, password_hash, name, birth, photo_url, friend_code, created_at))
-
-        conn.commit()
-        conn.close()
+        with self._connection() as conn:
+            try:
+                conn.execute('''
+                    INSERT INTO users (user_id, username, email, password, name, birth, photo_url, friend_code, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (user_id, username, email, password_hash, name, birth, photo_url, friend_code, created_at))
+            except sqlite3.IntegrityError:
+                # 해싱 중 같은 이메일로 동시 가입된 경우
+                return None
 
         return {
             'user_id': user_id,
@@ -265,43 +642,78 @@ class DataStore:
         }
 
     def login(self, email: str, password: str) -> Optional[Dict]:
-        """로그인 (bcrypt 검증 + JWT 발급)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-        row = cursor.fetchone()
-        conn.close()
-
+        """로그인 (bcrypt 검증 + JWT 발급, work factor가 바뀌었으면 재해싱)"""
+        row = self.get_credentials(email)
         if not row:
             return None
 
         if not self._verify_password(password, row['password']):
             return None
 
-        token = self._create_access_token(row['user_id'])
+        if password_hasher.needs_rehash(row['password']):
+            self.replace_password_hash(row['user_id'], row['password'], self._hash_password(password))
 
+        return self._login_result(row)
+
+    def get_credentials(self, email: str) -> Optional[Dict]:
+        """로그인 검증용 사용자 행 (user_id, name, password 해시)"""
+        with self._connection() as conn:
+            row = conn.execute("SELECT user_id, name, password FROM users WHERE email = ?", (email,)).fetchone()
+        return dict(row) if row else None
+
+    def replace_password_hash(self, user_id: str, old_hash: str, new_hash: str) -> bool:
+        """재해싱 결과 저장 - 그 사이 비밀번호가 바뀌었으면 건너뜀"""
+        with self._connection() as conn:
+            updated = conn.execute(
+                "UPDATE users SET password = ? WHERE user_id = ? AND password = ?",
+                (new_hash, user_id, old_hash)
+            ).rowcount > 0
+        if updated:
+            password_hasher.record_rehash()
+            self._invalidate_user_cache(user_id)
+        return updated
+
+    def _login_result(self, row: Dict) -> Dict:
+        """검증이 끝난 사용자에게 토큰 발급"""
         return {
-            'token': token,
+            'token': self._create_access_token(row['user_id']),
             'user_id': row['user_id'],
             'name': row['name']
         }
 
     def get_user_by_token(self, token: str) -> Optional[Dict]:
-        """토큰으로 사용자 조회"""
-        user_id = self.verify_token(token)
-        if not user_id:
-            return None
-        return self.get_user_by_id(user_id)
+        """토큰으로 사용자 조회 - 캐시 적중 시 만료/폐기 여부만 확인하고 DB 조회 생략"""
+        cached = self._auth_cache.get(token)
+        if cached is not None:
+            if cached['exp'] <= time.time() or self._is_revoked(token):
+                self._auth_cache.pop(token)
+                return None
+            user_id = cached['user_id']
+        else:
+            try:
+                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            except Exception:
+                return None
+            user_id = payload.get("sub")
+            if not user_id or self._is_revoked(token):
+                return None
+            self._auth_cache.set(token, {'user_id': user_id, 'exp': float(payload.get('exp', 0))})
+
+        user = self._user_cache.get(user_id)
+        if user is None:
+            user = self.get_user_by_id(user_id)
+            if not user:
+                self._auth_cache.pop(token)
+                return None
+            self._user_cache.set(user_id, user)
+        return dict(user)
 
     def get_user_by_id(self, user_id: str) -> Optional[Dict]:
         """ID로 사용자 조회"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
+            row = cursor.fetchone()
 
         if not row:
             return None
@@ -319,9 +731,6 @@ class DataStore:
 
     def update_user(self, user_id: str, **kwargs) -> bool:
         """사용자 정보 업데이트"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
         updates = []
         values = []
 
@@ -332,25 +741,30 @@ class DataStore:
             elif key == 'password' and value:
                 updates.append("password = ?")
                 values.append(self._hash_password(value))
+            elif key == 'password_hash' and value:
+                # AsyncDataStore가 bcrypt 워커 풀에서 미리 해싱한 값
+                updates.append("password = ?")
+                values.append(value)
 
         if not updates:
-            conn.close()
             return False
 
         values.append(user_id)
-        cursor.execute(f"UPDATE users SET {', '.join(updates)} WHERE user_id = ?", values)
-        conn.commit()
-        conn.close()
+        with self._connection() as conn:
+            conn.execute(f"UPDATE users SET {', '.join(updates)} WHERE user_id = ?", values)
+        self._invalidate_user_cache(user_id)
         return True
 
+    def _invalidate_user_cache(self, user_id: str):
+        """캐시된 사용자 정보 무효화 (토큰 → user_id 항목은 그대로 유효)"""
+        self._user_cache.pop(user_id)
+
     def get_user_by_friend_code(self, code: str) -> Optional[Dict]:
         """친구 코드로 사용자 조회"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM users WHERE friend_code = ?", (code.upper(),))
-        row = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users WHERE friend_code = ?", (code.upper(),))
+            row = cursor.fetchone()
 
         return dict(row) if row else None
 
@@ -358,17 +772,14 @@ class DataStore:
 
     def get_friends(self, user_id: str) -> List[Dict]:
         """친구 목록 조회"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT u.* FROM users u
-            JOIN friendships f ON u.user_id = f.friend_id
-            WHERE f.user_id = ?
-        ''', (user_id,))
-
-        rows = cursor.fetchall()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT u.* FROM users u
+                JOIN friendships f ON u.user_id = f.friend_id
+                WHERE f.user_id = ?
+            ''', (user_id,))
+            rows = cursor.fetchall()
 
         return [dict(row) for row in rows]
 
@@ -377,120 +788,692 @@ class DataStore:
         if user_id == friend_id:
             return False
 
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
         try:
-            created_at = datetime.now().isoformat()
-            # 양방향 추가
-            cursor.execute(
-                "INSERT OR IGNORE INTO friendships (user_id, friend_id, created_at) VALUES (?, ?, ?)",
-                (user_id, friend_id, created_at)
-            )
-            cursor.execute(
-                "INSERT OR IGNORE INTO friendships (user_id, friend_id, created_at) VALUES (?, ?, ?)",
-                (friend_id, user_id, created_at)
-            )
-            conn.commit()
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                created_at = datetime.now().isoformat()
+                # 양방향 추가
+                for owner, other in ((user_id, friend_id), (friend_id, user_id)):
+                    cursor.execute(
+                        "INSERT OR IGNORE INTO friendships (user_id, friend_id, created_at) VALUES (?, ?, ?)",
+                        (owner, other, created_at)
+                    )
+                    if cursor.rowcount:
+                        self._log_change(cursor, owner, 'friend', other)
             return True
         except Exception:
             return False
-        finally:
-            conn.close()
 
     def remove_friend(self, user_id: str, friend_id: str) -> bool:
         """친구 삭제 (양방향)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("DELETE FROM friendships WHERE user_id = ? AND friend_id = ?", (user_id, friend_id))
-        cursor.execute("DELETE FROM friendships WHERE user_id = ? AND friend_id = ?", (friend_id, user_id))
-
-        conn.commit()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            for owner, other in ((user_id, friend_id), (friend_id, user_id)):
+                cursor.execute("DELETE FROM friendships WHERE user_id = ? AND friend_id = ?", (owner, other))
+                if cursor.rowcount:
+                    self._log_change(cursor, owner, 'friend', other, 'delete')
         return True
 
     # ==================== 학습 계획 관리 ====================
 
-    def get_plans(self, user_id: str) -> List[Dict]:
-        """사용자의 모든 학습 계획 조회"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    def _insert_schedule(self, cursor, plan_id: int, user_id: str, daily_schedule: List[Dict]):
+        """daily_schedule을 plan_days / plan_tasks 행으로 저장"""
+        for day_pos, day in enumerate(daily_schedule or []):
+            extra = {k: v for k, v in day.items() if k not in ('date', 'tasks')}
+            cursor.execute(
+                "INSERT INTO plan_days (plan_id, user_id, date, position, extra) VALUES (?, ?, ?, ?, ?)",
+                (plan_id, user_id, day.get('date', ''), day_pos,
+                 json.dumps(extra, ensure_ascii=False) if extra else None)
+            )
+            day_id = cursor.lastrowid
+
+            task_rows = []
+            for task_pos, task in enumerate(day.get('tasks', [])):
+                if not task.get('id'):
+                    task['id'] = str(uuid.uuid4())
+                data = {k: v for k, v in task.items() if k != 'completed'}
+                task_rows.append((
+                    plan_id, day_id, user_id, day.get('date', ''), str(task['id']), task_pos,
+                    task.get('title'), task.get('duration'), 1 if task.get('completed') else 0,
+                    json.dumps(data, ensure_ascii=False)
+                ))
+            cursor.executemany('''
+                INSERT INTO plan_tasks (plan_id, day_id, user_id, date, task_id, position, title, duration, completed, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', task_rows)
+
+        return self._refresh_daily_progress(cursor, user_id, {day.get('date', '') for day in daily_schedule or []})
+
+    def _refresh_daily_progress(self, cursor, user_id: str, dates) -> List[tuple]:
+        """해당 날짜들의 daily_progress 행을 plan_tasks 기준으로 다시 계산 (호출자의 트랜잭션 안에서)
+
+        반환: (date, 이전 total, 이전 completed, 새 total, 새 completed) 목록 - 게이미피케이션 이벤트용
+        """
+        changes = []
+        for date in dates:
+            old = cursor.execute(
+                "SELECT total, completed FROM daily_progress WHERE user_id = ? AND date = ?",
+                (user_id, date)
+            ).fetchone()
+            old_total, old_completed = (old['total'], old['completed']) if old else (0, 0)
+            rows = cursor.execute(
+                "SELECT duration, completed FROM plan_tasks WHERE user_id = ? AND date = ?",
+                (user_id, date)
+            ).fetchall()
+            if not rows:
+                cursor.execute("DELETE FROM daily_progress WHERE user_id = ? AND date = ?", (user_id, date))
+                changes.append((date, old_total, old_completed, 0, 0))
+                continue
+            minutes = [(_duration_minutes(row['duration']), row['completed']) for row in rows]
+            completed = sum(1 for _, done in minutes if done)
+            cursor.execute('''
+                INSERT OR REPLACE INTO daily_progress (user_id, date, total, completed, minutes_total, minutes_done)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                user_id, date, len(rows), completed,
+                sum(m for m, _ in minutes), sum(m for m, done in minutes if done)
+            ))
+            changes.append((date, old_total, old_completed, len(rows), completed))
+        return changes
+
+    def _rebuild_daily_progress(self, cursor, user_id: Optional[str] = None):
+        """daily_progress 전체(또는 한 사용자) 재계산"""
+        if user_id is None:
+            cursor.execute("DELETE FROM daily_progress")
+            keys = cursor.execute("SELECT DISTINCT user_id, date FROM plan_tasks").fetchall()
+        else:
+            cursor.execute("DELETE FROM daily_progress WHERE user_id = ?", (user_id,))
+            keys = cursor.execute("SELECT DISTINCT user_id, date FROM plan_tasks WHERE user_id = ?", (user_id,)).fetchall()
+
+        by_user: Dict[str, set] = {}
+        for row in keys:
+            by_user.setdefault(row['user_id'], set()).add(row['date'])
+        for uid, dates in by_user.items():
+            self._refresh_daily_progress(cursor, uid, dates)
+        return sum(len(dates) for dates in by_user.values())
+
+    def rebuild_daily_progress(self, user_id: Optional[str] = None) -> int:
+        """daily_progress 백필 - 재계산한 (사용자, 날짜) 행 수 반환"""
+        with self._connection() as conn:
+            rows = self._rebuild_daily_progress(conn.cursor(), user_id)
+            self._rebuild_gamification(conn.cursor(), user_id)
+        self._bump_progress_version(user_id or '*')
+        return rows
+
+    def _bump_progress_version(self, user_id: str):
+        """진행률 변경 기록 - 트랜잭션 커밋 후 호출 ('*'는 전체 재계산)"""
+        # 전체 재계산과 비교할 수 있도록 모든 사용자가 하나의 증가 번호를 사용
+        self._state.set(f"progress_version:{user_id}", self._state.incr("progress_seq"))
+
+    def progress_version(self, user_id: str) -> int:
+        """사용자의 진행률 데이터 버전 (값이 바뀌면 메모이제이션 결과 폐기)"""
+        return max(self._state.get(f"progress_version:{user_id}") or 0,
+                   self._state.get("progress_version:*") or 0)
+
+    def _insert_plan(self, cursor, user_id: str, plan_name: str, total_duration: str, daily_schedule: List[Dict],
+                     notify: bool = True) -> int:
+        """plans 행 + 일정 행 저장 후 plan id 반환 (notify=False면 업적 알림 없음 - 샘플 데이터용)"""
+        cursor.execute('''
+            INSERT INTO plans (user_id, plan_name, total_duration, created_at)
+            VALUES (?, ?, ?, ?)
+        ''', (user_id, plan_name, total_duration, datetime.now().isoformat()))
+        plan_id = cursor.lastrowid
+        changes = self._insert_schedule(cursor, plan_id, user_id, daily_schedule)
+        self._apply_progress_events(cursor, user_id, changes, plans_added=1, notify=notify)
+        # 새로 만든 계획이 현재 계획
+        cursor.execute("UPDATE users SET active_plan_id = ? WHERE user_id = ?", (plan_id, user_id))
+        self._log_change(cursor, user_id, 'plan', plan_id)
+        self._log_change(cursor, user_id, 'active_plan', '*')
+        return plan_id
+
+    @staticmethod
+    def _task_from_row(row) -> Dict:
+        """plan_tasks 행 → 태스크 dict"""
+        task = json.loads(row['data'])
+        task['completed'] = bool(row['completed'])
+        return task
+
+    def get_plans(self, user_id: str, use_cache: bool = True) -> List[Dict]:
+        """사용자의 모든 학습 계획 조회 (최신순, 캐시된 결과는 수정 금지)"""
+        version = self._plan_cache.version(user_id)
+        if use_cache:
+            cached = self._plan_cache.get(user_id, 'all', version)
+            if cached is not None:
+                return cached
+
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id, user_id, plan_name, total_duration, created_at FROM plans WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,)
+            )
+            plan_rows = cursor.fetchall()
+            if not plan_rows:
+                self._plan_cache.set(user_id, 'all', version, [], 0)
+                return []
 
-        cursor.execute("SELECT * FROM plans WHERE user_id = ? ORDER BY created_at DESC", (user_id,))
-        rows = cursor.fetchall()
-        conn.close()
+            cursor.execute(
+                "SELECT id, plan_id, date, extra FROM plan_days WHERE user_id = ? ORDER BY plan_id, position",
+                (user_id,)
+            )
+            day_rows = cursor.fetchall()
+            cursor.execute(
+                "SELECT day_id, completed, data FROM plan_tasks WHERE user_id = ? ORDER BY day_id, position",
+                (user_id,)
+            )
+            task_rows = cursor.fetchall()
+
+        plans = self._assemble_plans(plan_rows, day_rows, task_rows)
+        self._plan_cache.set(user_id, 'all', version, plans, self._rows_size(day_rows, task_rows))
+        return plans
+
+    @staticmethod
+    def _rows_size(day_rows, task_rows) -> int:
+        """계획 캐시 크기 계산용 - 일정 JSON 길이 합"""
+        return sum(len(row['data']) for row in task_rows) + sum(len(row['extra'] or '') + 16 for row in day_rows)
+
+    def _assemble_plans(self, plan_rows, day_rows, task_rows) -> List[Dict]:
+        """plans / plan_days / plan_tasks 행 → 계획 dict 목록 (plan_rows 순서 유지)"""
+        tasks_by_day: Dict[int, List[Dict]] = {}
+        for row in task_rows:
+            tasks_by_day.setdefault(row['day_id'], []).append(self._task_from_row(row))
+
+        days_by_plan: Dict[int, List[Dict]] = {}
+        for row in day_rows:
+            day = {'date': row['date'], 'tasks': tasks_by_day.get(row['id'], [])}
+            if row['extra']:
+                day.update(json.loads(row['extra']))
+            days_by_plan.setdefault(row['plan_id'], []).append(day)
 
         result = []
-        for row in rows:
+        for row in plan_rows:
             plan = dict(row)
-            if plan.get('daily_schedule'):
-                plan['daily_schedule'] = json.loads(plan['daily_schedule'])
+            plan['daily_schedule'] = days_by_plan.get(row['id'], [])
             result.append(plan)
 
         return result
 
-    def save_plan(self, user_id: str, plan_name: str, total_duration: str, daily_schedule: List[Dict]) -> bool:
-        """학습 계획 저장"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    # ==================== 현재 계획 (users.active_plan_id) ====================
+
+    def _active_plan_row(self, cursor, user_id: str):
+        """현재 계획 메타 행 (포인터가 비어 있으면 가장 최근 계획, 계획이 없으면 None)"""
+        row = cursor.execute('''
+            SELECT p.id, p.user_id, p.plan_name, p.total_duration, p.created_at
+            FROM users u JOIN plans p ON p.id = u.active_plan_id
+            WHERE u.user_id = ?
+        ''', (user_id,)).fetchone()
+        if row:
+            return row
+        return cursor.execute(
+            "SELECT id, user_id, plan_name, total_duration, created_at FROM plans WHERE user_id = ? ORDER BY id DESC LIMIT 1",
+            (user_id,)
+        ).fetchone()
 
-        cursor.execute('''
-            INSERT INTO plans (user_id, plan_name, total_duration, daily_schedule, created_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, plan_name, total_duration, json.dumps(daily_schedule, ensure_ascii=False), datetime.now().isoformat()))
+    def get_active_plan(self, user_id: str) -> Optional[Dict]:
+        """현재 계획 1개만 일정 포함 조회 (없으면 None, 캐시된 결과는 수정 금지)"""
+        version = self._plan_cache.version(user_id)
+        cached = self._plan_cache.get(user_id, 'active', version)
+        if cached is not None:
+            return cached or None
+
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            plan_row = self._active_plan_row(cursor, user_id)
+            if not plan_row:
+                # 계획 없음도 캐시 (빈 dict)
+                self._plan_cache.set(user_id, 'active', version, {}, 0)
+                return None
+
+            day_rows = cursor.execute(
+                "SELECT id, plan_id, date, extra FROM plan_days WHERE plan_id = ? ORDER BY position",
+                (plan_row['id'],)
+            ).fetchall()
+            task_rows = cursor.execute('''
+                SELECT t.day_id, t.completed, t.data FROM plan_days d
+                JOIN plan_tasks t ON t.day_id = d.id
+                WHERE d.plan_id = ?
+                ORDER BY t.day_id, t.position
+            ''', (plan_row['id'],)).fetchall()
+
+        plan = self._assemble_plans([plan_row], day_rows, task_rows)[0]
+        self._plan_cache.set(user_id, 'active', version, plan, self._rows_size(day_rows, task_rows))
+        return plan
+
+    def get_active_plan_day(self, user_id: str, date: str) -> Optional[Dict]:
+        """현재 계획의 메타 정보 + 특정 날짜 태스크 (계획이 없으면 None, 날짜가 없으면 tasks=None)"""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            plan_row = self._active_plan_row(cursor, user_id)
+            if not plan_row:
+                return None
+            plan = dict(plan_row)
+
+            day = cursor.execute(
+                "SELECT id FROM plan_days WHERE plan_id = ? AND date = ? ORDER BY position LIMIT 1",
+                (plan['id'], date)
+            ).fetchone()
+            if not day:
+                plan['tasks'] = None
+                return plan
+
+            rows = cursor.execute(
+                "SELECT completed, data FROM plan_tasks WHERE day_id = ? ORDER BY position",
+                (day['id'],)
+            ).fetchall()
+
+        plan['tasks'] = [self._task_from_row(row) for row in rows]
+        return plan
+
+    def get_active_plan_id(self, user_id: str) -> Optional[int]:
+        """현재 계획 id (계획이 없으면 None)"""
+        with self._connection() as conn:
+            row = self._active_plan_row(conn.cursor(), user_id)
+        return row['id'] if row else None
+
+    def set_active_plan(self, user_id: str, plan_id: int) -> bool:
+        """현재 계획 변경 (본인 계획이 아니면 False)"""
+        with self._connection() as conn:
+            cursor = conn.execute('''
+                UPDATE users SET active_plan_id = ?
+                WHERE user_id = ? AND EXISTS (SELECT 1 FROM plans WHERE id = ? AND user_id = ?)
+            ''', (plan_id, user_id, plan_id, user_id))
+            updated = cursor.rowcount > 0
+            if updated:
+                self._log_change(cursor, user_id, 'active_plan', '*')
+        if updated:
+            self._plan_cache.invalidate(user_id)
+            self._invalidate_user_cache(user_id)
+        return updated
+
+    def get_plan_summaries(self, user_id: str) -> List[Dict]:
+        """일정 없이 계획 메타 정보만 조회 (get_plans와 같은 정렬)"""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id, user_id, plan_name, total_duration, created_at FROM plans WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,)
+            )
+            rows = cursor.fetchall()
+
+        return [dict(row) for row in rows]
 
-        conn.commit()
-        conn.close()
+    def get_plan_day_tasks(self, plan_id: int, date: str) -> Optional[List[Dict]]:
+        """특정 계획의 특정 날짜 태스크 조회 (해당 날짜가 없으면 None)"""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id FROM plan_days WHERE plan_id = ? AND date = ? ORDER BY position LIMIT 1",
+                (plan_id, date)
+            )
+            day = cursor.fetchone()
+            if not day:
+                return None
+
+            cursor.execute(
+                "SELECT completed, data FROM plan_tasks WHERE day_id = ? ORDER BY position",
+                (day['id'],)
+            )
+            rows = cursor.fetchall()
+
+        return [self._task_from_row(row) for row in rows]
+
+    def save_plan(self, user_id: str, plan_name: str, total_duration: str, daily_schedule: List[Dict]) -> bool:
+        """학습 계획 저장"""
+        with self._connection() as conn:
+            self._insert_plan(conn.cursor(), user_id, plan_name, total_duration, daily_schedule)
+        self._bump_progress_version(user_id)
+        self._plan_cache.invalidate(user_id)
+        self._invalidate_user_cache(user_id)
         return True
 
+    def add_plan(self, user_id: str, plan: Dict) -> bool:
+        """생성된 계획 dict 저장 (plan_name / total_duration / daily_schedule)"""
+        return self.save_plan(
+            user_id,
+            plan.get('plan_name', '학습 계획'),
+            plan.get('total_duration', ''),
+            plan.get('daily_schedule', [])
+        )
+
     def update_task(self, user_id: str, date: str, task_id: str, completed: bool) -> bool:
-        """태스크 완료 상태 업데이트"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        """태스크 완료 상태 업데이트 (현재 계획 우선, 없으면 가장 먼저 만든 계획의 일치 태스크 1개)"""
+        return self.update_tasks(user_id, [{'date': date, 'task_id': task_id, 'completed': completed}])[0]['success']
+
+    def update_tasks(self, user_id: str, updates: List[Dict]) -> List[Dict]:
+        """태스크 완료 상태 일괄 업데이트 - 한 트랜잭션에서 적용하고 집계/캐시는 한 번만 갱신
+
+        updates: [{'date', 'task_id', 'completed'}] (같은 태스크가 여러 번 있으면 마지막 값)
+        반환: 항목별 {'date', 'task_id', 'completed', 'success', 'changed'} (입력 순서)
+        """
+        results = []
+        dates = set()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            events = []
+            for item in updates:
+                date, task_id, completed = item['date'], item['task_id'], bool(item['completed'])
+                row = cursor.execute(f'''
+                    SELECT id, completed, duration FROM plan_tasks
+                    WHERE task_id = ? AND user_id = ? AND date = ?
+                    {_ACTIVE_PLAN_FIRST} LIMIT 1
+                ''', (task_id, user_id, date, user_id)).fetchone()
+                changed = bool(row) and bool(row['completed']) != completed
+                if changed:
+                    cursor.execute("UPDATE plan_tasks SET completed = ? WHERE id = ?", (1 if completed else 0, row['id']))
+                    self._log_change(cursor, user_id, 'task', row['id'])
+                    dates.add(date)
+                    events.append((row['id'], task_id, date, completed, row['duration']))
+                results.append({
+                    'date': date, 'task_id': task_id, 'completed': completed,
+                    'success': row is not None, 'changed': changed
+                })
+
+            if not dates:
+                return results
+            changes = self._refresh_daily_progress(cursor, user_id, sorted(dates))
+            self._apply_progress_events(cursor, user_id, changes)
+            # 실제로 완료 상태가 바뀐 태스크만 이벤트 기록
+            for plan_task_id, task_id, date, completed, duration in events:
+                self._record_task_event(cursor, user_id, plan_task_id, task_id, date, completed, duration)
+        self._bump_progress_version(user_id)
+        self._plan_cache.invalidate(user_id)
+        return results
+
+    # ==================== 학습 활동 이벤트 (task_events) ====================
+
+    def _record_task_event(self, cursor, user_id: str, plan_task_id: int, task_id: str, date: str,
+                           completed: bool, duration: Optional[str] = None):
+        """완료/취소 이벤트 추가 + 일/주/월 활동 집계 갱신 (호출자의 트랜잭션 안에서)
+
+        취소는 같은 계획 태스크 행(plan_task_id)의 마지막 완료 이벤트가 집계된 구간에서 차감
+        """
+        now = datetime.now()
+        if completed:
+            minutes = _duration_minutes(duration)
+            counted_at, sign = now, 1
+        else:
+            last = cursor.execute('''
+                SELECT minutes, completed_at FROM task_events
+                WHERE plan_task_id = ? AND completed = 1
+                ORDER BY id DESC LIMIT 1
+            ''', (plan_task_id,)).fetchone()
+            minutes = last['minutes'] if last else 0
+            counted_at, sign = (datetime.fromisoformat(last['completed_at']), -1) if last else (None, 0)
+
+        cursor.execute(
+            "INSERT INTO task_events (user_id, task_id, plan_task_id, date, completed, minutes, completed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (user_id, task_id, plan_task_id, date, 1 if completed else 0, minutes, now.isoformat())
+        )
+        if not sign:
+            # 이벤트 로그 도입 전에 완료된 태스크(또는 계획 태스크 행을 알 수 없는 v8 이전 이벤트)의 취소 - 차감 없음
+            return
 
-        cursor.execute("SELECT id, daily_schedule FROM plans WHERE user_id = ?", (user_id,))
-        rows = cursor.fetchall()
+        for granularity in ACTIVITY_GRANULARITIES:
+            cursor.execute('''
+                INSERT INTO activity_rollups (user_id, granularity, period, completed, minutes)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (user_id, granularity, period) DO UPDATE SET
+                    completed = MAX(0, completed + excluded.completed),
+                    minutes = MAX(0, minutes + excluded.minutes)
+            ''', (user_id, granularity, activity_period(counted_at.date(), granularity),
+                  sign, sign * minutes))
+
+    def get_activity_range(self, user_id: str, granularity: str, start: str, end: str) -> List[Dict]:
+        """기간 내 활동 집계 행 (구간 시작일 기준, 활동 없는 구간은 행 없음)"""
+        with self._connection() as conn:
+            rows = conn.execute('''
+                SELECT period, completed, minutes FROM activity_rollups
+                WHERE user_id = ? AND granularity = ? AND period BETWEEN ? AND ?
+                ORDER BY period
+            ''', (user_id, granularity, start, end)).fetchall()
+        return [dict(row) for row in rows]
 
-        for row in rows:
-            schedule = json.loads(row['daily_schedule']) if row['daily_schedule'] else []
-            modified = False
-
-            for day in schedule:
-                if day.get('date') == date:
-                    for task in day.get('tasks', []):
-                        if task.get('id') == task_id:
-                            task['completed'] = completed
-                            modified = True
-                            break
-                if modified:
-                    break
+    # ==================== 진행률 집계 (daily_progress) ====================
 
-            if modified:
-                cursor.execute(
-                    "UPDATE plans SET daily_schedule = ? WHERE id = ?",
-                    (json.dumps(schedule, ensure_ascii=False), row['id'])
+    def get_daily_progress(self, user_id: str, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        """기간 내 일별 진행률 행 (날짜순, 태스크 없는 날은 행 없음) - start가 없으면 전체 기간"""
+        with self._connection() as conn:
+            if start is None:
+                rows = conn.execute('''
+                    SELECT date, total, completed, minutes_total, minutes_done FROM daily_progress
+                    WHERE user_id = ? ORDER BY date
+                ''', (user_id,)).fetchall()
+            else:
+                rows = conn.execute('''
+                    SELECT date, total, completed, minutes_total, minutes_done FROM daily_progress
+                    WHERE user_id = ? AND date BETWEEN ? AND ?
+                    ORDER BY date
+                ''', (user_id, start, end or start)).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_progress_totals(self, user_id: str) -> Dict:
+        """전체 기간 합계 (태스크 수, 완료 수, 학습일 수, 학습 시간)"""
+        with self._connection() as conn:
+            row = conn.execute('''
+                SELECT COALESCE(SUM(total), 0) AS total, COALESCE(SUM(completed), 0) AS completed,
+                       COUNT(*) AS days, COALESCE(SUM(minutes_total), 0) AS minutes_total,
+                       COALESCE(SUM(minutes_done), 0) AS minutes_done
+                FROM daily_progress WHERE user_id = ?
+            ''', (user_id,)).fetchone()
+        return dict(row)
+
+    def get_plan_task_counts(self, user_id: str) -> List[Dict]:
+        """계획별 태스크/완료 수 (get_plans와 같은 정렬, 일정 역직렬화 없음)"""
+        with self._connection() as conn:
+            plans = conn.execute(
+                "SELECT id, plan_name FROM plans WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,)
+            ).fetchall()
+            counts = {
+                row['plan_id']: (row['total'], row['completed'])
+                for row in conn.execute(
+                    "SELECT plan_id, COUNT(*) AS total, SUM(completed) AS completed FROM plan_tasks WHERE user_id = ? GROUP BY plan_id",
+                    (user_id,)
                 )
-                conn.commit()
-                conn.close()
-                return True
+            }
+        return [
+            {
+                'id': row['id'],
+                'plan_name': row['plan_name'],
+                'total': counts.get(row['id'], (0, 0))[0],
+                'completed': counts.get(row['id'], (0, 0))[1],
+            }
+            for row in plans
+        ]
+
+    # ==================== 게이미피케이션 (연속 학습일 / 업적) ====================
 
-        conn.close()
-        return False
+    _GAMIFICATION_COUNTERS = ('current_streak', 'longest_streak', 'completed_tasks', 'total_tasks', 'plan_count')
+
+    def _load_gamification(self, cursor, user_id: str) -> Dict:
+        row = cursor.execute("SELECT * FROM gamification_state WHERE user_id = ?", (user_id,)).fetchone()
+        if row:
+            return dict(row)
+        state = {key: 0 for key in self._GAMIFICATION_COUNTERS}
+        state.update(user_id=user_id, last_active_date=None)
+        return state
+
+    def _save_gamification(self, cursor, state: Dict):
+        cursor.execute('''
+            INSERT OR REPLACE INTO gamification_state
+                (user_id, current_streak, longest_streak, last_active_date, completed_tasks, total_tasks, plan_count, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            state['user_id'], state['current_streak'], state['longest_streak'], state['last_active_date'],
+            state['completed_tasks'], state['total_tasks'], state['plan_count'], datetime.now().isoformat()
+        ))
+
+    @staticmethod
+    def _parse_date(value: Optional[str]):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+        except ValueError:
+            return None
+
+    def _recompute_streak(self, cursor, state: Dict):
+        """완료 태스크가 있는 가장 늦은 날짜부터 거꾸로 연속 구간 계산 (구간 길이만큼만 읽음)"""
+        state['last_active_date'] = None
+        state['current_streak'] = 0
+        expected = None
+        for row in cursor.execute(
+            "SELECT date FROM daily_progress WHERE user_id = ? AND completed > 0 ORDER BY date DESC",
+            (state['user_id'],)
+        ):
+            day = self._parse_date(row['date'])
+            if day is None:
+                continue
+            if expected is None:
+                state['last_active_date'] = day.isoformat()
+            elif day != expected:
+                break
+            state['current_streak'] += 1
+            expected = day - timedelta(days=1)
+
+    def _run_length(self, cursor, user_id: str, day) -> int:
+        """day를 포함하는 연속 활동 구간 길이 (구간 길이만큼만 읽음)"""
+        length = 1
+        for op, order, step in (('<', 'DESC', -1), ('>', 'ASC', 1)):
+            expected = day + timedelta(days=step)
+            for row in cursor.execute(
+                f"SELECT date FROM daily_progress WHERE user_id = ? AND completed > 0 AND date {op} ? ORDER BY date {order}",
+                (user_id, day.isoformat())
+            ):
+                current = self._parse_date(row['date'])
+                if current is None:
+                    continue
+                if current != expected:
+                    break
+                length += 1
+                expected += timedelta(days=step)
+        return length
+
+    def _longest_streak(self, cursor, user_id: str) -> int:
+        """전체 활동 날짜에서 가장 긴 연속 구간 길이"""
+        longest = run = 0
+        previous = None
+        for row in cursor.execute(
+            "SELECT date FROM daily_progress WHERE user_id = ? AND completed > 0 ORDER BY date", (user_id,)
+        ):
+            day = self._parse_date(row['date'])
+            if day is None:
+                continue
+            run = run + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+            longest = max(longest, run)
+            previous = day
+        return longest
+
+    def _apply_streak_event(self, cursor, state: Dict, date: str, active: bool):
+        """한 날짜의 활동 여부 변경 반영 - 구간 끝에 이어지면 O(1), 구간 안쪽 변경만 재계산
+
+        최장 기록: 활성화는 그 날짜가 속한 구간 길이와 비교, 비활성화는 전체 재계산 (현재 구간이 아닌 기록도 반영)
+        """
+        day = self._parse_date(date)
+        if day is None:
+            return
+        self._apply_current_streak(cursor, state, day, active)
+        if not active:
+            state['longest_streak'] = self._longest_streak(cursor, state['user_id'])
+        elif state['last_active_date'] == day.isoformat():
+            state['longest_streak'] = max(state['longest_streak'], state['current_streak'])
+        else:
+            state['longest_streak'] = max(state['longest_streak'], self._run_length(cursor, state['user_id'], day))
+
+    def _apply_current_streak(self, cursor, state: Dict, day, active: bool):
+        last = self._parse_date(state['last_active_date'])
+        if last is None or state['current_streak'] == 0:
+            if active:
+                self._recompute_streak(cursor, state)
+            return
+
+        run_start = last - timedelta(days=state['current_streak'] - 1)
+        if active and day > last:
+            state['current_streak'] = state['current_streak'] + 1 if day == last + timedelta(days=1) else 1
+            state['last_active_date'] = day.isoformat()
+        elif (active and day == run_start - timedelta(days=1)) or (not active and run_start <= day <= last):
+            # 구간 앞쪽 연장(이전 구간과 합쳐질 수 있음) 또는 구간 안쪽 끊김
+            self._recompute_streak(cursor, state)
+
+    def _unlock_achievements(self, cursor, state: Dict, notify: bool = True):
+        """목표를 달성한 업적 해금 - notify면 같은 트랜잭션에서 알림 추가"""
+        unlocked = {
+            row['achievement_id']
+            for row in cursor.execute("SELECT achievement_id FROM user_achievements WHERE user_id = ?", (state['user_id'],))
+        }
+        counters = {'completed': state['completed_tasks'], 'plans': state['plan_count']}
+        now = datetime.now().isoformat()
+        for achievement_id, title, description, icon, _, _ in newly_unlocked(counters, unlocked):
+            cursor.execute(
+                "INSERT OR IGNORE INTO user_achievements (user_id, achievement_id, unlocked_at) VALUES (?, ?, ?)",
+                (state['user_id'], achievement_id, now)
+            )
+            if notify:
+                cursor.execute(
+                    "INSERT INTO notifications (user_id, message, created_at) VALUES (?, ?, ?)",
+                    (state['user_id'], f"{icon} 업적 달성: {title} - {description}", now)
+                )
+                self._log_change(cursor, state['user_id'], 'notification', cursor.lastrowid)
+
+    def _apply_progress_events(self, cursor, user_id: str, changes: List[tuple], plans_added: int = 0,
+                               notify: bool = True):
+        """daily_progress 변경분으로 카운터/연속 학습일/업적 갱신 (호출자의 트랜잭션 안에서)"""
+        state = self._load_gamification(cursor, user_id)
+        state['plan_count'] += plans_added
+        for date, old_total, old_completed, new_total, new_completed in sorted(changes):
+            state['total_tasks'] += new_total - old_total
+            state['completed_tasks'] += new_completed - old_completed
+            if (old_completed > 0) != (new_completed > 0):
+                self._apply_streak_event(cursor, state, date, new_completed > 0)
+        state['longest_streak'] = max(state['longest_streak'], state['current_streak'])
+        self._save_gamification(cursor, state)
+        self._unlock_achievements(cursor, state, notify=notify)
+
+    def _rebuild_gamification(self, cursor, user_id: Optional[str] = None):
+        """daily_progress / plans 기준으로 상태 재계산 (이미 해금된 업적은 유지, 알림 없음)"""
+        if user_id is None:
+            user_ids = [row['user_id'] for row in cursor.execute("SELECT user_id FROM users").fetchall()]
+        else:
+            user_ids = [user_id]
+
+        for uid in user_ids:
+            state = self._load_gamification(cursor, uid)
+            totals = cursor.execute(
+                "SELECT COALESCE(SUM(total), 0) AS total, COALESCE(SUM(completed), 0) AS completed FROM daily_progress WHERE user_id = ?",
+                (uid,)
+            ).fetchone()
+            state['total_tasks'] = totals['total']
+            state['completed_tasks'] = totals['completed']
+            state['plan_count'] = cursor.execute("SELECT COUNT(*) FROM plans WHERE user_id = ?", (uid,)).fetchone()[0]
+            self._recompute_streak(cursor, state)
+            state['longest_streak'] = self._longest_streak(cursor, uid)
+            self._save_gamification(cursor, state)
+            self._unlock_achievements(cursor, state, notify=False)
+
+    def get_gamification(self, user_id: str) -> Dict:
+        """연속 학습일/카운터 + 해금된 업적 {id: unlocked_at}"""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            state = self._load_gamification(cursor, user_id)
+            state['achievements'] = {
+                row['achievement_id']: row['unlocked_at']
+                for row in cursor.execute(
+                    "SELECT achievement_id, unlocked_at FROM user_achievements WHERE user_id = ?", (user_id,)
+                )
+            }
+        state.pop('updated_at', None)
+        return state
 
     # ==================== 알림 관리 ====================
 
     def get_notifications(self, user_id: str) -> Dict[str, List[str]]:
         """알림 조회 (new/old 분리)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT message, is_read FROM notifications WHERE user_id = ? ORDER BY created_at DESC",
-            (user_id,)
-        )
-        rows = cursor.fetchall()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT message, is_read FROM notifications WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,)
+            )
+            rows = cursor.fetchall()
 
         result = {'new': [], 'old': []}
         for row in rows:
@@ -503,53 +1486,185 @@ class DataStore:
 
     def add_notification(self, user_id: str, message: str):
         """알림 추가"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO notifications (user_id, message, created_at) VALUES (?, ?, ?)",
+                (user_id, message, datetime.now().isoformat())
+            )
+            self._log_change(cursor, user_id, 'notification', cursor.lastrowid)
+
+    def mark_notifications_read(self, user_id: str):
+        """모든 알림 읽음 처리"""
+        with self._connection() as conn:
+            cursor = conn.execute("UPDATE notifications SET is_read = 1 WHERE user_id = ? AND is_read = 0", (user_id,))
+            if cursor.rowcount:
+                self._log_change(cursor, user_id, 'notifications', '*', 'read')
 
+    # ==================== 델타 동기화 (change_log) ====================
+
+    def _log_change(self, cursor, user_id: str, entity: str, entity_id, op: str = 'upsert'):
+        """변경 기록 (호출자의 트랜잭션 안에서 - 데이터 변경과 함께 커밋)"""
         cursor.execute(
-            "INSERT INTO notifications (user_id, message, created_at) VALUES (?, ?, ?)",
-            (user_id, message, datetime.now().isoformat())
+            "INSERT INTO change_log (user_id, entity, entity_id, op, changed_at) VALUES (?, ?, ?, ?, ?)",
+            (user_id, entity, str(entity_id), op, datetime.now().isoformat())
         )
 
-        conn.commit()
-        conn.close()
+    def _purge_change_log(self):
+        """보관 기간이 지난 변경 로그 정리 (커서 기준점 유지를 위해 마지막 항목은 남김)"""
+        now = time.monotonic()
+        if now - self._change_log_purged_at < CHANGE_LOG_PURGE_INTERVAL:
+            return
+        self._change_log_purged_at = now
+        cutoff = (datetime.now() - timedelta(days=CHANGE_LOG_RETENTION_DAYS)).isoformat()
+        with self._connection() as conn:
+            conn.execute(
+                "DELETE FROM change_log WHERE changed_at < ? AND seq < (SELECT MAX(seq) FROM change_log)",
+                (cutoff,)
+            )
 
-    def mark_notifications_read(self, user_id: str):
-        """모든 알림 읽음 처리"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    @staticmethod
+    def _chunks(values: List, size: int = _IN_CHUNK):
+        for i in range(0, len(values), size):
+            yield values[i:i + size]
+
+    def get_changes(self, user_id: str, since: Optional[int] = None) -> Dict:
+        """since 커서 이후 변경분 (since가 없거나 정리된 구간이면 전체 스냅샷)
+
+        커서는 데이터를 읽기 전에 정하므로 읽는 도중의 변경은 다음 동기화에 다시 포함될 수 있음 (upsert라 중복 무해)
+        """
+        self._purge_change_log()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            # MIN/MAX를 한 SELECT에 함께 쓰면 전체 스캔이 되므로 각각 조회 (rowid 양 끝)
+            bounds = cursor.execute(
+                "SELECT (SELECT MIN(seq) FROM change_log) AS first, (SELECT MAX(seq) FROM change_log) AS last"
+            ).fetchone()
+            latest = bounds['last'] or 0
+            floor = (bounds['first'] - 1) if bounds['first'] else 0
+            active = self._active_plan_row(cursor, user_id)
+            result = {
+                'cursor': latest,
+                'full': since is None or since <= 0 or since < floor,
+                'active_plan_id': active['id'] if active else None,
+                'plans': [],
+                'tasks': [],
+                'notifications': [],
+                'notifications_read': False,
+                'friends': [],
+                'removed_friends': [],
+            }
+
+            if result['full']:
+                friend_ids = [
+                    row['friend_id'] for row in
+                    cursor.execute("SELECT friend_id FROM friendships WHERE user_id = ?", (user_id,))
+                ]
+                notification_rows = cursor.execute(
+                    "SELECT id, message, is_read, created_at FROM notifications WHERE user_id = ? ORDER BY created_at DESC",
+                    (user_id,)
+                ).fetchall()
+                plan_ids = None
+            else:
+                rows = cursor.execute('''
+                    SELECT entity, entity_id, op, MAX(seq) AS seq FROM change_log
+                    WHERE user_id = ? AND seq > ?
+                    GROUP BY entity, entity_id
+                ''', (user_id, since)).fetchall()
+                latest_ops: Dict[str, Dict[str, str]] = {}
+                for row in rows:
+                    latest_ops.setdefault(row['entity'], {})[row['entity_id']] = row['op']
+
+                plan_ids = [int(i) for i in latest_ops.get('plan', {})]
+                task_ids = [int(i) for i in latest_ops.get('task', {})]
+                friend_ids = [i for i, op in latest_ops.get('friend', {}).items() if op != 'delete']
+                result['removed_friends'] = [i for i, op in latest_ops.get('friend', {}).items() if op == 'delete']
+                result['notifications_read'] = 'notifications' in latest_ops
+
+                notification_rows = []
+                for chunk in self._chunks([int(i) for i in latest_ops.get('notification', {})]):
+                    notification_rows += cursor.execute(
+                        f"SELECT id, message, is_read, created_at FROM notifications "
+                        f"WHERE id IN ({', '.join('?' * len(chunk))}) AND user_id = ?",
+                        (*chunk, user_id)
+                    ).fetchall()
+                notification_rows.sort(key=lambda row: row['created_at'], reverse=True)
+
+                # 새 계획에 포함된 태스크는 계획과 함께 전달되므로 제외
+                new_plans = set(plan_ids)
+                for chunk in self._chunks(task_ids):
+                    result['tasks'] += [
+                        {'plan_id': row['plan_id'], 'date': row['date'], 'task_id': row['task_id'],
+                         'completed': bool(row['completed'])}
+                        for row in cursor.execute(
+                            f"SELECT plan_id, date, task_id, completed FROM plan_tasks "
+                            f"WHERE id IN ({', '.join('?' * len(chunk))}) AND user_id = ?",
+                            (*chunk, user_id)
+                        )
+                        if row['plan_id'] not in new_plans
+                    ]
+
+            result['notifications'] = [
+                {'id': row['id'], 'message': row['message'], 'is_read': bool(row['is_read']),
+                 'created_at': row['created_at']}
+                for row in notification_rows
+            ]
+            for chunk in self._chunks(friend_ids):
+                result['friends'] += [
+                    {'id': row['user_id'], 'name': row['name'], 'avatarUrl': row['photo_url']}
+                    for row in cursor.execute(
+                        f"SELECT user_id, name, photo_url FROM users WHERE user_id IN ({', '.join('?' * len(chunk))})",
+                        tuple(chunk)
+                    )
+                ]
 
-        cursor.execute("UPDATE notifications SET is_read = 1 WHERE user_id = ?", (user_id,))
+            if plan_ids:
+                result['plans'] = self._load_plans_by_id(cursor, user_id, plan_ids)
 
-        conn.commit()
-        conn.close()
+        if plan_ids is None:
+            result['plans'] = self.get_plans(user_id)
+        return result
+
+    def _load_plans_by_id(self, cursor, user_id: str, plan_ids: List[int]) -> List[Dict]:
+        """지정한 계획들만 일정 포함 조회 (최신순)"""
+        plan_rows, day_rows, task_rows = [], [], []
+        for chunk in self._chunks(plan_ids):
+            marks = ', '.join('?' * len(chunk))
+            plan_rows += cursor.execute(
+                f"SELECT id, user_id, plan_name, total_duration, created_at FROM plans WHERE id IN ({marks}) AND user_id = ?",
+                (*chunk, user_id)
+            ).fetchall()
+            day_rows += cursor.execute(
+                f"SELECT id, plan_id, date, extra FROM plan_days WHERE plan_id IN ({marks}) ORDER BY plan_id, position",
+                tuple(chunk)
+            ).fetchall()
+            task_rows += cursor.execute(f'''
+                SELECT t.day_id, t.completed, t.data FROM plan_days d
+                JOIN plan_tasks t ON t.day_id = d.id
+                WHERE d.plan_id IN ({marks})
+                ORDER BY t.day_id, t.position
+            ''', tuple(chunk)).fetchall()
+        plan_rows.sort(key=lambda row: (row['created_at'], row['id']), reverse=True)
+        return self._assemble_plans(plan_rows, day_rows, task_rows)
 
     # ==================== 퀴즈 관리 ====================
 
     def save_quiz_answers(self, user_id: str, quiz_data: List[Dict]):
         """퀴즈 답안 저장"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "INSERT INTO quiz_answers (user_id, quiz_data, created_at) VALUES (?, ?, ?)",
-            (user_id, json.dumps(quiz_data, ensure_ascii=False), datetime.now().isoformat())
-        )
-
-        conn.commit()
-        conn.close()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO quiz_answers (user_id, quiz_data, created_at) VALUES (?, ?, ?)",
+                (user_id, json.dumps(quiz_data, ensure_ascii=False), datetime.now().isoformat())
+            )
 
     def get_quiz_answers(self, user_id: str) -> List[Dict]:
         """최근 퀴즈 답안 조회"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT quiz_data FROM quiz_answers WHERE user_id = ? ORDER BY created_at DESC LIMIT 1",
-            (user_id,)
-        )
-        row = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT quiz_data FROM quiz_answers WHERE user_id = ? ORDER BY created_at DESC LIMIT 1",
+                (user_id,)
+            )
+            row = cursor.fetchone()
 
         if row and row['quiz_data']:
             return json.loads(row['quiz_data'])
@@ -559,14 +1674,12 @@ class DataStore:
 
     def init_sample_data(self):
         """샘플 친구 및 학습 계획 데이터 초기화"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
         # 샘플 친구가 이미 있는지 확인
-        cursor.execute("SELECT user_id FROM users WHERE email = ?", ("sample@palearn.com",))
-        if cursor.fetchone():
-            conn.close()
-            return  # 이미 존재하면 스킵
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT user_id FROM users WHERE email = ?", ("sample@palearn.com",))
+            if cursor.fetchone():
+                return  # 이미 존재하면 스킵
 
         # 샘플 친구 생성
         sample_users = [
@@ -574,7 +1687,7 @@ class DataStore:
                 'user_id': 'sample-friend-001',
                 'username': 'kimcoding',
                 'email': 'sample@palearn.com',
-                'password': self._hash_password('Sample123!'),
+                'password': SAMPLE_PASSWORD_HASH,
                 'name': '김코딩',
                 'birth': '1998-03-15',
                 'photo_url': 'https://i.pravatar.cc/150?img=1',
@@ -584,7 +1697,7 @@ class DataStore:
                 'user_id': 'sample-friend-002',
                 'username': 'leepython',
                 'email': 'sample2@palearn.com',
-                'password': self._hash_password('Sample123!'),
+                'password': SAMPLE_PASSWORD_HASH,
                 'name': '이파이썬',
                 'birth': '1999-07-22',
                 'photo_url': 'https://i.pravatar.cc/150?img=2',
@@ -594,7 +1707,7 @@ class DataStore:
                 'user_id': 'sample-friend-003',
                 'username': 'parkflutter',
                 'email': 'sample3@palearn.com',
-                'password': self._hash_password('Sample123!'),
+                'password': SAMPLE_PASSWORD_HASH,
                 'name': '박플러터',
                 'birth': '2000-11-08',
                 'photo_url': 'https://i.pravatar.cc/150?img=3',
@@ -602,16 +1715,6 @@ class DataStore:
             },
         ]
 
-        for user in sample_users:
-            cursor.execute('''
-                INSERT OR IGNORE INTO users (user_id, username, email, password, name, birth, photo_url, friend_code, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                user['user_id'], user['username'], user['email'], user['password'],
-                user['name'], user['birth'], user['photo_url'], user['friend_code'],
-                datetime.now().isoformat()
-            ))
-
         # 샘플 학습 계획 생성
         from datetime import timedelta
         today = datetime.now().date()
@@ -703,79 +1806,168 @@ class DataStore:
             },
         ]
 
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            for user in sample_users:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO users (user_id, username, email, password, name, birth, photo_url, friend_code, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    user['user_id'], user['username'], user['email'], user['password'],
+                    user['name'], user['birth'], user['photo_url'], user['friend_code'],
+                    datetime.now().isoformat()
+                ))
+
+            for plan in sample_plans:
+                self._insert_plan(
+                    cursor, plan['user_id'], plan['plan_name'], plan['total_duration'], plan['daily_schedule'],
+                    notify=False
+                )
+
         for plan in sample_plans:
-            cursor.execute('''
-                INSERT INTO plans (user_id, plan_name, total_duration, daily_schedule, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                plan['user_id'], plan['plan_name'], plan['total_duration'],
-                json.dumps(plan['daily_schedule'], ensure_ascii=False),
-                datetime.now().isoformat()
-            ))
+            self._plan_cache.invalidate(plan['user_id'])
 
-        conn.commit()
-        conn.close()
         print("📚 샘플 친구 데이터 초기화 완료!")
 
     def get_sample_friends(self) -> List[Dict]:
         """샘플 친구 목록 반환"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT user_id, name, photo_url, friend_code FROM users
-            WHERE user_id LIKE 'sample-friend-%'
-        """)
-        rows = cursor.fetchall()
-        conn.close()
-
-        result = []
-        for row in rows:
-            # 오늘의 진행률 계산
-            plans = self.get_plans(row['user_id'])
-            today_rate = 0
-            if plans:
-                today_str = datetime.now().date().isoformat()
-                for plan in plans:
-                    for day in plan.get('daily_schedule', []):
-                        if day['date'] == today_str:
-                            tasks = day['tasks']
-                            if tasks:
-                                completed = sum(1 for t in tasks if t.get('completed', False))
-                                today_rate = int(completed / len(tasks) * 100)
-                            break
-
-            result.append({
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            # LIKE는 대소문자 무시 비교라 PK 인덱스를 못 타므로 범위 조건으로 조회
+            cursor.execute("""
+                SELECT user_id, name, photo_url, friend_code FROM users
+                WHERE user_id >= 'sample-friend-' AND user_id < 'sample-friend.'
+            """)
+            rows = cursor.fetchall()
+
+        rates = self.get_today_rates([row['user_id'] for row in rows])
+        return [
+            {
                 'id': row['user_id'],
                 'name': row['name'],
                 'avatarUrl': row['photo_url'],
-                'todayRate': today_rate,
+                'todayRate': rates.get(row['user_id'], 0),
                 'friendCode': row['friend_code'],
-            })
+            }
+            for row in rows
+        ]
 
-        return result
+    def get_today_rates(self, user_ids: List[str], date_str: Optional[str] = None) -> Dict[str, int]:
+        """여러 사용자의 해당 날짜(기본 오늘) 완료율(%)을 daily_progress 조회로 계산 (SQLite 변수 제한 때문에 묶음 단위)"""
+        if not user_ids:
+            return {}
+        date_str = date_str or datetime.now().date().isoformat()
+
+        rows = []
+        with self._connection() as conn:
+            for chunk in self._chunks(list(user_ids)):
+                rows += conn.execute(
+                    f"SELECT user_id, total, completed FROM daily_progress "
+                    f"WHERE date = ? AND user_id IN ({', '.join('?' * len(chunk))})",
+                    (date_str, *chunk)
+                ).fetchall()
+
+        return {
+            row['user_id']: int(row['completed'] / row['total'] * 100) if row['total'] else 0
+            for row in rows
+        }
 
     def get_friend_plans_by_date(self, friend_id: str, date_str: str) -> List[Dict]:
-        """친구의 특정 날짜 계획 반환"""
-        plans = self.get_plans(friend_id)
-
-        for plan in plans:
-            for day in plan.get('daily_schedule', []):
-                if day['date'] == date_str:
-                    return [
-                        {
-                            'id': task['id'],
-                            'title': task['title'],
-                            'duration': task.get('duration', ''),
-                            'done': task.get('completed', False)
-                        }
-                        for task in day['tasks']
-                    ]
+        """친구의 특정 날짜 계획 반환 (해당 날짜가 있는 가장 최근 계획)"""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id FROM plan_days WHERE user_id = ? AND date = ? ORDER BY plan_id DESC, position LIMIT 1",
+                (friend_id, date_str)
+            )
+            day = cursor.fetchone()
+            if not day:
+                return []
 
-        return []
+            cursor.execute(
+                "SELECT task_id, title, duration, completed FROM plan_tasks WHERE day_id = ? ORDER BY position",
+                (day['id'],)
+            )
+            rows = cursor.fetchall()
+
+        return [
+            {
+                'id': row['task_id'],
+                'title': row['title'],
+                'duration': row['duration'] or '',
+                'done': bool(row['completed'])
+            }
+            for row in rows
+        ]
+
+
+class AsyncDataStore:
+    """DataStore의 비동기 버전 - 같은 메서드를 await 가능하게 제공
+
+    SQLite 호출은 전용 DB 스레드 풀에서 실행되어 이벤트 루프를 막지 않습니다.
+    스레드 수는 커넥션 풀 크기와 같아 스레드가 커넥션을 기다리지 않습니다.
+    """
+
+    def __init__(self, store: DataStore, max_workers: int = DB_POOL_SIZE):
+        self._store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="palearn-db")
+
+    async def run(self, func, *args, **kwargs):
+        """임의의 동기 함수를 DB 스레드 풀에서 실행"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str):
+        """store.method(...) → await async_store.method(...)"""
+        attr = getattr(self._store, name)
+        if name.startswith('_') or not callable(attr):
+            raise AttributeError(f"AsyncDataStore는 공개 메서드만 제공합니다: {name}")
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        # 다음 조회부터는 __getattr__을 거치지 않도록 캐시
+        self.__dict__[name] = method
+        return method
+
+    # bcrypt가 필요한 메서드는 DB 작업과 해싱을 나눠 해싱은 전용 워커 풀에서 실행
+    # (DB 스레드가 bcrypt 때문에 수백 ms씩 묶이지 않도록)
+
+    async def login(self, email: str, password: str) -> Optional[Dict]:
+        row = await self.run(self._store.get_credentials, email)
+        if not row:
+            return None
+
+        if not await password_hasher.verify(password, row['password']):
+            return None
+
+        if password_hasher.needs_rehash(row['password']):
+            new_hash = await password_hasher.hash(password)
+            await self.run(self._store.replace_password_hash, row['user_id'], row['password'], new_hash)
+
+        return self._store._login_result(row)
+
+    async def create_user(self, username: str, email: str, password: str, name: str, birth: str,
+                          photo_url: str = None) -> Optional[Dict]:
+        if await self.run(self._store.email_registered, email):
+            return None
+        password_hash = await password_hasher.hash(password)
+        return await self.run(
+            self._store.create_user, username, email, password, name, birth, photo_url, password_hash=password_hash
+        )
+
+    async def update_user(self, user_id: str, **kwargs) -> bool:
+        if kwargs.get('password'):
+            kwargs['password_hash'] = await password_hasher.hash(kwargs.pop('password'))
+        return await self.run(self._store.update_user, user_id, **kwargs)
+
+    def shutdown(self):
+        """DB 스레드 풀 종료"""
+        self._executor.shutdown(wait=True)
 
 
-# 싱글톤 인스턴스
+# 싱글톤 인스턴스 (DB 초기화는 open() 또는 첫 쿼리 시점)
 store = DataStore()
-# 샘플 데이터 초기화
-store.init_sample_data()
+# 라우터(async def)에서 사용하는 비동기 인터페이스
+async_store = AsyncDataStore(store)
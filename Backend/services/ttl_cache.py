@@ -0,0 +1,86 @@
+# Backend/services/ttl_cache.py
+"""크기 제한 + TTL 메모리 캐시 (LRU 제거, 스레드 안전)"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import threading
+import time
+
+
+class TTLCache:
+    """항목 수 상한(또는 max_bytes 지정 시 총 크기 상한)을 넘으면 가장 오래 안 쓰인 항목부터 제거"""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 30, max_bytes: Optional[int] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key → (만료 시각, 값, 크기)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """만료되지 않은 값 반환 (없으면 None)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                    self._bytes -= entry[2]
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: int = 0):
+        """값 저장 (상한 초과 시 LRU 제거) - size는 max_bytes 계산용 대략적인 크기"""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._data[key] = (expires, value, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes and len(self._data) > 1
+            ):
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= evicted[2]
+                self._evictions += 1
+
+    def pop(self, key: Hashable):
+        """항목 무효화"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+                self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """적중률 메트릭"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            stats = {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+            if self.max_bytes is not None:
+                stats["bytes"] = self._bytes
+                stats["max_bytes"] = self.max_bytes
+            return stats
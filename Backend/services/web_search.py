@@ -1,12 +1,19 @@
 # Backend/services/web_search.py
 """웹 검색 서비스 - 유튜브/블로그 링크 검색"""
 
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, List, Dict, Optional, Tuple
+from urllib.parse import quote_plus
 import os
+import threading
+import time
 import requests
-from typing import List, Dict
-from urllib.parse import quote_plus
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from services.db_pool import ConnectionPool
+from services.result_cache import ResultCache
+from services.store import DB_PATH
 from utils.logger import log_info, log_error, log_success
 
 load_dotenv()
@@ -16,6 +23,111 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
+# 일괄 검색 설정 - 동시 검색 수 / 전체 마감 시간(초)
+WEB_SEARCH_WORKERS = int(os.getenv("WEB_SEARCH_WORKERS", "8"))
+WEB_SEARCH_DEADLINE = float(os.getenv("WEB_SEARCH_DEADLINE", "30"))
+
+# 검색 전용 스레드 풀 (여러 계획 생성 작업이 공유 - 외부 API 동시 호출 수 상한)
+_search_executor = ThreadPoolExecutor(max_workers=WEB_SEARCH_WORKERS, thread_name_prefix="palearn-search")
+
+# 검색 결과 캐시 - 같은 태스크 제목이 여러 사용자의 계획에서 반복되므로 API 호출 대신 재사용
+WEB_SEARCH_CACHE_ENABLED = os.getenv("WEB_SEARCH_CACHE_ENABLED", "1") != "0"
+WEB_SEARCH_CACHE_TTL = float(os.getenv("WEB_SEARCH_CACHE_TTL", str(7 * 86400)))
+WEB_SEARCH_NEGATIVE_TTL = float(os.getenv("WEB_SEARCH_NEGATIVE_TTL", "3600"))  # 실패/결과 없음
+WEB_SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("WEB_SEARCH_CACHE_MAX_ENTRIES", "20000"))
+
+search_cache = ResultCache(
+    ConnectionPool(DB_PATH, size=WEB_SEARCH_WORKERS),
+    table="web_search_cache",
+    max_entries=WEB_SEARCH_CACHE_MAX_ENTRIES,
+    default_ttl=WEB_SEARCH_CACHE_TTL,
+    enabled=WEB_SEARCH_CACHE_ENABLED,
+)
+
+# 스레드별 HTTP 세션 - keep-alive 커넥션 재사용 (TLS 핸드셰이크 생략)
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=2))
+        _local.session = session
+    return session
+
+
+def _cached_search(source: str, query: str, max_results: int, fetch: Callable[[str, int], List[Dict]]) -> List[Dict]:
+    """정규화된 검색어 기준 캐시 조회 → 없으면 API 호출 후 저장
+
+    API 오류나 빈 결과도 빈 목록으로 짧게(WEB_SEARCH_NEGATIVE_TTL) 캐시해 재시도를 억제
+    """
+    key = search_cache.make_key(source, max_results, query.lower())
+    cached = search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        results = fetch(query, max_results)
+    except Exception as e:
+        log_error(f"{source} API 오류: {e}")
+        results = []
+
+    search_cache.set(key, results, kind=source, ttl=WEB_SEARCH_CACHE_TTL if results else WEB_SEARCH_NEGATIVE_TTL)
+    return results
+
+
+def _fetch_youtube(query: str, max_results: int) -> List[Dict]:
+    """YouTube Data API 호출 (오류 시 예외, 결과 없으면 빈 목록)"""
+    url = "https://www.googleapis.com/youtube/v3/search"
+    params = {
+        "part": "snippet",
+        "q": f"{query} 강의 튜토리얼",
+        "type": "video",
+        "maxResults": max_results,
+        "key": YOUTUBE_API_KEY,
+        "relevanceLanguage": "ko",
+        "videoDuration": "medium"  # 4-20분 영상
+    }
+    response = _session().get(url, params=params, timeout=10)
+    response.raise_for_status()
+
+    results = []
+    for item in response.json().get("items", []):
+        video_id = item["id"]["videoId"]
+        title = item["snippet"]["title"]
+        results.append({
+            "title": title,
+            "type": "유튜브",
+            "url": f"https://www.youtube.com/watch?v={video_id}",
+            "description": f"'{query}' 관련 유튜브 강의"
+        })
+    return results
+
+
+def _fetch_blog(query: str, max_results: int) -> List[Dict]:
+    """Google Custom Search API 호출 (오류 시 예외, 결과 없으면 빈 목록)"""
+    url = "https://www.googleapis.com/customsearch/v1"
+    params = {
+        "key": GOOGLE_API_KEY,
+        "cx": GOOGLE_CSE_ID,
+        "q": f"{query} 블로그 튜토리얼",
+        "num": max_results,
+        "lr": "lang_ko"
+    }
+    response = _session().get(url, params=params, timeout=10)
+    response.raise_for_status()
+
+    results = []
+    for item in response.json().get("items", []):
+        results.append({
+            "title": item.get("title", ""),
+            "type": "블로그",
+            "url": item.get("link", ""),
+            "description": item.get("snippet", "")[:100]
+        })
+    return results
+
 
 def search_youtube(query: str, max_results: int = 1) -> List[Dict]:
     """유튜브에서 강의 영상 검색"""
@@ -23,36 +135,10 @@ def search_youtube(query: str, max_results: int = 1) -> List[Dict]:
 
     # YouTube Data API 사용 (API 키가 있는 경우)
     if YOUTUBE_API_KEY:
-        try:
-            url = "https://www.googleapis.com/youtube/v3/search"
-            params = {
-                "part": "snippet",
-                "q": f"{query} 강의 튜토리얼",
-                "type": "video",
-                "maxResults": max_results,
-                "key": YOUTUBE_API_KEY,
-                "relevanceLanguage": "ko",
-                "videoDuration": "medium"  # 4-20분 영상
-            }
-            response = requests.get(url, params=params, timeout=10)
-
-            if response.status_code == 200:
-                data = response.json()
-                results = []
-                for item in data.get("items", []):
-                    video_id = item["id"]["videoId"]
-                    title = item["snippet"]["title"]
-                    results.append({
-                        "title": title,
-                        "type": "유튜브",
-                        "url": f"https://www.youtube.com/watch?v={video_id}",
-                        "description": f"'{query}' 관련 유튜브 강의"
-                    })
-                if results:
-                    log_success(f"유튜브 검색 성공: {len(results)}개")
-                    return results
-        except Exception as e:
-            log_error(f"YouTube API 오류: {e}")
+        results = _cached_search("youtube", query, max_results, _fetch_youtube)
+        if results:
+            log_success(f"유튜브 검색 성공: {len(results)}개")
+            return results
 
     # API 없으면 검색 URL 반환
     search_query = quote_plus(f"{query} 강의")
@@ -70,32 +156,10 @@ def search_blog(query: str, max_results: int = 1) -> List[Dict]:
 
     # Google Custom Search API 사용 (API 키가 있는 경우)
     if GOOGLE_API_KEY and GOOGLE_CSE_ID:
-        try:
-            url = "https://www.googleapis.com/customsearch/v1"
-            params = {
-                "key": GOOGLE_API_KEY,
-                "cx": GOOGLE_CSE_ID,
-                "q": f"{query} 블로그 튜토리얼",
-                "num": max_results,
-                "lr": "lang_ko"
-            }
-            response = requests.get(url, params=params, timeout=10)
-
-            if response.status_code == 200:
-                data = response.json()
-                results = []
-                for item in data.get("items", []):
-                    results.append({
-                        "title": item.get("title", ""),
-                        "type": "블로그",
-                        "url": item.get("link", ""),
-                        "description": item.get("snippet", "")[:100]
-                    })
-                if results:
-                    log_success(f"블로그 검색 성공: {len(results)}개")
-                    return results
-        except Exception as e:
-            log_error(f"Google Search API 오류: {e}")
+        results = _cached_search("blog", query, max_results, _fetch_blog)
+        if results:
+            log_success(f"블로그 검색 성공: {len(results)}개")
+            return results
 
     # API 없으면 검색 URL 반환
     search_query = quote_plus(f"{query} 블로그 강의")
@@ -120,28 +184,117 @@ def search_materials_for_topic(topic: str) -> Dict[str, List[Dict]]:
     }
 
 
-def batch_search_materials(topics: List[str]) -> Dict[str, Dict[str, List[Dict]]]:
-    """여러 주제에 대한 학습 자료 일괄 검색"""
-    log_info(f"일괄 검색 시작: {len(topics)}개 주제")
-
-    results = {}
-    for topic in topics:
-        try:
-            results[topic] = search_materials_for_topic(topic)
-        except Exception as e:
-            log_error(f"검색 실패 ({topic}): {e}")
-            # 실패 시 기본 검색 URL
-            search_query = quote_plus(topic)
-            results[topic] = {
-                "related_materials": [
-                    {"title": f"{topic} 강의", "type": "유튜브", "url": f"https://www.youtube.com/results?search_query={search_query}+강의", "description": "유튜브 검색"},
-                    {"title": f"{topic} 블로그", "type": "블로그", "url": f"https://www.google.com/search?q={search_query}+블로그", "description": "구글 검색"}
-                ],
-                "review_materials": [
-                    {"title": f"{topic} 복습", "type": "유튜브", "url": f"https://www.youtube.com/results?search_query={search_query}+강의", "description": "유튜브 검색"},
-                    {"title": f"{topic} 정리", "type": "블로그", "url": f"https://www.google.com/search?q={search_query}+정리", "description": "구글 검색"}
-                ]
-            }
-
-    log_success(f"일괄 검색 완료: {len(results)}개")
+def default_materials(topic: str) -> Dict[str, List[Dict]]:
+    """검색 실패/시간 초과 시 사용할 기본 검색 URL"""
+    search_query = quote_plus(topic)
+    return {
+        "related_materials": [
+            {"title": f"{topic} 강의 영상", "type": "유튜브", "url": f"https://www.youtube.com/results?search_query={search_query}+강의", "description": "유튜브에서 검색"},
+            {"title": f"{topic} 블로그 글", "type": "블로그", "url": f"https://www.google.com/search?q={search_query}+블로그", "description": "구글에서 검색"}
+        ],
+        "review_materials": [
+            {"title": f"{topic} 복습", "type": "유튜브", "url": f"https://www.youtube.com/results?search_query={search_query}+강의", "description": "유튜브 검색"},
+            {"title": f"{topic} 정리", "type": "블로그", "url": f"https://www.google.com/search?q={search_query}+정리", "description": "구글 검색"}
+        ]
+    }
+
+
+def batch_search_materials(
+    topics: List[str],
+    deadline: float = WEB_SEARCH_DEADLINE,
+    on_topic_done: Optional[Callable[[str], None]] = None
+) -> Dict[str, Dict[str, List[Dict]]]:
+    """여러 주제에 대한 학습 자료 일괄 검색
+
+    - 중복 주제는 한 번만 검색
+    - 유튜브/블로그 검색을 공유 스레드 풀에서 병렬 실행
+    - deadline(초) 안에 끝나지 않은 주제는 기본 검색 URL로 대체
+    """
+    unique = list(dict.fromkeys(topics))
+    log_info(f"일괄 검색 시작: {len(unique)}개 주제 (요청 {len(topics)}개)")
+    started = time.perf_counter()
+
+    futures = {}
+    for topic in unique:
+        futures[_search_executor.submit(search_youtube, topic, 1)] = (topic, "youtube")
+        futures[_search_executor.submit(search_blog, topic, 1)] = (topic, "blog")
+
+    found: Dict[str, Dict[str, Optional[List[Dict]]]] = {topic: {} for topic in unique}
+    results: Dict[str, Dict[str, List[Dict]]] = {}
+    pending = set(futures)
+    end = started + deadline
+
+    while pending:
+        remaining = end - time.perf_counter()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            topic, source = futures[future]
+            try:
+                found[topic][source] = future.result()
+            except Exception as e:
+                log_error(f"검색 실패 ({topic}): {e}")
+                found[topic][source] = None
+            if len(found[topic]) < 2:
+                continue
+            # 유튜브/블로그 모두 끝난 주제 확정
+            if None in found[topic].values():
+                results[topic] = default_materials(topic)
+            else:
+                items = found[topic]["youtube"] + found[topic]["blog"]
+                results[topic] = {"related_materials": items, "review_materials": items}
+            if on_topic_done:
+                on_topic_done(topic)
+
+    if pending:
+        for future in pending:
+            future.cancel()
+        log_error(f"일괄 검색 마감 시간 초과 ({deadline}s) - 미완료 {len(pending)}건 기본 링크 사용")
+
+    for topic in unique:
+        if topic not in results:
+            results[topic] = default_materials(topic)
+            if on_topic_done:
+                on_topic_done(topic)
+
+    log_success(f"일괄 검색 완료: {len(results)}개 ({time.perf_counter() - started:.1f}s)")
     return results
+
+
+def attach_materials(items: List[Tuple[int, Dict, str]], progress=None):
+    """태스크에 related_materials / review_materials 추가 (블로킹 - 스레드에서 호출)
+
+    items: (day_index, task, search_topic) 목록
+    progress: advance(tasks=, days=)를 가진 객체 (계획 생성 작업 진행률)
+    """
+    if not items:
+        return
+
+    tasks_by_topic: Dict[str, List[Tuple[int, Dict]]] = {}
+    remaining_by_day: Dict[int, int] = {}
+    for day_index, task, topic in items:
+        tasks_by_topic.setdefault(topic, []).append((day_index, task))
+        remaining_by_day[day_index] = remaining_by_day.get(day_index, 0) + 1
+
+    lock = threading.Lock()
+
+    def on_topic_done(topic: str):
+        if progress is None:
+            return
+        with lock:
+            entries = tasks_by_topic.get(topic, [])
+            days_done = 0
+            for day_index, _ in entries:
+                remaining_by_day[day_index] -= 1
+                if remaining_by_day[day_index] == 0:
+                    days_done += 1
+        progress.advance(tasks=len(entries), days=days_done)
+
+    results = batch_search_materials(list(tasks_by_topic), on_topic_done=on_topic_done)
+
+    for topic, entries in tasks_by_topic.items():
+        materials = results[topic]
+        for _, task in entries:
+            task['related_materials'] = list(materials.get('related_materials', []))
+            task['review_materials'] = list(materials.get('review_materials', []))
@@ -0,0 +1,53 @@
+# Backend/tests/test_password_hasher.py
+"""PasswordHasher 대기열 회귀 테스트
+
+사용법:
+    cd Backend
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.password_hasher import PasswordHasher  # noqa: E402
+
+
+class PendingTest(unittest.TestCase):
+    def test_cancelled_queued_jobs_release_pending(self):
+        hasher = PasswordHasher(workers=1, max_pending=4, rounds=4)
+        gate = threading.Event()
+
+        async def scenario():
+            # 워커 하나를 막아 두고 나머지를 대기열에 쌓음
+            blocker = asyncio.ensure_future(hasher._submit(gate.wait))
+            queued = [asyncio.ensure_future(hasher.hash("Password1")) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            self.assertEqual(hasher.stats()['pending'], 4)
+
+            for task in queued:
+                task.cancel()
+            await asyncio.gather(*queued, return_exceptions=True)
+            self.assertEqual(hasher.stats()['pending'], 1)
+
+            gate.set()
+            await blocker
+
+        try:
+            asyncio.run(scenario())
+            stats = hasher.stats()
+            self.assertEqual(stats['pending'], 0)
+            self.assertEqual(stats['running'], 0)
+            self.assertEqual(stats['completed'], 1)
+        finally:
+            gate.set()
+            hasher.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+# Backend/tests/test_store.py
+"""DataStore 회귀 테스트 - 임시 DB 사용 (실제 DB를 건드리지 않음)
+
+사용법:
+    cd Backend
+    python -m unittest discover tests
+"""
+
+from datetime import date, timedelta
+import itertools
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# store 모듈 import 전에 임시 DB / 공유 상태로 전환, bcrypt는 최소 cost
+_tmp_dir = tempfile.mkdtemp(prefix="palearn-test-")
+os.environ["PALEARN_DB_PATH"] = os.path.join(_tmp_dir, "palearn.db")
+os.environ["SHARED_STATE_URL"] = "memory://"
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+from services.db_pool import ConnectionPool  # noqa: E402
+from services.result_cache import ResultCache  # noqa: E402
+from services.store import store  # noqa: E402
+
+_user_seq = itertools.count(1)
+BASE_DATE = date(2030, 1, 1)
+
+
+def day(offset: int) -> str:
+    return (BASE_DATE + timedelta(days=offset)).isoformat()
+
+
+def new_user() -> str:
+    n = next(_user_seq)
+    return store.create_user(f"test{n}", f"test{n}@palearn.com", "Password1", "테스트", "2000-01-01")['user_id']
+
+
+def schedule(days, task_id: str = "task-1", duration: str = "30분"):
+    return [
+        {'date': day(d), 'tasks': [{'id': task_id, 'title': '테스트', 'duration': duration, 'completed': False}]}
+        for d in days
+    ]
+
+
+class LongestStreakTest(unittest.TestCase):
+    def test_out_of_order_days_count_towards_longest(self):
+        user_id = new_user()
+        store.save_plan(user_id, "계획", "30일", schedule(range(30)))
+        store.update_task(user_id, day(29), "task-1", True)
+        for d in range(10):
+            store.update_task(user_id, day(d), "task-1", True)
+
+        game = store.get_gamification(user_id)
+        self.assertEqual(game['current_streak'], 1)
+        self.assertEqual(game['longest_streak'], 10)
+
+        # 가장 긴 구간 안쪽을 취소하면 남은 구간 중 최장으로 줄어듦
+        store.update_task(user_id, day(5), "task-1", False)
+        self.assertEqual(store.get_gamification(user_id)['longest_streak'], 5)
+
+    def test_rebuild_counts_runs_before_current(self):
+        user_id = new_user()
+        store.save_plan(user_id, "계획", "30일", schedule(range(30)))
+        # 이벤트 없이 기록된 기존 이력 (백필 대상)
+        with store._connection() as conn:
+            conn.executemany(
+                "UPDATE plan_tasks SET completed = 1 WHERE user_id = ? AND date = ?",
+                [(user_id, day(d)) for d in [*range(10), 29]]
+            )
+        store.rebuild_daily_progress(user_id)
+
+        game = store.get_gamification(user_id)
+        self.assertEqual(game['current_streak'], 1)
+        self.assertEqual(game['longest_streak'], 10)
+
+
+class SampleDataTest(unittest.TestCase):
+    def test_seed_unlocks_achievements_without_notifications(self):
+        store.open()
+        user_id = 'sample-friend-001'
+        self.assertTrue(store.get_gamification(user_id)['achievements'])
+        self.assertEqual(store.get_notifications(user_id), {'new': [], 'old': []})
+        with store._connection() as conn:
+            logged = conn.execute(
+                "SELECT COUNT(*) FROM change_log WHERE user_id = ? AND entity = 'notification'", (user_id,)
+            ).fetchone()[0]
+        self.assertEqual(logged, 0)
+
+
+class TaskEventTest(unittest.TestCase):
+    def test_uncomplete_subtracts_its_own_plan_completion(self):
+        user_id = new_user()
+        # task_id는 계획 안에서만 고유 - 두 계획이 같은 id를 사용
+        store.save_plan(user_id, "계획 A", "1일", schedule([0], duration="30분"))
+        store.save_plan(user_id, "계획 B", "1일", schedule([1], duration="90분"))
+        store.update_task(user_id, day(1), "task-1", True)  # B
+        store.update_task(user_id, day(0), "task-1", True)  # A (같은 task_id의 마지막 완료)
+        store.update_task(user_id, day(1), "task-1", False)  # B 취소
+
+        today = date.today().isoformat()
+        rows = store.get_activity_range(user_id, 'day', today, today)
+        self.assertEqual(rows, [{'period': today, 'completed': 1, 'minutes': 30}])
+
+
+class AuthCacheTest(unittest.TestCase):
+    def test_update_invalidates_user_for_all_tokens(self):
+        user_id = new_user()
+        tokens = [store._create_access_token(user_id) for _ in range(2)]
+        tokens.append(tokens[0] + "x")  # 서명이 틀린 토큰은 캐시하지 않음
+        self.assertIsNone(store.get_user_by_token(tokens[2]))
+        for token in tokens[:2]:
+            self.assertEqual(store.get_user_by_token(token)['name'], '테스트')
+
+        store.update_user(user_id, name='변경')
+        for token in tokens[:2]:
+            self.assertEqual(store.get_user_by_token(token)['name'], '변경')
+
+        store.logout(tokens[0])
+        self.assertIsNone(store.get_user_by_token(tokens[0]))
+        self.assertEqual(store.get_user_by_token(tokens[1])['user_id'], user_id)
+
+
+class TodayRatesTest(unittest.TestCase):
+    def test_many_user_ids_are_chunked(self):
+        user_id = new_user()
+        store.save_plan(user_id, "계획", "1일", schedule([0]))
+        store.update_task(user_id, day(0), "task-1", True)
+
+        # 빌드마다 다른 SQLite 변수 제한을 구버전 기본값(999)으로 낮춤 (풀이 LIFO라 같은 커넥션이 재사용됨)
+        with store._connection() as conn:
+            limit = conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        try:
+            user_ids = [f"missing-{i}" for i in range(1500)] + [user_id]
+            self.assertEqual(store.get_today_rates(user_ids, day(0)), {user_id: 100})
+        finally:
+            with store._connection() as conn:
+                conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, limit)
+
+
+class ResultCacheTest(unittest.TestCase):
+    def test_prune_failure_does_not_fail_set(self):
+        cache = ResultCache(ConnectionPool(os.environ["PALEARN_DB_PATH"], size=1), table="test_cache", prune_every=1)
+
+        def broken_prune():
+            raise RuntimeError("prune")
+        cache.prune = broken_prune
+
+        cache.set("k", {"v": 1})
+        self.assertEqual(cache.get("k"), {"v": 1})
+        self.assertEqual(cache.stats()["errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -21,6 +21,8 @@ class ApiConfig {
 
   static const Duration timeout = Duration(seconds: 90);  // GPT 검색이 오래 걸릴 수 있음
   static const Duration longTimeout = Duration(seconds: 120);  // 추천 API용 더 긴 타임아웃
+  static const Duration jobPollInterval = Duration(seconds: 2);  // 계획 생성 작업 상태 조회 주기
+  static const Duration jobTimeout = Duration(minutes: 15);  // 계획 생성 작업 최대 대기 시간
 }
 
 /// 보안 토큰 저장소
@@ -367,6 +369,11 @@ class HomeService {
     return await ApiClient.get('/home/header', useCache: false);
   }
 
+  /// 홈 대시보드 일괄 조회 (헤더/오늘 계획/복습/어제 복습 자료/알림/친구를 한 번의 요청으로)
+  static Future<Map<String, dynamic>> getDashboard({String scope = 'daily'}) async {
+    return await ApiClient.get('/home/dashboard?scope=$scope', useCache: false);
+  }
+
   /// 계획 목록 조회 (daily/weekly/monthly)
   static Future<List<String>> getPlans({String scope = 'daily'}) async {
     final data = await ApiClient.get('/plans?scope=$scope');
@@ -467,7 +474,7 @@ class RecommendService {
     required List<String> restDays,
     Map<String, dynamic>? quizDetails,
   }) async {
-    return await ApiClient.post(
+    final job = await ApiClient.post(
       '/plan/apply_recommendation',
       body: {
         'selected_course': selectedCourse,
@@ -479,6 +486,10 @@ class RecommendService {
         'quiz_details': quizDetails,
       },
     );
+
+    // 서버는 작업 ID만 즉시 반환 - 완료될 때까지 상태 조회
+    final plan = await PlanService.waitForJob(job['job_id']);
+    return {'success': true, 'plan': plan};
   }
 }
 
@@ -493,7 +504,7 @@ class PlanService {
     required List<String> restDays,
     required String selfLevel,
   }) async {
-    final result = await ApiClient.post(
+    final job = await ApiClient.post(
       '/plans/generate',
       body: {
         'skill': skill,
@@ -504,12 +515,42 @@ class PlanService {
       },
     );
 
+    // 서버는 작업 ID만 즉시 반환 - 완료될 때까지 상태 조회
+    final result = await waitForJob(job['job_id']);
+
     // 캐시 무효화
     await CacheManager.clearCache('/plans/all');
 
     return result;
   }
 
+  /// 계획 생성 작업 상태 조회 (진행률 포함)
+  static Future<Map<String, dynamic>> getJob(String jobId) async {
+    return await ApiClient.get('/plans/jobs/$jobId', offlineFallback: false);
+  }
+
+  /// 계획 생성 작업이 끝날 때까지 대기 후 완성된 계획 반환
+  static Future<Map<String, dynamic>> waitForJob(
+    String jobId, {
+    void Function(Map<String, dynamic> progress)? onProgress,
+  }) async {
+    final deadline = DateTime.now().add(ApiConfig.jobTimeout);
+
+    while (DateTime.now().isBefore(deadline)) {
+      final job = await getJob(jobId);
+      onProgress?.call(Map<String, dynamic>.from(job['progress'] ?? {}));
+
+      if (job['state'] == 'succeeded') {
+        return Map<String, dynamic>.from(job['plan']);
+      }
+      if (job['state'] == 'failed') {
+        throw ApiException(job['error'] ?? '계획 생성에 실패했습니다.');
+      }
+      await Future.delayed(ApiConfig.jobPollInterval);
+    }
+    throw ApiException('계획 생성 시간이 초과되었습니다.', errorType: 'timeout');
+  }
+
   /// 특정 날짜의 상세 계획 조회
   static Future<Map<String, dynamic>> getPlansByDate({
     required String date,
@@ -536,6 +577,24 @@ class PlanService {
     return true;
   }
 
+  /// 태스크 상태 일괄 업데이트 (오프라인 중 쌓인 변경 동기화)
+  /// updates: [{'date': ..., 'task_id': ..., 'completed': ...}]
+  static Future<Map<String, dynamic>> updateTasksBulk(List<Map<String, dynamic>> updates) async {
+    final result = await ApiClient.post('/plans/tasks/bulk', body: {'updates': updates});
+
+    // 캐시 무효화 (변경된 날짜 + 집계 화면)
+    for (final date in updates.map((u) => u['date']).toSet()) {
+      await CacheManager.clearCache('/plans/date/$date');
+    }
+    await CacheManager.clearCache('/plans/all');
+    await CacheManager.clearCache('/home/header');
+    await CacheManager.clearCache('/stats/summary');
+    await CacheManager.clearCache('/stats/weekly');
+    await CacheManager.clearCache('/stats/achievements');
+
+    return Map<String, dynamic>.from(result);
+  }
+
   /// 내 모든 학습 계획 목록 조회
   static Future<List<Map<String, dynamic>>> getMyPlans() async {
     // 캐시 비활성화 - 항상 최신 데이터 조회
@@ -543,6 +602,21 @@ class PlanService {
     return (data as List).map((e) => e as Map<String, dynamic>).toList();
   }
 
+  /// 현재 계획 id 조회 (계획이 없으면 null)
+  static Future<int?> getActivePlanId() async {
+    final data = await ApiClient.get('/plans/active', useCache: false);
+    return data['plan_id'] as int?;
+  }
+
+  /// 현재 계획 변경 (홈/복습/날짜별 조회 기준)
+  static Future<bool> setActivePlan(int planId) async {
+    await ApiClient.post('/plans/active', body: {'plan_id': planId});
+
+    // 날짜별 계획 등 현재 계획 기준 캐시가 모두 바뀌므로 전체 무효화
+    await CacheManager.clearAllCache();
+    return true;
+  }
+
   /// 특정 주제에 대한 연관 자료 조회
   static Future<List<Map<String, dynamic>>> getRelatedMaterials({
     required String topic,
@@ -669,4 +743,20 @@ class StatsService {
     // 캐시 비활성화 - 항상 최신 데이터 조회
     return await ApiClient.get('/stats/achievements', useCache: false);
   }
+
+  /// 기간별 학습 활동 조회 (캘린더 히트맵) - granularity: day / week / month
+  static Future<Map<String, dynamic>> getRange(String from, String to, {String granularity = 'day'}) async {
+    return await ApiClient.get('/stats/range?from=$from&to=$to&granularity=$granularity', useCache: false);
+  }
+}
+
+// ==================== 동기화 API ====================
+
+class SyncService {
+  /// since 커서 이후 변경분 조회 (since 생략 시 전체 스냅샷)
+  /// 응답의 cursor를 다음 호출의 since로 사용하고, full == true면 로컬 데이터를 교체
+  static Future<Map<String, dynamic>> getChanges({int? since}) async {
+    final query = since != null ? '?since=$since' : '';
+    return await ApiClient.get('/sync$query', useCache: false, offlineFallback: false);
+  }
 }